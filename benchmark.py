@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark the decision methods and turns of Shut the Box, optionally
+saving the results as JSON and comparing them with a baseline. Exit with
+status 1 if any metric is worse than the baseline by more than the
+threshold.
+
+Equivalent to `python -m shutthebox bench`.
+"""
+
+import sys
+from shutthebox.cli import main
+
+sys.exit(main(['bench'] + sys.argv[1:]))
@@ -1,40 +1,17 @@
 #!/usr/bin/env python3
 
 """
-Output the differences between the flap decision methods
-make_flap_decision_highest and make_flap_decision_next_roll_probability
-for combinations of flaps with length 4-9 i.e. always summing to more
-than 6.
-"""
-
-import itertools
-import shutthebox
-
-DICE = shutthebox.Dice()
+Compare two or more flap decision methods (default
+make_flap_decision_highest and make_flap_decision_next_roll_probability)
+in every state of the box, for every number of dice which may be rolled
+and every possible dice total. Output a matrix of how often each pair of
+methods disagrees and the mean cost of their disagreements in expected
+final score under optimal play, and optionally each disagreement.
 
-# 4-9 flaps i.e. always summing to more than 6
-for length in range(9, 4 - 1, -1):
-    for this_combination in itertools.combinations(range(1, 9 + 1), length):
-        for this_dice_sum in range(2, 12 + 1):
-            # prepare instance with particular flaps raised
-            box = shutthebox.Box()
-            turn = shutthebox.ComputerTurn(box, DICE)
-            turn.box.lower_flaps_except(this_combination)
-
-            highest = turn.make_flap_decision_highest(
-                this_dice_sum,
-                turn.make_num_dice_decision_one_if_poss)
-            if highest is False: # not possible to lower any flaps
-                break
-            next_roll_prob = turn.make_flap_decision_next_roll_probability(
-                this_dice_sum,
-                turn.make_num_dice_decision_one_if_poss)
+Equivalent to `python -m shutthebox diff`.
+"""
 
-            highest.sort()
-            next_roll_prob.sort()
+import sys
+from shutthebox.cli import main
 
-            if highest != next_roll_prob:
-                print("flaps:", this_combination)
-                print("dice sum:", this_dice_sum)
-                print("highest:", highest)
-                print("next_roll_prob:", next_roll_prob, '\n')
+sys.exit(main(['diff'] + sys.argv[1:]))
@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+
+"""
+Serve games of Shut the Box to any number of human players over TCP.
+Connect with e.g. `nc localhost 8023`.
+
+Equivalent to `python -m shutthebox play --serve`.
+"""
+
+import sys
+from shutthebox.cli import main
+
+sys.exit(main(['play', '--serve'] + sys.argv[1:]))
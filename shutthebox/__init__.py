@@ -2,6 +2,7 @@
 A Python 3 implementation of the dice game Shut the Box
 """
 
+import importlib
 import sys
 
 if sys.version_info.major < 3: # pragma: no cover
@@ -9,10 +10,28 @@ if sys.version_info.major < 3: # pragma: no cover
              str(sys.version_info.major) + '.' +
              str(sys.version_info.minor) + '.')
 
-# pylint: disable=wrong-import-position
-from .flap import Flap
-from .dice import Dice
-from .box import Box
-from .turn import Turn
-from .humanturn import HumanTurn
-from .computerturn import ComputerTurn
+# classes available from the package, imported from their modules when
+# first used so that importing the package (e.g. to run one subcommand
+# of python -m shutthebox) stays fast
+_LAZY_CLASSES = {
+    'Flap': '.flap',
+    'Dice': '.dice',
+    'Box': '.box',
+    'Turn': '.turn',
+    'HumanTurn': '.humanturn',
+    'ComputerTurn': '.computerturn',
+}
+
+__all__ = list(_LAZY_CLASSES)
+
+def __getattr__(name):
+    if name in _LAZY_CLASSES:
+        value = getattr(importlib.import_module(_LAZY_CLASSES[name],
+                                                __name__), name)
+        globals()[name] = value # only import once
+        return value
+    raise AttributeError('module {} has no attribute {}'.format(
+        __name__, name))
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,10 @@
+"""
+Run the command line interface of shutthebox, e.g.
+`python -m shutthebox simulate --flap-decision highest`.
+"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
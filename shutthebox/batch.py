@@ -0,0 +1,106 @@
+"""
+Simulate many turns of Shut the Box at once using NumPy. Requires NumPy,
+which is otherwise not needed by shutthebox.
+"""
+
+import numpy
+
+from .box import flap_nums_from_mask
+from .dice import DEFAULT_FACES
+from .policy import tabulate_policy
+
+def simulate_batch(policy, num_turns, seed=None, faces=DEFAULT_FACES,
+                   weights=None):
+    """
+    Simulate num_turns independent turns in lockstep using the decisions
+    in a PolicyTable and return a NumPy array of their scores.
+
+    policy: instance of PolicyTable e.g. from tabulate_policy()
+    num_turns (int): how many turns to simulate
+    seed: seed for numpy.random.default_rng, or a numpy Generator
+        (default None i.e. unpredictable)
+    faces (sequence): numbers shown on the faces of each die, the
+        highest of which must be that of the dice the policy was
+        tabulated for (default 1-6)
+    weights (sequence): relative probability of rolling each face, or
+        None if the dice are fair (default None)
+    """
+    if not (isinstance(num_turns, int) and num_turns >= 0):
+        raise ValueError('num_turns must be an integer >= 0')
+    # dice totals index the rows of the table
+    if max(faces) * policy.num_dice != policy.max_dice_total:
+        raise ValueError("The faces of the dice don't match the policy")
+
+    rng = numpy.random.default_rng(seed)
+    # fair dice numbered consecutively (e.g. 1-6) can be rolled directly
+    consecutive = (weights is None and
+                   tuple(faces) == tuple(range(min(faces), max(faces) + 1)))
+    faces = numpy.array(faces, dtype=numpy.int32)
+    if weights is not None:
+        weights = numpy.array(weights, dtype=float)
+        weights /= weights.sum()
+
+    width = policy.max_dice_total + 1
+    moves = numpy.frombuffer(
+        policy.moves, dtype='u{}'.format(policy.moves.itemsize)
+    ).astype(numpy.int32)
+    # the policy rolls either a single die or all of the dice
+    single_die = numpy.frombuffer(
+        policy.num_dice_choices, dtype=numpy.uint8) == 1
+    flap_sums = numpy.array(
+        [sum(flap_nums_from_mask(up_mask))
+         for up_mask in range(0, policy.num_states)], dtype=numpy.int32)
+
+    states = numpy.full(num_turns, policy.num_states - 1, dtype=numpy.int32)
+    # indices of the turns which haven't finished
+    active = numpy.arange(num_turns)
+
+    while active.size:
+        active_states = states[active]
+
+        if consecutive:
+            rolls = rng.integers(faces[0], faces[-1] + 1,
+                                 size=(policy.num_dice, active.size),
+                                 dtype=numpy.int32)
+        else:
+            rolls = rng.choice(faces, size=(policy.num_dice, active.size),
+                               p=weights)
+        dice_totals = rolls[0]
+        if policy.num_dice > 1:
+            # ignore all but the first die for turns rolling a single die
+            dice_totals = dice_totals + numpy.where(
+                single_die[active_states], 0, rolls[1:].sum(axis=0))
+
+        move_masks = moves[active_states * width + dice_totals]
+        active_states ^= move_masks
+        states[active] = active_states
+
+        # stop turns in which no flaps were lowered or the box was shut
+        active = active[(move_masks != 0) & (active_states != 0)]
+
+    return flap_sums[states]
+
+def simulate_batch_turn(turn, num_turns, num_dice_decision_method=None,
+                        flap_decision_method=None, seed=None):
+    """
+    Tabulate a ComputerTurn's decision methods and simulate num_turns
+    turns with them using simulate_batch(). Returns a NumPy array of
+    scores.
+
+    turn: instance of ComputerTurn
+    num_turns (int): how many turns to simulate
+    num_dice_decision_method (method): used in deciding how many dice
+        to roll, default make_num_dice_decision_one_if_poss
+    flap_decision_method (method): used in deciding which flaps to
+        lower, default make_flap_decision_next_roll_probability
+    seed: seed for numpy.random.default_rng, or a numpy Generator
+    """
+    if num_dice_decision_method is None:
+        num_dice_decision_method = turn.make_num_dice_decision_one_if_poss
+    if flap_decision_method is None:
+        flap_decision_method = turn.make_flap_decision_next_roll_probability
+
+    policy = tabulate_policy(turn, flap_decision_method,
+                             num_dice_decision_method)
+    return simulate_batch(policy, num_turns, seed=seed,
+                          faces=turn.dice.faces, weights=turn.dice.weights)
@@ -0,0 +1,226 @@
+"""
+Benchmarks for the decision methods and turns of shutthebox, with
+results stored as JSON and compared against a baseline to catch
+regressions.
+"""
+
+import json
+import platform
+import time
+import tracemalloc
+
+from .box import Box
+from .dice import Dice
+from .computerturn import ComputerTurn
+from .strategies import STRATEGIES, available_strategies
+from . import bill
+
+def _metric(value, unit, higher_is_better):
+    return {'value': value, 'unit': unit,
+            'higher_is_better': higher_is_better}
+
+def _make_turn(bill_filename=None):
+    if bill_filename is None:
+        return ComputerTurn(Box(), Dice())
+    return ComputerTurn(Box(), Dice(), bill_filename=bill_filename)
+
+def _clear_caches(turn):
+    """
+    Forget everything turn has cached in making decisions, apart from
+    what is computed once per process such as the MoveIndex.
+    """
+    turn.expectimax_table.clear()
+    for cached in [turn.move_index, turn.success_probabilities,
+                   turn.single_die_success_probabilities]:
+        if hasattr(cached, 'clear_cache'): # for large boxes
+            cached.clear_cache()
+
+def benchmark_decisions(strategy, repeat=1, bill_filename=None):
+    """
+    Returns the mean time in seconds of one uncached call of the
+    strategy's flap decision method over every state of the box and
+    every two-dice total. The decision cache is disabled and the turn's
+    other caches are cleared before each call, outside the time taken.
+
+    strategy (str): key of STRATEGIES
+    repeat (int): how many times to go through every state
+    bill_filename (str): name or path of Bill's file
+    """
+    turn = _make_turn(bill_filename)
+    turn.decision_cache = None
+    flap_decision, num_dice_decision = STRATEGIES[strategy]
+    flap_decision_method = turn.get_flap_decision_method(flap_decision)
+    num_dice_decision_method = turn.get_num_dice_decision_method(
+        num_dice_decision)
+    # make sure anything computed once per process is excluded
+    flap_decision_method(2, num_dice_decision_method)
+
+    num_calls = 0
+    elapsed = 0
+    for _ in range(0, repeat):
+        for up_mask in range(0, turn.box.full_mask + 1):
+            turn.box.set_up_mask(up_mask)
+            for dice_total in range(2, 12 + 1):
+                _clear_caches(turn)
+                start = time.perf_counter()
+                flap_decision_method(dice_total, num_dice_decision_method)
+                elapsed += time.perf_counter() - start
+                num_calls += 1
+    turn.box.reset()
+    return elapsed / num_calls
+
+def benchmark_turns(strategy, num_turns, bill_filename=None):
+    """
+    Returns the number of turns per second performed with the strategy.
+
+    strategy (str): key of STRATEGIES
+    num_turns (int): how many turns to perform
+    bill_filename (str): name or path of Bill's file
+    """
+    turn = _make_turn(bill_filename)
+    flap_decision, num_dice_decision = STRATEGIES[strategy]
+    flap_decision_method = turn.get_flap_decision_method(flap_decision)
+    num_dice_decision_method = turn.get_num_dice_decision_method(
+        num_dice_decision)
+
+    start = time.perf_counter()
+    for _ in range(0, num_turns):
+        turn.perform_turn(num_dice_decision_method=num_dice_decision_method,
+                          flap_decision_method=flap_decision_method)
+    return num_turns / (time.perf_counter() - start)
+
+def benchmark_turn_memory(strategy, num_turns, bill_filename=None):
+    """
+    Returns the mean peak memory in bytes allocated during one turn
+    performed with the strategy, measured with tracemalloc.
+
+    strategy (str): key of STRATEGIES
+    num_turns (int): how many turns to measure
+    bill_filename (str): name or path of Bill's file
+    """
+    turn = _make_turn(bill_filename)
+    flap_decision, num_dice_decision = STRATEGIES[strategy]
+    flap_decision_method = turn.get_flap_decision_method(flap_decision)
+    num_dice_decision_method = turn.get_num_dice_decision_method(
+        num_dice_decision)
+    # warm up caches so that they aren't counted as part of a turn
+    for _ in range(0, 100):
+        turn.perform_turn(num_dice_decision_method=num_dice_decision_method,
+                          flap_decision_method=flap_decision_method)
+
+    total_peak = 0
+    tracemalloc.start()
+    try:
+        for _ in range(0, num_turns):
+            tracemalloc.reset_peak()
+            start_size, _ = tracemalloc.get_traced_memory()
+            turn.perform_turn(
+                num_dice_decision_method=num_dice_decision_method,
+                flap_decision_method=flap_decision_method)
+            _, peak = tracemalloc.get_traced_memory()
+            total_peak += peak - start_size
+    finally:
+        tracemalloc.stop()
+    return total_peak / num_turns
+
+def benchmark_construction(num_turns, bill_filename=None):
+    """
+    Returns the mean time in seconds to construct a Box, Dice and
+    ComputerTurn. If bill_filename is supplied, the time includes
+    loading Bill's table from scratch each time.
+
+    num_turns (int): how many turns to construct
+    bill_filename (str): name or path of Bill's file
+    """
+    _make_turn() # exclude anything built once per process
+    start = time.perf_counter()
+    for _ in range(0, num_turns):
+        turn = _make_turn(bill_filename)
+        if bill_filename is not None:
+            bill._BILL_TABLES.clear() # pylint: disable=protected-access
+            assert turn.bill_table
+    return (time.perf_counter() - start) / num_turns
+
+def run_benchmarks(num_turns=2000, decision_repeat=1,
+                   bill_filename=bill.DEFAULT_BILL_FILENAME):
+    """
+    Run all the benchmarks and return a dict of results which can be
+    saved as JSON. Each metric has a value, a unit and whether higher is
+    better. Bill's strategy is left out if his file can't be found.
+
+    num_turns (int): how many turns to use for turn benchmarks
+    decision_repeat (int): how many times to go through every state for
+        decision benchmarks
+    bill_filename (str): name or path of Bill's file (default as for
+        ComputerTurn)
+    """
+    strategies = available_strategies(bill_filename)
+    metrics = {}
+
+    for strategy in strategies:
+        metrics['decision.{}'.format(strategy)] = _metric(
+            benchmark_decisions(strategy, decision_repeat, bill_filename),
+            's/call', False)
+    for strategy in strategies:
+        metrics['turns.{}'.format(strategy)] = _metric(
+            benchmark_turns(strategy, num_turns, bill_filename),
+            'turns/s', True)
+    for strategy in strategies:
+        metrics['memory.{}'.format(strategy)] = _metric(
+            benchmark_turn_memory(strategy, min(num_turns, 1000),
+                                  bill_filename),
+            'bytes/turn', False)
+
+    metrics['construction'] = _metric(
+        benchmark_construction(num_turns), 's', False)
+    if 'bill' in strategies:
+        metrics['construction_with_bill'] = _metric(
+            benchmark_construction(min(num_turns, 100), bill_filename),
+            's', False)
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'metrics': metrics,
+    }
+
+def save_results(results, file_path):
+    """
+    Save benchmark results to a JSON file.
+    """
+    with open(file_path, 'w') as results_file:
+        json.dump(results, results_file, indent=2, sort_keys=True)
+
+def load_results(file_path):
+    """
+    Load benchmark results from a JSON file.
+    """
+    with open(file_path) as results_file:
+        return json.load(results_file)
+
+def compare_results(baseline, current, threshold=0.1):
+    """
+    Returns a list of messages describing each metric in both sets of
+    results which is worse in current than in baseline by more than
+    threshold (a proportion), or an empty list if nothing regressed.
+
+    baseline (dict): results from run_benchmarks() or load_results()
+    current (dict): results from run_benchmarks() or load_results()
+    threshold (float): e.g. 0.1 to allow metrics to be 10% worse
+    """
+    regressions = []
+    for name, metric in sorted(current['metrics'].items()):
+        if name not in baseline['metrics']:
+            continue
+        base_value = baseline['metrics'][name]['value']
+        value = metric['value']
+        if metric['higher_is_better']:
+            regressed = value < base_value * (1 - threshold)
+        else:
+            regressed = value > base_value * (1 + threshold)
+        if regressed:
+            regressions.append(
+                '{}: {:.4g} {} (baseline {:.4g}, threshold {:.0%})'.format(
+                    name, value, metric['unit'], base_value, threshold))
+    return regressions
@@ -0,0 +1,124 @@
+"""
+Functions for loading Durango Bill's optimal strategy table, which is
+parsed at most once per process and cached in binary form next to the
+text file.
+"""
+
+import os
+
+from .box import mask_from_flap_nums
+from .policy import PolicyTable, load_policy
+
+# name of Bill's file, looked for in the shutthebox directory
+DEFAULT_BILL_FILENAME = 'bill-optimal-strategy.txt'
+
+# Bill's table is for the standard rules only
+BILL_NUM_FLAPS = 9
+BILL_NUM_DICE = 2
+BILL_MAX_FLAP_SUM_SINGLE_DIE = 6
+
+# parsed tables, keyed by absolute path of the text file
+_BILL_TABLES = {}
+
+def import_bill(file_path):
+    """
+    Import Durango Bill's optimal strategy file and return it as a dict.
+
+    file_path (str): path of text file downloaded from
+        http://www.durangobill.com/ShutTheBoxExtra/STB_1DIE.txt
+    """
+    bill = [line.rstrip('\n') for line in open(file_path)]
+    bill = bill[21:533]
+
+    # create a dict: eventually the key will be a tuple of flap numbers
+    # already closed and the value will be a dict with the flaps to close
+    # for each possible dice sum
+    table = {}
+
+    for this_row in bill:
+        this_row = this_row.split()
+
+        # split numbers from first column into a list to be the dict key
+        flaps_down = [int(c) for c in this_row[0]]
+        if flaps_down == [0]:
+            flaps_down = []
+
+        # for each dict value, create another dict
+        # where the key is the dice sum and the value is the flaps to close
+        dice_sum = 1
+        flaps_to_lower = {}
+        for col in range(2, 13 + 1):
+            flaps_to_lower[dice_sum] = [int(c) for c in this_row[col]
+                                        if c != '0']
+            # if cell not blank, check that flaps to lower sum to dice sum
+            if (flaps_to_lower[dice_sum] and
+                    dice_sum != sum(flaps_to_lower[dice_sum])):
+                raise RuntimeError("Flaps to lower don't sum to dice sum")
+            dice_sum += 1
+
+        # add this row's data to the table dict
+        table[tuple(flaps_down)] = flaps_to_lower
+
+    return table
+
+def bill_policy_from_dict(table):
+    """
+    Returns a PolicyTable holding the flaps to lower from a dict returned
+    by import_bill(), rolling a single die whenever allowed.
+
+    table (dict)
+    """
+    policy = PolicyTable(BILL_NUM_FLAPS, BILL_NUM_DICE,
+                         BILL_MAX_FLAP_SUM_SINGLE_DIE)
+    width = policy.max_dice_total + 1
+    full_mask = policy.num_states - 1
+
+    for flaps_down, flaps_to_lower in table.items():
+        up_mask = full_mask ^ mask_from_flap_nums(flaps_down)
+        up_sum = sum(n for n in range(1, BILL_NUM_FLAPS + 1)
+                     if n not in flaps_down)
+        if up_sum <= BILL_MAX_FLAP_SUM_SINGLE_DIE:
+            policy.num_dice_choices[up_mask] = 1
+        else:
+            policy.num_dice_choices[up_mask] = BILL_NUM_DICE
+        for dice_sum, flap_nums in flaps_to_lower.items():
+            policy.moves[up_mask * width + dice_sum] = \
+                mask_from_flap_nums(flap_nums)
+
+    return policy
+
+def load_bill_table(file_path):
+    """
+    Returns Durango Bill's optimal strategy as a PolicyTable indexed by
+    the flaps which are up. The text file is parsed at most once per
+    process, and a binary copy is written to file_path + '.stbp' so that
+    later processes can memory-map it instead. Raise FileNotFoundError
+    if the text file doesn't exist.
+
+    file_path (str): path of text file downloaded from
+        http://www.durangobill.com/ShutTheBoxExtra/STB_1DIE.txt
+    """
+    file_path = os.path.abspath(file_path)
+    if file_path in _BILL_TABLES:
+        return _BILL_TABLES[file_path]
+
+    text_mtime = os.path.getmtime(file_path)
+    cache_path = file_path + '.stbp'
+
+    policy = None
+    try:
+        if os.path.getmtime(cache_path) >= text_mtime:
+            policy = load_policy(cache_path)
+    except (OSError, ValueError):
+        # missing, unreadable or invalid cache: parse the text file instead
+        policy = None
+
+    if policy is None:
+        policy = bill_policy_from_dict(import_bill(file_path))
+        try:
+            policy.save(cache_path)
+        except OSError:
+            pass # e.g. read-only directory: just parse again next time
+
+    _BILL_TABLES[file_path] = policy
+    return policy
@@ -2,12 +2,48 @@
 Defines the Box class of shutthebox.
 """
 
+import functools
+
 from .flap import Flap
 
+@functools.lru_cache(maxsize=4096)
+def flap_nums_from_mask(mask):
+    """
+    Returns a tuple of the flap numbers whose bits are set in mask, in
+    ascending order. Bit n - 1 represents flap n.
+
+    mask (int)
+    """
+    flap_nums = []
+    flap_num = 1
+    while mask:
+        if mask & 1:
+            flap_nums.append(flap_num)
+        mask >>= 1
+        flap_num += 1
+    return tuple(flap_nums)
+
+def mask_from_flap_nums(flap_nums):
+    """
+    Returns the bitmask in which the bits for the supplied flap numbers
+    are set. Bit n - 1 represents flap n.
+
+    flap_nums (iterable): flap numbers
+    """
+    mask = 0
+    for flap_num in flap_nums:
+        mask |= 1 << (flap_num - 1)
+    return mask
+
 class Box:
     """
     The box, which contains a number of flaps.
 
+    The state of the box is held as an integer bitmask, up_mask, in
+    which bit n - 1 is set if flap n is up, along with the running sum
+    of the flaps which are up. The Flap objects in the flaps dict are
+    views over this state.
+
     num_flaps (int): how many flaps the box has (default 9)
     """
 
@@ -16,30 +52,85 @@ class Box:
             raise ValueError('num_flaps must be an integer >= 1')
 
         self.num_flaps = num_flaps
+        self.full_mask = (1 << num_flaps) - 1
+        self.full_sum = num_flaps * (num_flaps + 1) // 2
+
+        self.up_mask = self.full_mask
+        self.up_sum = self.full_sum
 
         self.flaps = {}
         for this_flap_num in range(1, num_flaps + 1):
-            self.flaps[this_flap_num] = Flap(this_flap_num)
+            self.flaps[this_flap_num] = Flap(this_flap_num, box=self)
+
+    def reset(self):
+        """
+        Raise all the flaps again, keeping the same Flap objects and
+        number of flaps.
+        """
+        self.up_mask = self.full_mask
+        self.up_sum = self.full_sum
+
+    def lower_flap(self, flap_num):
+        """
+        Lower a single flap, updating the state of the box.
+
+        flap_num (int): number of the flap to lower
+        """
+        bit = 1 << (flap_num - 1)
+        if not self.up_mask & bit:
+            raise RuntimeError('Trying to lower a flap that is already down')
+        self.up_mask ^= bit
+        self.up_sum -= flap_num
+
+    def set_up_mask(self, up_mask):
+        """
+        Set the state of the box from a bitmask of the flaps which are up.
+
+        up_mask (int): bitmask in which bit n - 1 is set if flap n is up
+        """
+        if not (isinstance(up_mask, int) and 0 <= up_mask <= self.full_mask):
+            raise ValueError('up_mask must be an integer between 0 and ' +
+                             '{}'.format(self.full_mask))
+        self.up_mask = up_mask
+        self.up_sum = sum(flap_nums_from_mask(up_mask))
+
+    def get_lowered_mask(self):
+        """
+        Returns the bitmask of the flaps that are currently down.
+        """
+        return self.full_mask ^ self.up_mask
+
+    def get_available_flap_nums(self):
+        """
+        Returns a tuple of the numbers of the flaps that are currently
+        up, in ascending order.
+        """
+        return flap_nums_from_mask(self.up_mask)
+
+    def get_lowered_flap_nums(self):
+        """
+        Returns a tuple of the numbers of the flaps that are currently
+        down, in ascending order.
+        """
+        return flap_nums_from_mask(self.full_mask ^ self.up_mask)
 
     def get_available_flaps(self):
         """
         Returns a dict of objects for the flaps that are currently up.
         """
-        return {num: flap for num, flap in self.flaps.items()
-                if not flap.is_down}
+        return {num: self.flaps[num] for num in self.get_available_flap_nums()}
 
     def get_lowered_flaps(self):
         """
         Returns a dict of objects for the flaps that are currently down.
         """
-        return {num: flap for num, flap in self.flaps.items()
-                if flap.is_down}
+        return {num: self.flaps[num] for num in self.get_lowered_flap_nums()}
 
     def sum_available_flaps(self):
         """
         Returns the sum of the numbers of the available flaps.
         """
-        return sum(self.get_available_flaps().keys())
+        return self.up_sum
 
     def lower_flaps_except(self, flap_nums):
         """
@@ -48,9 +139,9 @@ class Box:
 
         flap_nums (list): flap numbers to leave up
         """
-        for this_flap_num in self.get_available_flaps().keys():
+        for this_flap_num in self.get_available_flap_nums():
             if this_flap_num not in flap_nums:
-                self.flaps[this_flap_num].lower()
+                self.lower_flap(this_flap_num)
         return True
 
     def __str__(self):
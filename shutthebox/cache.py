@@ -0,0 +1,119 @@
+"""
+Defines the DecisionCache class of shutthebox and the cached_decision
+decorator, which memoise the flap decisions made by ComputerTurn.
+"""
+
+import collections
+import functools
+
+# used to tell a cached False (no flaps can be lowered) from a miss
+_MISSING = object()
+
+class DecisionCache:
+    """
+    A cache of flap decisions with a size limit, evicting the least
+    recently used decision when full. Counts hits and misses.
+
+    maxsize (int): maximum number of decisions to hold (default 4096)
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = None
+        self.hits = 0
+        self.misses = 0
+        self.decisions = collections.OrderedDict()
+        self.resize(maxsize)
+
+    def __len__(self):
+        return len(self.decisions)
+
+    def resize(self, maxsize):
+        """
+        Change the size limit, evicting decisions if necessary.
+
+        maxsize (int): maximum number of decisions to hold
+        """
+        if not (isinstance(maxsize, int) and maxsize >= 1):
+            raise ValueError('maxsize must be an integer >= 1')
+        self.maxsize = maxsize
+        while len(self.decisions) > self.maxsize:
+            self.decisions.popitem(last=False)
+
+    def get(self, key, default=None):
+        """
+        Returns the decision stored under key, or default if there is
+        none, and counts a hit or a miss.
+        """
+        try:
+            value = self.decisions[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.decisions.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Store a decision under key, evicting the least recently used
+        decision if the cache is full.
+        """
+        self.decisions[key] = value
+        self.decisions.move_to_end(key)
+        if len(self.decisions) > self.maxsize:
+            self.decisions.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove all decisions and reset the hit and miss counters.
+        """
+        self.decisions.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        """
+        Returns a dict of the hits, misses, current size and size limit.
+        """
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self.decisions), 'maxsize': self.maxsize}
+
+# shared by all ComputerTurn instances unless they are given their own
+DECISION_CACHE = DecisionCache()
+
+def cached_decision(method):
+    """
+    Decorator for ComputerTurn flap decision methods whose result depends
+    only on the rules, the flaps which are up, the dice total and the
+    num dice decision method. Decisions are stored in the turn's
+    decision_cache, or not cached if that is None. Only use it for
+    methods which compute their decision, since building the key costs
+    more than looking a decision up in a table.
+    """
+    @functools.wraps(method)
+    def wrapper(self, dice_total, num_dice_decision_method=None):
+        cache = self.decision_cache
+        if cache is None:
+            return method(self, dice_total, num_dice_decision_method)
+
+        # use the underlying function of a bound method so that the key
+        # is shared between instances and doesn't keep them alive
+        key = (method.__name__, self.box.num_flaps, self.dice.num_dice,
+               self.dice.faces, self.dice.weights,
+               self.max_flap_sum_single_die, self.box.up_mask, dice_total,
+               getattr(num_dice_decision_method, '__func__',
+                       num_dice_decision_method))
+
+        flap_nums = cache.get(key, _MISSING)
+        if flap_nums is _MISSING:
+            flap_nums = method(self, dice_total, num_dice_decision_method)
+            if flap_nums:
+                flap_nums = tuple(flap_nums)
+            cache.put(key, flap_nums)
+
+        # return a new list so that callers can't alter the cached decision
+        if not flap_nums:
+            return flap_nums
+        return list(flap_nums)
+
+    return wrapper
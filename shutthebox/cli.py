@@ -0,0 +1,280 @@
+"""
+The command line interface of shutthebox, run with
+`python -m shutthebox COMMAND [ARGUMENTS]`. Each command imports only
+the modules it needs when it is run, so that starting the interpreter
+and importing shutthebox is all the work done before a command begins.
+"""
+
+import argparse
+import sys
+
+# modules are imported by the commands which use them
+# pylint: disable=import-outside-toplevel
+
+def _make_parser(command, description):
+    return argparse.ArgumentParser(
+        prog='python -m shutthebox ' + command, description=description)
+
+def _add_rules_arguments(parser):
+    parser.add_argument('--flaps', type=int, default=9,
+                        help='number of flaps (default %(default)s)')
+    parser.add_argument('--dice', type=int, default=2,
+                        help='number of dice (default %(default)s)')
+
+def simulate_command(argv):
+    """
+    Simulate many turns by the computer. Output a summary of the scores,
+    or the score for each turn with --scores.
+    """
+    from .simulation import (simulate, add_simulation_arguments,
+                             simulation_options, SimulationInterrupted)
+
+    parser = _make_parser('simulate', simulate_command.__doc__)
+    parser.add_argument(
+        '--flap-decision', default='next_roll_probability',
+        help='flap decision method e.g. highest (default %(default)s)')
+    parser.add_argument(
+        '--num-dice-decision', default='one_if_poss',
+        help='num dice decision method e.g. always_all ' +
+        '(default %(default)s)')
+    _add_rules_arguments(parser)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of processes (default %(default)s)')
+    add_simulation_arguments(parser)
+    args = parser.parse_args(argv)
+
+    try:
+        with simulation_options(
+                args, flap_decision=args.flap_decision,
+                num_dice_decision=args.num_dice_decision,
+                num_flaps=args.flaps, num_dice=args.dice,
+                workers=args.workers) as options:
+            stats = simulate(**options)
+    except SimulationInterrupted as interrupted:
+        print(interrupted, file=sys.stderr)
+        return 130
+
+    if not args.scores:
+        print(stats)
+    return 0
+
+def play_command(argv):
+    """
+    Play Shut the Box on the command line, or serve games to any number
+    of human players over TCP with --serve.
+    """
+    parser = _make_parser('play', play_command.__doc__)
+    _add_rules_arguments(parser)
+    parser.add_argument('--serve', action='store_true',
+                        help='serve games over TCP instead')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='address to listen on (default %(default)s)')
+    parser.add_argument('--port', type=int, default=8023,
+                        help='port to listen on (default %(default)s)')
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        from .server import run_server
+        try:
+            run_server(args.host, args.port, args.flaps, args.dice)
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    from .box import Box
+    from .dice import Dice
+    from .humanturn import HumanTurn
+    from .session import HumanSession
+
+    session = HumanSession(HumanTurn(Box(args.flaps), Dice(args.dice)))
+    text = session.start()
+    try:
+        while not session.finished:
+            text = session.handle_input(input(text))
+    except (EOFError, KeyboardInterrupt):
+        text = '\n'
+    print(text, end='')
+    return 0
+
+def diff_command(argv):
+    """
+    Compare two or more flap decision methods (default highest and
+    next_roll_probability) in every state of the box, for every number
+    of dice which may be rolled and every possible dice total. Output a
+    matrix of how often each pair of methods disagrees and the mean cost
+    of their disagreements in expected final score under optimal play,
+    and optionally each disagreement.
+    """
+    from .box import flap_nums_from_mask
+    from .difference import compare_decisions
+
+    parser = _make_parser('diff', diff_command.__doc__)
+    parser.add_argument('methods', nargs='*',
+                        default=['highest', 'next_roll_probability'],
+                        help='names of flap decision methods e.g. highest')
+    parser.add_argument(
+        '--num-dice-decision', default='one_if_poss',
+        help='num dice decision method assumed for the next roll')
+    _add_rules_arguments(parser)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='number of processes (default one per CPU)')
+    parser.add_argument('--list', action='store_true',
+                        help='output each disagreement')
+    args = parser.parse_args(argv)
+
+    differences = compare_decisions(
+        args.methods, num_dice_decision=args.num_dice_decision,
+        num_flaps=args.flaps, num_dice=args.dice, workers=args.workers)
+
+    if args.list:
+        for up_mask, dice_rolled, dice_total, decisions in (
+                differences.disagreements):
+            print('flaps:', flap_nums_from_mask(up_mask))
+            print('dice rolled:', dice_rolled)
+            print('dice sum:', dice_total)
+            for name, flap_nums in zip(args.methods, decisions):
+                print('{}: {} (expected score {:.4f})'.format(
+                    name, list(flap_nums),
+                    differences.decision_cost(up_mask, flap_nums)))
+            print()
+
+    print(differences)
+    return 0
+
+def solve_command(argv):
+    """
+    Compute the strategy minimising the expected score and output the
+    expected score and the probability of shutting the box when it is
+    followed, optionally saving it as a policy file for fast loading.
+    """
+    from .box import Box
+    from .computerturn import ComputerTurn
+    from .dice import Dice
+    from .evaluation import expected_score, score_distribution
+
+    parser = _make_parser('solve', solve_command.__doc__)
+    _add_rules_arguments(parser)
+    parser.add_argument(
+        '--max-single', type=int, default=6,
+        help='max sum of flaps to be allowed to roll a single die ' +
+        '(default %(default)s)')
+    parser.add_argument('--output', metavar='FILE',
+                        help='save the strategy to this policy file')
+    args = parser.parse_args(argv)
+
+    turn = ComputerTurn(Box(args.flaps), Dice(args.dice))
+    turn.max_flap_sum_single_die = args.max_single
+    distribution = score_distribution(
+        turn, turn.make_flap_decision_optimal,
+        turn.make_num_dice_decision_optimal)
+    print('expected score: {:.4f}'.format(expected_score(distribution)))
+    print('shut the box: {:.4%}'.format(distribution.get(0, 0)))
+
+    if args.output:
+        from .policy import compile_policy
+        compile_policy(turn, turn.make_flap_decision_optimal,
+                       turn.make_num_dice_decision_optimal, args.output)
+    return 0
+
+def bench_command(argv):
+    """
+    Benchmark the decision methods and turns, optionally saving the
+    results as JSON and comparing them with a baseline. Exit with status
+    1 if any metric is worse than the baseline by more than the
+    threshold.
+    """
+    from . import benchmark
+
+    parser = _make_parser('bench', bench_command.__doc__)
+    parser.add_argument('--turns', type=int, default=2000,
+                        help='number of turns for turn benchmarks')
+    parser.add_argument('--output', help='save results to this JSON file')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='compare results with this JSON file')
+    parser.add_argument(
+        '--threshold', type=float, default=0.1,
+        help='allowed regression as a proportion (default %(default)s)')
+    args = parser.parse_args(argv)
+
+    results = benchmark.run_benchmarks(num_turns=args.turns)
+    for name, metric in sorted(results['metrics'].items()):
+        print('{:<40} {:>12.4g} {}'.format(name, metric['value'],
+                                           metric['unit']))
+
+    if args.output:
+        benchmark.save_results(results, args.output)
+
+    if args.compare:
+        regressions = benchmark.compare_results(
+            benchmark.load_results(args.compare), results, args.threshold)
+        if regressions:
+            print('\nRegressions:')
+            for message in regressions:
+                print(message)
+            return 1
+        print('\nNo regressions')
+    return 0
+
+def tournament_command(argv):
+    """
+    Play every strategy (or those named) with the same dice and output
+    the mean score of each and the difference between each pair of
+    strategies with confidence intervals.
+    """
+    from .strategies import STRATEGIES
+    from .tournament import run_tournament
+
+    parser = _make_parser('tournament', tournament_command.__doc__)
+    parser.add_argument('strategies', nargs='*',
+                        help='names of strategies from {} '.format(
+                            ', '.join(STRATEGIES)) +
+                        '(default all available)')
+    _add_rules_arguments(parser)
+    parser.add_argument(
+        '--turns', type=int, default=10000,
+        help='number of turns per strategy (default %(default)s)')
+    parser.add_argument('--antithetic', action='store_true',
+                        help='play antithetic pairs of turns')
+    parser.add_argument('--seed', type=int,
+                        help='seed for reproducible results')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='number of processes (default one per CPU)')
+    parser.add_argument('--confidence', type=float, default=0.95,
+                        help='confidence level (default %(default)s)')
+    args = parser.parse_args(argv)
+
+    results = run_tournament(
+        args.turns, strategies=args.strategies or None,
+        num_flaps=args.flaps, num_dice=args.dice,
+        antithetic=args.antithetic, seed=args.seed, workers=args.workers)
+    print(results.format(args.confidence))
+    return 0
+
+# name: function called with the command's arguments, returning the exit
+# status
+COMMANDS = {
+    'simulate': simulate_command,
+    'play': play_command,
+    'diff': diff_command,
+    'solve': solve_command,
+    'bench': bench_command,
+    'tournament': tournament_command,
+}
+
+def main(argv=None):
+    """
+    Run the command named by the first argument with the rest of the
+    arguments and return its exit status.
+
+    argv (list): command line arguments, default sys.argv[1:]
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m shutthebox',
+        description='A Python 3 implementation of the dice game Shut the ' +
+        'Box. Run a command with --help for its arguments.')
+    parser.add_argument('command', choices=COMMANDS, metavar='COMMAND',
+                        help='one of ' + ', '.join(COMMANDS))
+    parser.add_argument('arguments', nargs=argparse.REMAINDER,
+                        help='arguments for the command')
+    args = parser.parse_args(argv)
+    return COMMANDS[args.command](args.arguments)
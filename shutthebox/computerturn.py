@@ -2,52 +2,21 @@
 Defines the ComputerTurn class of shutthebox.
 """
 
-import itertools
-import collections
 import os
+import time
 
 from .turn import Turn
-
-def import_bill(file_path):
-    """
-    Import Durango Bill's optimal strategy file and return it as a dict.
-
-    file_path (str): path of text file downloaded from
-        http://www.durangobill.com/ShutTheBoxExtra/STB_1DIE.txt
-    """
-    bill = [line.rstrip('\n') for line in open(file_path)]
-    bill = bill[21:533]
-
-    # create a dict: eventually the key will be a tuple of flap numbers
-    # already closed and the value will be a dict with the flaps to close
-    # for each possible dice sum
-    table = {}
-
-    for this_row in bill:
-        this_row = this_row.split()
-
-        # split numbers from first column into a list to be the dict key
-        flaps_down = [int(c) for c in this_row[0]]
-        if flaps_down == [0]:
-            flaps_down = []
-
-        # for each dict value, create another dict
-        # where the key is the dice sum and the value is the flaps to close
-        dice_sum = 1
-        flaps_to_lower = {}
-        for col in range(2, 13 + 1):
-            flaps_to_lower[dice_sum] = [int(c) for c in this_row[col]
-                                        if c != '0']
-            # if cell not blank, check that flaps to lower sum to dice sum
-            if (flaps_to_lower[dice_sum] and
-                    dice_sum != sum(flaps_to_lower[dice_sum])):
-                raise RuntimeError("Flaps to lower don't sum to dice sum")
-            dice_sum += 1
-
-        # add this row's data to the table dict
-        table[tuple(flaps_down)] = flaps_to_lower
-
-    return table
+from .box import flap_nums_from_mask, mask_from_flap_nums
+from .bill import DEFAULT_BILL_FILENAME, load_bill_table
+# import_bill was previously defined here
+from .bill import import_bill # pylint: disable=unused-import
+from .cache import DECISION_CACHE, DecisionCache, cached_decision
+from .moves import get_move_index, get_success_probabilities
+from .observers import DebugPrinter
+from .solver import solve
+
+# how many expected scores make_flap_decision_expectimax keeps per turn
+EXPECTIMAX_TABLE_SIZE = 65536
 
 class ComputerTurn(Turn):
     """
@@ -59,35 +28,87 @@ class ComputerTurn(Turn):
         http://www.durangobill.com/ShutTheBoxExtra/STB_1DIE.txt
     """
 
+    # memoises flap decisions across turns and instances; set to another
+    # DecisionCache, or None to disable caching
+    decision_cache = DECISION_CACHE
+
+    # how many rolls after the current one make_flap_decision_expectimax
+    # looks ahead, and the probability below which it ignores a dice total
+    expectimax_depth = 2
+    expectimax_min_probability = 0.001
+
     def __init__(self, box, dice,
-                 bill_filename='bill-optimal-strategy.txt'):
+                 bill_filename=DEFAULT_BILL_FILENAME):
         super(ComputerTurn, self).__init__(box, dice)
 
-        # create dict of probabilities for rolling particular dice sums
+        # legal moves for each state of a box of this size
+        self.move_index = get_move_index(box.num_flaps)
+
+        # dicts of probabilities for rolling particular dice sums with all
+        # the dice or a single die, cached per set of dice by shutthebox.dice
+        self.dice_sum_probabilities = dice.sum_probabilities()
+        self.single_die_sum_probabilities = dice.sum_probabilities(1)
 
-        dice_sums = []
-        # for each possible outcome of n dice, sum dice numbers
-        for dice_numbers in itertools.product(range(1, 6 + 1),
-                                              repeat=dice.num_dice):
-            dice_sums.append(sum(dice_numbers))
+        # probabilities of being able to lower a flap from each state of the
+        # box with all the dice or a single die
+        self.success_probabilities = get_success_probabilities(
+            box.num_flaps, self.dice_sum_probabilities)
+        self.single_die_success_probabilities = get_success_probabilities(
+            box.num_flaps, self.single_die_sum_probabilities)
 
-        # calculate frequency of each dice sum
-        frequencies = collections.Counter(dice_sums)
+        # instances of TurnObserver notified of events during turns
+        self.observers = []
 
-        # calculate proportion for each dice sum
-        self.dice_sum_probabilities = {}
-        for dice_sum, freq in frequencies.items():
-            self.dice_sum_probabilities[dice_sum] = freq / len(dice_sums)
+        # expected scores found by make_flap_decision_expectimax, kept for
+        # the life of this instance so that later turns reuse them
+        self.expectimax_table = DecisionCache(maxsize=EXPECTIMAX_TABLE_SIZE)
 
-        # used in error message for make_flap_decision_bill
+        # Durango Bill's table is loaded the first time it's needed
         self.bill_filename = bill_filename
-        try:
-            # look for file in shutthebox directory
-            file_path = os.path.join(
-                os.path.dirname(__file__), self.bill_filename)
-            self.bill_table = import_bill(file_path)
-        except FileNotFoundError:
-            self.bill_table = False
+        self._bill_table = None
+
+    @property
+    def bill_table(self):
+        """
+        Durango Bill's optimal strategy as a PolicyTable, or False if the
+        file couldn't be found.
+        """
+        if self._bill_table is None:
+            try:
+                # look for file in shutthebox directory
+                file_path = os.path.join(
+                    os.path.dirname(__file__), self.bill_filename)
+                self._bill_table = load_bill_table(file_path)
+            except FileNotFoundError:
+                self._bill_table = False
+        return self._bill_table
+
+    def get_flap_decision_method(self, name):
+        """
+        Returns the flap decision method with the supplied name, e.g.
+        'highest' for make_flap_decision_highest. Raise ValueError if
+        there is no such method.
+
+        name (str)
+        """
+        return self._get_decision_method('make_flap_decision_', name)
+
+    def get_num_dice_decision_method(self, name):
+        """
+        Returns the num dice decision method with the supplied name, e.g.
+        'always_all' for make_num_dice_decision_always_all. Raise
+        ValueError if there is no such method.
+
+        name (str)
+        """
+        return self._get_decision_method('make_num_dice_decision_', name)
+
+    def _get_decision_method(self, prefix, name):
+        method = getattr(self, prefix + str(name), None)
+        if method is None:
+            raise ValueError('There is no decision method called ' +
+                             prefix + str(name))
+        return method
 
     @staticmethod
     def remove_greater_than(lst, num):
@@ -113,31 +134,7 @@ class ComputerTurn(Turn):
 
         dice_total (int): sum of dice rolled
         """
-        # just the flaps that are <= the dice total
-        flap_nums = self.remove_greater_than(
-            self.box.get_available_flaps().keys(), dice_total)
-
-        # if we can make the dice total using a single flap, do that
-        for flap_num in flap_nums:
-            if flap_num == dice_total:
-                return [flap_num]
-
-        # otherwise, use combinations of flaps, preferring higher numbers
-        # sort because flaps dict not returned in any specific order
-        flap_nums.sort()
-        flap_nums.reverse()
-
-        # for each possible number of flaps (apart from a single flap),
-        # starting with fewest flaps i.e. highest flap numbers
-        for length in range(2, len(flap_nums) + 1):
-            # check whether each combination sums to dice total
-            for this_combination in itertools.combinations(flap_nums, length):
-                if sum(this_combination) == dice_total:
-                    this_combination = list(this_combination)
-                    this_combination.reverse()
-                    return this_combination
-
-        return False
+        return self.move_index.get_highest(self.box.up_mask, dice_total)
 
     def make_flap_decision_lowest(
             self, dice_total, num_dice_decision_method=None):
@@ -148,23 +145,7 @@ class ComputerTurn(Turn):
 
         dice_total (int): sum of dice rolled
         """
-        # just the flaps that are <= the dice total
-        flap_nums = self.remove_greater_than(
-            self.box.get_available_flaps().keys(), dice_total)
-
-        # use combinations of flaps, preferring lower numbers
-        # sort because flaps dict not returned in any specific order
-        flap_nums.sort()
-
-        # for each possible number of flaps
-        # starting with most flaps i.e. lowest flap numbers
-        for length in range(len(flap_nums), 0, -1):
-            # check whether each combination sums to dice total
-            for this_combination in itertools.combinations(flap_nums, length):
-                if sum(this_combination) == dice_total:
-                    return list(this_combination)
-
-        return False
+        return self.move_index.get_lowest(self.box.up_mask, dice_total)
 
     def calculate_success_probability(
             self, flap_nums, num_dice_decision_method):
@@ -177,38 +158,29 @@ class ComputerTurn(Turn):
         num_dice_decision_method (method): used to decide how many dice
             would be rolled
         """
-        single_die = False
+        return self.success_probability_for_mask(
+            mask_from_flap_nums(flap_nums), sum(flap_nums),
+            num_dice_decision_method)
+
+    def success_probability_for_mask(self, up_mask, up_sum,
+                                     num_dice_decision_method):
+        """
+        As calculate_success_probability, but for the flaps in a bitmask,
+        looked up in tables of the subset sums reachable from every
+        state of the box.
+
+        up_mask (int): bitmask of the flaps which would be left open
+        up_sum (int): sum of the flaps which would be left open
+        num_dice_decision_method (method): used to decide how many dice
+            would be rolled
+        """
         # if allowed to use a single die and we decide to
-        if (sum(flap_nums) <= self.max_flap_sum_single_die and
+        if (up_sum <= self.max_flap_sum_single_die and
                 num_dice_decision_method() == 1):
-            single_die = True
-            possible_dice_sums = range(1, 6 + 1)
-        else:
-            possible_dice_sums = self.dice_sum_probabilities.keys()
-
-        prob = 0
-
-        for dice_sum in possible_dice_sums:
-            this_dice_sum_success = False
-            # try all lengths of combinations of flaps supplied
-            for length in range(1, len(flap_nums) + 1):
-                for this_combination in itertools.combinations(
-                        flap_nums, length):
-                    # if we find one, add probability of rolling this dice sum
-                    if sum(this_combination) == dice_sum:
-                        if single_die:
-                            prob += 1/6
-                        else:
-                            prob += self.dice_sum_probabilities[dice_sum]
-                        this_dice_sum_success = True
-                        # stop trying combinations of this length
-                        break
-                # stop trying combinations of any length
-                if this_dice_sum_success:
-                    break
-
-        return prob
+            return self.single_die_success_probabilities[up_mask]
+        return self.success_probabilities[up_mask]
 
+    @cached_decision
     def make_flap_decision_next_roll_probability(
             self, dice_total, num_dice_decision_method):
         """
@@ -224,7 +196,8 @@ class ComputerTurn(Turn):
             many dice to use for the next roll
         """
 
-        flap_nums = self.box.get_available_flaps().keys()
+        up_mask = self.box.up_mask
+        up_sum = self.box.up_sum
 
         # create an empty dict to hold next-turn success probabilities
         # key: tuple of flap numbers (can't use a list)
@@ -232,30 +205,15 @@ class ComputerTurn(Turn):
         #   next roll if these flaps are closed i.e. not failing on next roll
         probabilities = {}
 
-        # just the flaps that are <= the dice total
-        closeable_flap_nums = self.remove_greater_than(flap_nums, dice_total)
-
-        # use combinations of flaps, preferring higher numbers
-        # sort because flaps dict not returned in any specific order
-        closeable_flap_nums.sort()
-        closeable_flap_nums.reverse()
-
-        # for each possible number of flaps starting with fewest flaps
-        for length in range(1, len(closeable_flap_nums) + 1):
-            # for each combination with this number of flaps
-            for this_combination in itertools.combinations(
-                    closeable_flap_nums, length):
-                # check combination sums to dice total and try next if not
-                if sum(this_combination) != dice_total:
-                    continue
-
-                # flaps that would be left if we closed this combination
-                remaining_flaps = [n for n in flap_nums
-                                   if n not in this_combination]
-
-                probabilities[this_combination] = \
-                    self.calculate_success_probability(
-                        remaining_flaps, num_dice_decision_method)
+        # for each combination of flaps which sums to the dice total,
+        # starting with fewest flaps
+        for this_combination in self.move_index.get_moves(
+                up_mask, dice_total):
+            # flaps that would be left if we closed this combination
+            probabilities[this_combination] = \
+                self.success_probability_for_mask(
+                    up_mask ^ mask_from_flap_nums(this_combination),
+                    up_sum - dice_total, num_dice_decision_method)
 
         # if no flaps can be closed
         if not probabilities:
@@ -266,6 +224,103 @@ class ComputerTurn(Turn):
 
         return list(chosen_flaps) # instead of tuple
 
+    def expectimax_value(self, up_mask, up_sum, depth, one_die):
+        """
+        Returns the expected score from a state of the box, searching
+        depth rolls ahead and choosing the flaps which minimise it after
+        each. Beyond that, the score is estimated as the sum of the flaps
+        if the next roll fails and 0 if not. Dice totals less likely than
+        expectimax_min_probability are left out. Results are stored in
+        expectimax_table, keyed by the state, the search and the settings
+        which affect them.
+
+        up_mask (int): bitmask of the flaps which are up
+        up_sum (int): sum of the flaps which are up
+        depth (int): how many rolls to search
+        one_die (bool): roll a single die when allowed?
+        """
+        if up_mask == 0:
+            return 0
+        single_die = one_die and up_sum <= self.max_flap_sum_single_die
+        if depth == 0:
+            if single_die:
+                success_probability = \
+                    self.single_die_success_probabilities[up_mask]
+            else:
+                success_probability = self.success_probabilities[up_mask]
+            return up_sum * (1 - success_probability)
+
+        key = (up_mask, depth, one_die, self.max_flap_sum_single_die,
+               self.expectimax_min_probability)
+        value = self.expectimax_table.get(key)
+        if value is not None:
+            return value
+
+        if single_die:
+            dice_sum_probabilities = self.single_die_sum_probabilities
+        else:
+            dice_sum_probabilities = self.dice_sum_probabilities
+
+        total = 0
+        total_prob = 0
+        for dice_total, dice_prob in dice_sum_probabilities.items():
+            if dice_prob < self.expectimax_min_probability:
+                continue
+            total_prob += dice_prob
+            best_value = up_sum # score if no flaps can be lowered
+            for this_combination in self.move_index.get_moves(
+                    up_mask, dice_total):
+                best_value = min(best_value, self.expectimax_value(
+                    up_mask ^ mask_from_flap_nums(this_combination),
+                    up_sum - dice_total, depth - 1, one_die))
+            total += dice_prob * best_value
+
+        # as if the dice totals left out couldn't be rolled
+        value = total / total_prob if total_prob else up_sum
+        self.expectimax_table.put(key, value)
+        return value
+
+    def make_flap_decision_expectimax(
+            self, dice_total, num_dice_decision_method):
+        """
+        Returns a list of numbers which sum to the dice total from a
+        list of possible flap numbers, or False if this is impossible.
+        Chooses flap numbers which minimise the expected score found by
+        expectimax_value() searching expectimax_depth rolls ahead. A
+        depth of 0 looks only at the chance of failing on the next roll,
+        like make_flap_decision_next_roll_probability, and deeper
+        searches approach the optimal strategy.
+
+        dice_total (int): sum of dice rolled
+        num_dice_decision_method (method): in searching it is assumed
+            that this method will be used to decide how many dice to use
+            for each roll
+        """
+        if not (isinstance(self.expectimax_depth, int) and
+                self.expectimax_depth >= 0):
+            raise ValueError('expectimax_depth must be an integer >= 0')
+
+        up_mask = self.box.up_mask
+        up_sum = self.box.up_sum
+        one_die = num_dice_decision_method() == 1
+
+        best_combination = None
+        best_value = None
+        # keep the first of equally good combinations i.e. fewest flaps
+        for this_combination in self.move_index.get_moves(
+                up_mask, dice_total):
+            value = self.expectimax_value(
+                up_mask ^ mask_from_flap_nums(this_combination),
+                up_sum - dice_total, self.expectimax_depth, one_die)
+            if best_combination is None or value < best_value:
+                best_combination = this_combination
+                best_value = value
+
+        if best_combination is None:
+            return False
+
+        return sorted(best_combination)
+
     def make_flap_decision_bill(
             self, dice_total, num_dice_decision_method):
         """
@@ -290,16 +345,43 @@ class ComputerTurn(Turn):
                 "Can't (yet) use make_flap_decision_bill without option to " +
                 "use one die e.g. with make_num_dice_decision_always_all")
 
-        flaps_lowered = self.box.get_lowered_flaps().keys()
-        flaps_chosen = self.bill_table[tuple(flaps_lowered)][dice_total]
+        if self.box.num_flaps != self.bill_table.num_flaps:
+            raise NotImplementedError(
+                "Can't use make_flap_decision_bill with a box that doesn't " +
+                'have {} flaps'.format(self.bill_table.num_flaps))
 
-        if not flaps_chosen:
+        move_mask = self.bill_table.get_move_mask(self.box.up_mask, dice_total)
+        if not move_mask:
             return False
 
-        return flaps_chosen
+        return list(flap_nums_from_mask(move_mask))
+
+    def make_flap_decision_optimal(
+            self, dice_total, num_dice_decision_method=None):
+        """
+        Returns a list of numbers which sum to the dice total from a
+        list of possible flap numbers, or False if this is impossible.
+        Chooses flap numbers which minimise the expected score, using the
+        strategy computed by get_optimal_strategy(). This assumes that
+        make_num_dice_decision_optimal will be used for later rolls.
+
+        dice_total (int): sum of dice rolled
+        """
+        return self.get_optimal_strategy().get_move(
+            self.box.up_mask, dice_total)
 
     # pylint: enable=unused-argument
 
+    def get_optimal_strategy(self):
+        """
+        Returns the OptimalStrategy for this turn's box, dice and
+        max_flap_sum_single_die. It is solved once per process for each
+        set of rules.
+        """
+        return solve(self.box.num_flaps, self.dice.num_dice,
+                     self.max_flap_sum_single_die, faces=self.dice.faces,
+                     weights=self.dice.weights)
+
     @staticmethod
     def make_num_dice_decision_one_if_poss():
         """
@@ -317,6 +399,44 @@ class ComputerTurn(Turn):
         """
         return self.dice.num_dice
 
+    def make_num_dice_decision_optimal(self):
+        """
+        Returns how many dice to roll if we're allowed to roll a single
+        die. In this method, we'll choose whichever number of dice
+        minimises the expected score.
+        """
+        return self.get_optimal_strategy().num_dice_choices[self.box.up_mask]
+
+    def add_observer(self, observer):
+        """
+        Attach an observer to be notified of events during turns.
+
+        observer: instance of TurnObserver
+        """
+        self.observers.append(observer)
+
+    def remove_observer(self, observer):
+        """
+        Detach an observer added with add_observer().
+
+        observer: instance of TurnObserver
+        """
+        self.observers.remove(observer)
+
+    def get_moves(self, dice_total):
+        """
+        Returns a tuple of the combinations of up flaps which sum to the
+        dice total, each a tuple in descending order.
+
+        dice_total (int): sum of dice rolled
+        """
+        return self.move_index.get_moves(self.box.up_mask, dice_total)
+
+    def _get_observers(self, debug):
+        if debug:
+            return self.observers + [DebugPrinter()]
+        return self.observers
+
     def perform_roll(self, num_dice_decision_method=None,
                      flap_decision_method=None, debug=False):
         """
@@ -333,33 +453,42 @@ class ComputerTurn(Turn):
             num_dice_decision_method = self.make_num_dice_decision_one_if_poss
         if flap_decision_method is None:
             flap_decision_method = self.make_flap_decision_next_roll_probability
+        observers = self._get_observers(debug)
 
         # roll all the dice or a single die
         # if our decision method returns 1 (die) and we're allowed to roll a
         # single die, do this
         if (num_dice_decision_method() == 1 and
                 self.box.sum_available_flaps() <= self.max_flap_sum_single_die):
-            if debug:
-                print('Rolling single die')
-            dice_total = self.dice.roll(1)
+            num_dice = 1
         else:
-            dice_total = self.dice.roll()
-            if debug:
-                print('Rolling all dice')
-        if debug:
-            print('Dice total:', dice_total)
+            num_dice = self.dice.num_dice
+        dice_total = self.dice.roll(num_dice)
+
+        # decide which flaps to lower
+        if observers:
+            for observer in observers:
+                observer.on_roll(self, num_dice, dice_total)
+            start = time.perf_counter()
+            flap_nums_to_lower = flap_decision_method(
+                dice_total, num_dice_decision_method)
+            elapsed = time.perf_counter() - start
+            for observer in observers:
+                observer.on_decision(self, dice_total, flap_nums_to_lower,
+                                     flap_decision_method, elapsed)
+        else:
+            flap_nums_to_lower = flap_decision_method(
+                dice_total, num_dice_decision_method)
 
-        # decide which flaps to lower and lower them
-        flap_nums_to_lower = flap_decision_method(
-            dice_total, num_dice_decision_method)
         if not flap_nums_to_lower: # if impossible to lower any flaps
-            if debug:
-                print('Impossible to lower any flaps')
             return False
-        if debug:
-            print('Lowering flaps:', flap_nums_to_lower)
+
+        # lower them
         for this_flap_num in flap_nums_to_lower:
-            self.box.flaps[this_flap_num].lower()
+            self.box.lower_flap(this_flap_num)
+
+        for observer in observers:
+            observer.on_flaps_lowered(self, flap_nums_to_lower)
 
         return True
 
@@ -375,22 +504,24 @@ class ComputerTurn(Turn):
             lower, passed to perform_roll
         debug (bool): print debug information relating to this turn?
         """
-
-        if debug:
-            print(self.box)
-            print('Flap sum:', self.box.sum_available_flaps())
+        observers = self._get_observers(debug)
+        for observer in observers:
+            observer.on_turn_start(self)
 
         # check whether all flaps are already down before each roll
         # if roll performed and no flaps could be lowered, stop the turn
-        while (self.box.sum_available_flaps() > 0 and
-               self.perform_roll(
-                   debug=debug,
-                   num_dice_decision_method=num_dice_decision_method,
-                   flap_decision_method=flap_decision_method)):
-            if debug:
-                print('\n', self.box)
-                print('Flap sum:', self.box.sum_available_flaps())
+        num_rolls = 0
+        while self.box.sum_available_flaps() > 0:
+            num_rolls += 1
+            if not self.perform_roll(
+                    debug=debug,
+                    num_dice_decision_method=num_dice_decision_method,
+                    flap_decision_method=flap_decision_method):
+                break
 
         score = self.box.sum_available_flaps()
-        self.box.__init__() # re-initialise our box with all flaps up
+        for observer in observers:
+            observer.on_turn_end(self, score, num_rolls)
+
+        self.box.reset() # raise all flaps again
         return score
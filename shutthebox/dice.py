@@ -2,22 +2,167 @@
 Defines the Dice class of shutthebox.
 """
 
+import array
+import functools
 import random
 
-# pylint: disable=too-few-public-methods
+# numbers shown on the faces of a standard die
+DEFAULT_FACES = (1, 2, 3, 4, 5, 6)
+
+@functools.lru_cache(maxsize=None)
+def _sum_distribution(num_dice, faces, weights):
+    """
+    Returns a tuple of (dice sum, probability) pairs in ascending order
+    of dice sum, found by repeatedly convolving the distribution of a
+    single die. Computed exactly and cached per set of arguments.
+    """
+    # imported here as it's slow to import and rarely needed more than
+    # once per process
+    import fractions # pylint: disable=import-outside-toplevel
+
+    if weights is None:
+        weights = (1,) * len(faces)
+    total_weight = sum(fractions.Fraction(w) for w in weights)
+    single = {}
+    for face, weight in zip(faces, weights):
+        single[face] = (single.get(face, 0) +
+                        fractions.Fraction(weight) / total_weight)
+
+    distribution = {0: fractions.Fraction(1)}
+    for _ in range(0, num_dice):
+        next_distribution = {}
+        for dice_sum, prob in distribution.items():
+            for face, face_prob in single.items():
+                next_distribution[dice_sum + face] = (
+                    next_distribution.get(dice_sum + face, 0) +
+                    prob * face_prob)
+        distribution = next_distribution
+
+    return tuple((dice_sum, float(prob))
+                 for dice_sum, prob in sorted(distribution.items()) if prob)
+
+def dice_sum_probabilities(num_dice, faces=DEFAULT_FACES, weights=None):
+    """
+    Returns a dict of the probability of rolling each possible sum with
+    num_dice dice, in ascending order of dice sum.
+
+    num_dice (int): how many dice are rolled
+    faces (tuple): numbers shown on the faces of each die (default 1-6)
+    weights (tuple): relative probability of each face, or None if the
+        dice are fair (default None)
+    """
+    return dict(_sum_distribution(num_dice, tuple(faces),
+                                  None if weights is None else tuple(weights)))
 
 class Dice:
     """
     One or more dice used in playing the game.
 
     num_dice (int): how many dice are being used in the game (default 2)
+    faces (sequence): numbers shown on the faces of each die, each an
+        integer >= 1 (default 1-6)
+    weights (sequence): relative probability of rolling each face, or
+        None if the dice are fair (default None)
+    rng: random number generator to roll the dice with, either a
+        random.Random or a numpy.random.Generator, or None to use the
+        global random module (default None). Faces are generated in bulk
+        and buffered when a generator is supplied.
     """
 
-    def __init__(self, num_dice=2):
+    # how many faces to generate at once when buffering
+    buffer_size = 1024
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, num_dice=2, faces=DEFAULT_FACES, weights=None,
+                 rng=None):
         if not (isinstance(num_dice, int) and num_dice >= 1):
             raise ValueError('num_dice must be an integer >= 1')
 
+        faces = tuple(faces)
+        if not faces or not all(isinstance(face, int) and face >= 1
+                                for face in faces):
+            raise ValueError('faces must be one or more integers >= 1')
+
+        if weights is not None:
+            weights = tuple(weights)
+            if (len(weights) != len(faces) or
+                    any(weight < 0 for weight in weights) or
+                    not sum(weights) > 0):
+                raise ValueError('weights must be one non-negative number ' +
+                                 'per face, with a positive sum')
+
         self.num_dice = num_dice
+        self.faces = faces
+        self.weights = weights
+
+        self.rng = rng
+        self._buffer = []
+        self._buffer_index = 0
+
+    def _generate_faces(self, count):
+        """
+        Returns count faces generated by rng in one call, as a list for a
+        random.Random or an array for a numpy Generator.
+        """
+        rng = random if self.rng is None else self.rng
+        if hasattr(rng, 'integers'): # numpy Generator
+            if self.weights is None:
+                return rng.choice(self.faces, size=count)
+            total_weight = sum(self.weights)
+            return rng.choice(self.faces, size=count,
+                              p=[w / total_weight for w in self.weights])
+        return rng.choices(self.faces, self.weights, k=count)
+
+    def _fill_buffer(self):
+        faces = self._generate_faces(self.buffer_size)
+        # use Python ints so that roll() always returns an int
+        self._buffer = faces.tolist() if hasattr(faces, 'tolist') else faces
+        self._buffer_index = 0
+
+    def roll_many(self, count, roll_dice=None):
+        """
+        Roll the dice count times and return an array of the sums: a
+        numpy array if rng is a numpy Generator, otherwise an
+        array.array.
+
+        count (int): how many times to roll
+        roll_dice (int): how many dice to roll each time (default all)
+        """
+        if roll_dice is None:
+            roll_dice = self.num_dice
+        if not (isinstance(count, int) and count >= 0):
+            raise ValueError('count must be an integer >= 0')
+        if (not isinstance(roll_dice, int) or roll_dice < 1 or
+                roll_dice > self.num_dice):
+            raise ValueError('roll_dice must be an integer between 1 and ' +
+                             '{}'.format(self.num_dice))
+
+        faces = self._generate_faces(count * roll_dice)
+        if hasattr(faces, 'reshape'):
+            return faces.reshape(count, roll_dice).sum(axis=1)
+        return array.array('l', [sum(faces[i:i + roll_dice]) for i in
+                                 range(0, count * roll_dice, roll_dice)])
+
+    def sum_probabilities(self, roll_dice=None):
+        """
+        Returns a dict of the probability of rolling each possible sum,
+        in ascending order of dice sum.
+
+        roll_dice (int): how many dice would be rolled (default all)
+        """
+        if roll_dice is None:
+            roll_dice = self.num_dice
+        return dice_sum_probabilities(roll_dice, self.faces, self.weights)
+
+    def max_total(self, roll_dice=None):
+        """
+        Returns the highest possible sum.
+
+        roll_dice (int): how many dice would be rolled (default all)
+        """
+        if roll_dice is None:
+            roll_dice = self.num_dice
+        return roll_dice * max(self.faces)
 
     def roll(self, roll_dice=None):
         """
@@ -35,7 +180,19 @@ class Dice:
             raise ValueError('roll_dice must be an integer between 1 and ' +
                              '{}'.format(self.num_dice))
 
+        if self.rng is not None:
+            total = 0
+            for _ in range(0, roll_dice):
+                if self._buffer_index >= len(self._buffer):
+                    self._fill_buffer()
+                total += self._buffer[self._buffer_index]
+                self._buffer_index += 1
+            return total
+
+        if self.weights is not None:
+            return sum(random.choices(self.faces, self.weights, k=roll_dice))
+
         total = 0
         for _ in range(0, roll_dice):
-            total += random.randint(1, 6)
+            total += random.choice(self.faces)
         return total
@@ -0,0 +1,224 @@
+"""
+Compare flap decision methods over every situation which can arise
+during a turn, optionally spread across a pool of processes, and measure
+the cost of each disagreement using the optimal strategy's expected
+scores.
+"""
+
+import itertools
+import os
+
+from .bill import DEFAULT_BILL_FILENAME
+from .box import Box, mask_from_flap_nums
+from .dice import Dice
+from .computerturn import ComputerTurn
+from .solver import solve
+
+def get_dice_counts(turn):
+    """
+    Returns a tuple of how many dice may be rolled with the box in its
+    current state.
+
+    turn (ComputerTurn)
+    """
+    if (turn.dice.num_dice != 1 and
+            turn.box.sum_available_flaps() <= turn.max_flap_sum_single_die):
+        return (1, turn.dice.num_dice)
+    return (turn.dice.num_dice,)
+
+def compare_chunk(up_masks, flap_decisions, num_dice_decision, num_flaps,
+                  num_dice, bill_filename=DEFAULT_BILL_FILENAME):
+    """
+    Compare the named flap decision methods with each of the supplied
+    states of the box raised. Return a tuple of the number of situations
+    compared and a list of the situations in which the methods disagree,
+    each a tuple of (up_mask, dice rolled, dice total, decisions), where
+    decisions is a tuple of the flap numbers chosen by each method in
+    ascending order. Defined at module level so that it can be run in a
+    worker process.
+    """
+    turn = ComputerTurn(Box(num_flaps), Dice(num_dice), bill_filename)
+    methods = [turn.get_flap_decision_method(name) for name in flap_decisions]
+    num_dice_decision_method = turn.get_num_dice_decision_method(
+        num_dice_decision)
+
+    num_situations = 0
+    disagreements = []
+    for up_mask in up_masks:
+        turn.box.set_up_mask(up_mask)
+        # decisions depend only on the dice total, not how many dice were
+        # rolled, so make them once for each total
+        decisions_by_total = {}
+        for dice_rolled in get_dice_counts(turn):
+            for dice_total in sorted(turn.dice.sum_probabilities(dice_rolled)):
+                if not turn.get_moves(dice_total):
+                    continue
+                num_situations += 1
+                if dice_total not in decisions_by_total:
+                    decisions_by_total[dice_total] = tuple(
+                        tuple(sorted(method(dice_total,
+                                            num_dice_decision_method)))
+                        for method in methods)
+                decisions = decisions_by_total[dice_total]
+                if len(set(decisions)) > 1:
+                    disagreements.append(
+                        (up_mask, dice_rolled, dice_total, decisions))
+    turn.box.reset()
+
+    return num_situations, disagreements
+
+class DecisionDifferences:
+    """
+    The result of compare_decisions(): where a number of flap decision
+    methods disagree and what it costs.
+
+    flap_decisions (tuple): names of the methods compared
+    num_situations (int): how many situations (state of the box, number
+        of dice rolled and dice total with at least one legal move) were
+        compared
+    disagreements (list): tuples of (up_mask, dice rolled, dice total,
+        decisions) for situations where the methods disagree, where
+        decisions is a tuple of the flap numbers chosen by each method
+    expected_scores (list): expected final score under optimal play for
+        each up_mask, used to measure the cost of decisions
+    """
+
+    def __init__(self, flap_decisions, num_situations, disagreements,
+                 expected_scores):
+        self.flap_decisions = tuple(flap_decisions)
+        self.num_situations = num_situations
+        self.disagreements = disagreements
+        self.expected_scores = expected_scores
+
+    def decision_cost(self, up_mask, flap_nums):
+        """
+        Returns the expected final score under optimal play after
+        lowering the supplied flaps with the box in the supplied state.
+
+        up_mask (int)
+        flap_nums (iterable)
+        """
+        return self.expected_scores[up_mask & ~mask_from_flap_nums(flap_nums)]
+
+    def get_disagreement_matrix(self):
+        """
+        Returns a list of lists whose [a][b] element is the number of
+        situations in which methods a and b disagree.
+        """
+        size = len(self.flap_decisions)
+        matrix = [[0] * size for _ in range(0, size)]
+        for _, _, _, decisions in self.disagreements:
+            for a, b in itertools.permutations(range(0, size), 2):
+                if decisions[a] != decisions[b]:
+                    matrix[a][b] += 1
+        return matrix
+
+    def get_cost_matrix(self):
+        """
+        Returns a list of lists whose [a][b] element is the total
+        increase in expected final score from using method a rather
+        than method b, over the situations in which they disagree. A
+        negative value means that method a is better.
+        """
+        size = len(self.flap_decisions)
+        matrix = [[0.0] * size for _ in range(0, size)]
+        for up_mask, _, _, decisions in self.disagreements:
+            costs = [self.decision_cost(up_mask, flap_nums)
+                     for flap_nums in decisions]
+            for a, b in itertools.permutations(range(0, size), 2):
+                matrix[a][b] += costs[a] - costs[b]
+        return matrix
+
+    def get_mean_cost_matrix(self):
+        """
+        Returns a list of lists whose [a][b] element is the mean increase
+        in expected final score from using method a rather than method b
+        in a situation in which they disagree, or 0 if they never do.
+        """
+        return [[cost / count if count else 0.0
+                 for cost, count in zip(cost_row, count_row)]
+                for cost_row, count_row in zip(
+                    self.get_cost_matrix(), self.get_disagreement_matrix())]
+
+    def __str__(self):
+        width = max(len(name) for name in self.flap_decisions) + 2
+        lines = ['Situations: {}'.format(self.num_situations),
+                 'Disagreements: {}'.format(len(self.disagreements))]
+        for title, matrix, cell in [
+                ('Disagreements', self.get_disagreement_matrix(),
+                 '{:>{width}d}'),
+                ('Mean cost per disagreement (expected score of row minus ' +
+                 'column)', self.get_mean_cost_matrix(), '{:>{width}.4f}')]:
+            lines.append('\n' + title)
+            lines.append(' ' * width + ''.join(
+                '{:>{width}}'.format(name, width=width)
+                for name in self.flap_decisions))
+            for name, row in zip(self.flap_decisions, matrix):
+                lines.append('{:<{width}}'.format(name, width=width) + ''.join(
+                    cell.format(value, width=width) for value in row))
+        return '\n'.join(lines)
+
+def compare_decisions(flap_decisions, num_dice_decision='one_if_poss',
+                      num_flaps=9, num_dice=2, workers=1,
+                      bill_filename=DEFAULT_BILL_FILENAME):
+    """
+    Compare two or more flap decision methods in every state of the box,
+    for every number of dice which may be rolled and every possible dice
+    total, and return a DecisionDifferences.
+
+    flap_decisions (list): names of flap decision methods e.g.
+        ['highest', 'next_roll_probability']
+    num_dice_decision (str): name of the num dice decision method which
+        the flap decision methods assume will be used for the next roll
+        (default 'one_if_poss')
+    num_flaps (int): how many flaps the box has (default 9)
+    num_dice (int): how many dice are being used (default 2)
+    workers (int): how many processes to use, or None for one per CPU
+        (default 1 i.e. run in this process)
+    bill_filename (str): Durango Bill's strategy file, used by 'bill'
+    """
+    flap_decisions = tuple(flap_decisions)
+    if len(flap_decisions) < 2:
+        raise ValueError('At least two flap decision methods are required')
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if not (isinstance(workers, int) and workers >= 1):
+        raise ValueError('workers must be an integer >= 1')
+
+    # check the decision methods exist before starting any workers
+    turn = ComputerTurn(Box(num_flaps), Dice(num_dice), bill_filename)
+    for name in flap_decisions:
+        turn.get_flap_decision_method(name)
+    turn.get_num_dice_decision_method(num_dice_decision)
+
+    # interleave states between chunks so that each has a similar mix of
+    # easy (few flaps up) and hard states
+    up_masks = range(1, turn.box.full_mask + 1)
+    num_chunks = min(workers * 4, len(up_masks)) if workers > 1 else 1
+    chunk_args = [
+        [up_masks[index::num_chunks] for index in range(0, num_chunks)],
+        [flap_decisions] * num_chunks,
+        [num_dice_decision] * num_chunks,
+        [num_flaps] * num_chunks,
+        [num_dice] * num_chunks,
+        [bill_filename] * num_chunks,
+    ]
+
+    if num_chunks == 1:
+        results = list(map(compare_chunk, *chunk_args))
+    else:
+        # imported here as it's slow to import and not needed by
+        # single-process runs
+        # pylint: disable=import-outside-toplevel
+        import concurrent.futures
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers) as executor:
+            results = list(executor.map(compare_chunk, *chunk_args))
+
+    num_situations = sum(result[0] for result in results)
+    disagreements = sorted(itertools.chain.from_iterable(
+        result[1] for result in results), key=lambda item: item[:3])
+
+    strategy = solve(num_flaps, num_dice, turn.max_flap_sum_single_die)
+    return DecisionDifferences(flap_decisions, num_situations, disagreements,
+                               strategy.expected_scores)
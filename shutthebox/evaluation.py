@@ -0,0 +1,79 @@
+"""
+Exact evaluation of the computer's decision methods, by walking every
+reachable state of the box with the exact dice sum probabilities
+instead of simulating turns.
+"""
+
+def score_distribution(turn, flap_decision_method=None,
+                       num_dice_decision_method=None):
+    """
+    Returns a dict of the exact probability of each final score of a
+    turn played with the supplied decision methods, in ascending order
+    of score. Scores which can't occur are omitted. The state of turn's
+    box is restored afterwards.
+
+    turn: instance of ComputerTurn to which the decision methods belong
+    flap_decision_method (method): used in deciding which flaps to
+        lower, default make_flap_decision_next_roll_probability
+    num_dice_decision_method (method): used in deciding how many dice
+        to roll, default make_num_dice_decision_one_if_poss
+    """
+    if num_dice_decision_method is None:
+        num_dice_decision_method = turn.make_num_dice_decision_one_if_poss
+    if flap_decision_method is None:
+        flap_decision_method = turn.make_flap_decision_next_roll_probability
+
+    box = turn.box
+
+    # probability of reaching each state of the box, keyed by up_mask
+    state_probabilities = {box.full_mask: 1.0}
+    score_probabilities = {}
+
+    original_up_mask = box.up_mask
+    try:
+        # lowering flaps always clears bits, so all the ways into a state
+        # have been counted by the time we reach it in descending order
+        for up_mask in range(box.full_mask, -1, -1):
+            state_prob = state_probabilities.pop(up_mask, 0)
+            if not state_prob:
+                continue
+            box.set_up_mask(up_mask)
+
+            if up_mask == 0:
+                score_probabilities[0] = (
+                    score_probabilities.get(0, 0) + state_prob)
+                continue
+
+            # as in ComputerTurn.perform_roll
+            if (num_dice_decision_method() == 1 and
+                    box.up_sum <= turn.max_flap_sum_single_die):
+                dice_sum_probabilities = turn.single_die_sum_probabilities
+            else:
+                dice_sum_probabilities = turn.dice_sum_probabilities
+
+            for dice_total, dice_prob in dice_sum_probabilities.items():
+                prob = state_prob * dice_prob
+                flap_nums = flap_decision_method(
+                    dice_total, num_dice_decision_method)
+                if not flap_nums: # turn ends with this score
+                    score_probabilities[box.up_sum] = (
+                        score_probabilities.get(box.up_sum, 0) + prob)
+                    continue
+                next_up_mask = up_mask
+                for this_flap_num in flap_nums:
+                    next_up_mask ^= 1 << (this_flap_num - 1)
+                state_probabilities[next_up_mask] = (
+                    state_probabilities.get(next_up_mask, 0) + prob)
+    finally:
+        box.set_up_mask(original_up_mask)
+
+    return dict(sorted(score_probabilities.items()))
+
+def expected_score(distribution):
+    """
+    Returns the expected score from a dict of score probabilities e.g.
+    from score_distribution().
+
+    distribution (dict)
+    """
+    return sum(score * prob for score, prob in distribution.items())
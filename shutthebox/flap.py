@@ -9,20 +9,38 @@ class Flap:
     One of the flaps on the box. They start raised and can be lowered.
 
     number (int): the number shown on the flap
+    box: instance of Box which holds the state of this flap, or None
+        for a free-standing flap (default None)
     """
 
-    def __init__(self, number):
+    def __init__(self, number, box=None):
         if not (isinstance(number, int) and number >= 1):
             raise ValueError('number must be an integer >= 1')
 
         self.number = number
-        self.is_down = False
+        self.bit = 1 << (number - 1)
+        self.box = box
+        self._is_down = False
+
+    @property
+    def is_down(self):
+        """
+        Whether this flap is down. For a flap belonging to a box, this
+        is read from the box's state.
+        """
+        if self.box is None:
+            return self._is_down
+        return not self.box.up_mask & self.bit
 
     def lower(self):
         """
         Lower this flap.
         """
 
-        if self.is_down:
+        if self.box is not None:
+            self.box.lower_flap(self.number)
+            return
+
+        if self._is_down:
             raise RuntimeError('Trying to lower a flap that is already down')
-        self.is_down = True
+        self._is_down = True
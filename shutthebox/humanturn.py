@@ -6,16 +6,25 @@ from .turn import Turn
 
 class HumanTurn(Turn):
     """
-    A subclass of Turn to represent turns taken by a human player.
+    A subclass of Turn to represent turns taken by a human player. The
+    turn is played by a HumanSession, which perform_turn() drives from
+    the command line.
+
+    box: instance of Box class to use for this turn
+    dice: instance of Dice class to use for this turn
+    output (function): called with each message explaining why the
+        player's input is invalid (default print)
     """
 
-    # __init__ inherited from Turn
+    def __init__(self, box, dice, output=print):
+        super(HumanTurn, self).__init__(box, dice)
+        self.output = output
 
     def check_num_dice_decision(self, string):
         """
         Check player's input for how many dice they want to use. Return
         number of dice (int) if valid and False if invalid, printing a
-        reason if invalid.
+        reason if invalid using the output function.
 
         string (str): number of dice chosen
         """
@@ -31,19 +40,20 @@ class HumanTurn(Turn):
         try:
             dice_requested = int(string)
         except ValueError:
-            print(msg_invalid)
+            self.output(msg_invalid)
             return False
 
         # invalid number of dice
         if dice_requested < 1 or dice_requested > self.dice.num_dice:
-            print(msg_invalid)
+            self.output(msg_invalid)
             return False
 
         # single die chosen but not allowed
         if (dice_requested == 1 and
                 self.box.sum_available_flaps() > self.max_flap_sum_single_die):
-            print('You can only use a single die when the flap numbers add ' +
-                  'up to {} or less'.format(self.max_flap_sum_single_die))
+            self.output('You can only use a single die when the flap ' +
+                        'numbers add up to {} or less'.format(
+                            self.max_flap_sum_single_die))
             return False
 
         return dice_requested
@@ -51,8 +61,8 @@ class HumanTurn(Turn):
     def check_flaps_decision(self, string, dice_total):
         """
         Check player's input for which flaps to lower. Return True if
-        valid and False if invalid, printing a reason if invalid. Raise
-        ValueError if string is not a str.
+        valid and False if invalid, printing a reason if invalid using
+        the output function. Raise ValueError if string is not a str.
 
         string (str): player's input
         dice_total (int): sum of dice
@@ -71,77 +81,61 @@ class HumanTurn(Turn):
                 if int(this_string) not in flap_nums:
                     flap_nums.append(int(this_string))
             except ValueError:
-                print('{} is not a valid flap number'.format(this_string))
+                self.output(
+                    '{} is not a valid flap number'.format(this_string))
                 return False
 
         for this_flap_num in flap_nums:
             if not this_flap_num in self.box.flaps.keys():
-                print('{} is not a valid flap number'.format(this_flap_num))
+                self.output(
+                    '{} is not a valid flap number'.format(this_flap_num))
                 return False
             if self.box.flaps[this_flap_num].is_down:
-                print('Flap {} is already down'.format(this_flap_num))
+                self.output('Flap {} is already down'.format(this_flap_num))
                 return False
 
         if flap_nums and sum(flap_nums) != dice_total:
-            print('Flaps chosen do not add up to dice total')
+            self.output('Flaps chosen do not add up to dice total')
             return False
 
         return flap_nums
 
-    def perform_roll(self): # pragma: no cover
+    def _play_session(self, **kwargs):
         """
-        Perform a dice roll and lower flaps based on the player's
-        decisions.
+        Play a HumanSession of this turn with input() and print(),
+        returning the finished session.
+
+        kwargs: keyword arguments for HumanSession
         """
-        print(self.box, '\n')
-
-        # if flap sum <= max_flap_sum_single_die, ask how many dice to roll
-        if self.box.sum_available_flaps() <= self.max_flap_sum_single_die:
-            while True: # until we get a valid response
-                num_dice_input = input(
-                    'How many dice would you like to roll? (between ' +
-                    '1 and {}) '.format(self.dice.num_dice))
-                num_dice = self.check_num_dice_decision(num_dice_input)
-                if num_dice:
-                    break
-        else: # use all dice
-            num_dice = self.dice.num_dice
-
-        dice_total = self.dice.roll(num_dice)
-        print('Dice total:', dice_total)
-
-        while True: # until we get a list of flap nums or empty list
-            flaps_input = input(
-                'Which flaps would you like to lower?\n' +
-                '(Separate with spaces and leave blank for none) ')
-            flap_nums = self.check_flaps_decision(flaps_input, dice_total)
-            if isinstance(flap_nums, list):
-                if flap_nums:
-                    break
-                else: # empty list i.e. no flaps
-                    return False
-
-        # lower flaps
-        for this_flap_num in flap_nums:
-            self.box.flaps[this_flap_num].lower()
+        # imported here as the session module imports this one
+        # pylint: disable=import-outside-toplevel
+        from .session import HumanSession
 
-        print()
-        return True
+        output = self.output
+        session = HumanSession(self, **kwargs)
+        try:
+            text = session.start()
+            while not session.finished:
+                text = session.handle_input(input(text))
+        finally:
+            self.output = output # the session replaced it
+        print(text, end='')
+        return session
+
+    def perform_roll(self):
+        """
+        Perform a dice roll on the command line and lower flaps based on
+        the player's decisions. Returns True if any flaps were lowered,
+        otherwise False.
+        """
+        up_mask = self.box.up_mask
+        self._play_session(play_again=False, single_roll=True)
+        return self.box.up_mask != up_mask
 
-    def perform_turn(self): # pragma: no cover
+    def perform_turn(self):
         """
-        Performs this turn and returns the resulting score i.e. sum of
-        flap numbers.
+        Performs this turn on the command line, reading the player's
+        decisions with input(), and returns the resulting score i.e. sum
+        of flap numbers.
         """
-        while self.box.sum_available_flaps() > 0 and self.perform_roll():
-            pass
-
-        print()
-        score = self.box.sum_available_flaps()
-        if score == 0:
-            print('You have lowered all the flaps and shut the box. Well done!')
-        else:
-            print('Your score was', score)
-
-        self.box.__init__() # re-initialise our box with all flaps up
-        return score
+        return self._play_session(play_again=False).scores[-1]
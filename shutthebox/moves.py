@@ -0,0 +1,345 @@
+"""
+Defines the MoveIndex class of shutthebox, which holds the legal moves
+for every state of a box and every dice total, and the SubsetSumMoves
+class, which finds them when needed for boxes too large to index.
+"""
+
+import functools
+import itertools
+
+from .box import flap_nums_from_mask
+
+# boxes with more flaps than this use SubsetSumMoves, since the size of a
+# MoveIndex and the time taken to build it grow exponentially
+MAX_INDEXED_FLAPS = 9
+
+# how many states' moves and success probabilities SubsetSumMoves keeps
+SUBSET_SUM_CACHE_SIZE = 65536
+
+class MoveIndex:
+    """
+    A precomputed index of the combinations of flaps which could be
+    lowered for each set of up flaps and each dice total. Build it using
+    get_move_index() so that it is only built once per box size.
+
+    Each combination is a tuple of flap numbers in descending order and
+    the combinations for a state are ordered by number of flaps and
+    then by preference for higher-numbered flaps, as they would be
+    found by itertools.combinations over the up flaps sorted in
+    descending order.
+
+    num_flaps (int): how many flaps the box has
+    """
+
+    def __init__(self, num_flaps):
+        if not (isinstance(num_flaps, int) and num_flaps >= 1):
+            raise ValueError('num_flaps must be an integer >= 1')
+
+        self.num_flaps = num_flaps
+        # no dice total above the sum of all flaps can ever be made
+        self.max_total = num_flaps * (num_flaps + 1) // 2
+
+        # moves[up_mask][dice_total]: tuple of combinations
+        # highest/lowest[up_mask][dice_total]: tuple of flap numbers in
+        #   ascending order, or None if no flaps can be lowered
+        self.moves = []
+        self.highest = []
+        self.lowest = []
+
+        for up_mask in range(0, 1 << num_flaps):
+            flap_nums = list(flap_nums_from_mask(up_mask))
+            flap_nums.reverse()
+
+            moves = [[] for _ in range(0, self.max_total + 1)]
+            for length in range(1, len(flap_nums) + 1):
+                for this_combination in itertools.combinations(
+                        flap_nums, length):
+                    moves[sum(this_combination)].append(this_combination)
+
+            self.moves.append([tuple(combinations) for combinations in moves])
+            self.highest.append([self._choose_highest(combinations)
+                                 for combinations in moves])
+            self.lowest.append([self._choose_lowest(combinations)
+                                for combinations in moves])
+
+    @staticmethod
+    def _choose_highest(combinations):
+        """
+        Returns the first combination (i.e. fewest, highest-numbered
+        flaps) as an ascending tuple, or None if there are none.
+        """
+        if not combinations:
+            return None
+        return tuple(reversed(combinations[0]))
+
+    @staticmethod
+    def _choose_lowest(combinations):
+        """
+        Returns the combination with the most flaps, preferring
+        lower-numbered flaps, as an ascending tuple, or None if there
+        are none.
+        """
+        if not combinations:
+            return None
+        most_flaps = max(len(c) for c in combinations)
+        return min(tuple(sorted(c)) for c in combinations
+                   if len(c) == most_flaps)
+
+    def get_moves(self, up_mask, dice_total):
+        """
+        Returns a tuple of the combinations of flaps which sum to the
+        dice total, which is empty if no flaps can be lowered.
+
+        up_mask (int): bitmask of the flaps which are up
+        dice_total (int): sum of dice rolled
+        """
+        if not 0 < dice_total <= self.max_total:
+            return ()
+        return self.moves[up_mask][dice_total]
+
+    def get_highest(self, up_mask, dice_total):
+        """
+        Returns the combination preferring higher-numbered flaps as an
+        ascending list, or False if no flaps can be lowered.
+
+        up_mask (int): bitmask of the flaps which are up
+        dice_total (int): sum of dice rolled
+        """
+        if not 0 < dice_total <= self.max_total:
+            return False
+        choice = self.highest[up_mask][dice_total]
+        return list(choice) if choice else False
+
+    def get_lowest(self, up_mask, dice_total):
+        """
+        Returns the combination preferring lower-numbered flaps as an
+        ascending list, or False if no flaps can be lowered.
+
+        up_mask (int): bitmask of the flaps which are up
+        dice_total (int): sum of dice rolled
+        """
+        if not 0 < dice_total <= self.max_total:
+            return False
+        choice = self.lowest[up_mask][dice_total]
+        return list(choice) if choice else False
+
+def _reachable_sums(flap_nums, max_total):
+    """
+    Returns an integer bitset in which bit s is set if some combination
+    of flap_nums sums to s, for s up to max_total.
+    """
+    limit = (1 << (max_total + 1)) - 1
+    reachable = 1
+    for flap_num in flap_nums:
+        if flap_num <= max_total:
+            reachable = (reachable | reachable << flap_num) & limit
+    return reachable
+
+class SubsetSumMoves:
+    """
+    Finds the combinations of flaps which could be lowered for a set of
+    up flaps and a dice total when they are requested, with the same
+    interface and ordering as MoveIndex. Only flaps no greater than the
+    dice total are considered and branches which can't reach the total
+    are pruned using subset-sum bitsets, so the work depends on the dice
+    total rather than the number of flaps. Recent results are cached.
+
+    num_flaps (int): how many flaps the box has
+    """
+
+    def __init__(self, num_flaps):
+        if not (isinstance(num_flaps, int) and num_flaps >= 1):
+            raise ValueError('num_flaps must be an integer >= 1')
+
+        self.num_flaps = num_flaps
+        self.max_total = num_flaps * (num_flaps + 1) // 2
+
+        # cached per instance, which get_move_index() shares per box size
+        self._find_moves = functools.lru_cache(
+            maxsize=SUBSET_SUM_CACHE_SIZE)(self._find_moves)
+
+    def _find_moves(self, up_mask, dice_total):
+        # candidate flaps in descending order, as MoveIndex considers them
+        flap_nums = [flap_num for flap_num in reversed(
+            flap_nums_from_mask(up_mask)) if flap_num <= dice_total]
+
+        # suffix_reachable[i]: sums up to dice_total which flap_nums[i:]
+        # can make
+        limit = (1 << (dice_total + 1)) - 1
+        suffix_reachable = [1] * (len(flap_nums) + 1)
+        for index in range(len(flap_nums) - 1, -1, -1):
+            following = suffix_reachable[index + 1]
+            suffix_reachable[index] = (
+                following | following << flap_nums[index]) & limit
+        if not suffix_reachable[0] >> dice_total & 1:
+            return ()
+
+        moves = []
+
+        def extend(start, remaining, length, chosen):
+            if length == 0:
+                if remaining == 0:
+                    moves.append(tuple(chosen))
+                return
+            for index in range(start, len(flap_nums) - length + 1):
+                flap_num = flap_nums[index]
+                rest = remaining - flap_num
+                if rest < 0 or not suffix_reachable[index + 1] >> rest & 1:
+                    continue
+                chosen.append(flap_num)
+                extend(index + 1, rest, length - 1, chosen)
+                chosen.pop()
+
+        # by number of flaps, then in the order of itertools.combinations
+        for length in range(1, len(flap_nums) + 1):
+            extend(0, dice_total, length, [])
+
+        return tuple(moves)
+
+    def clear_cache(self):
+        """
+        Forget the moves found so far.
+        """
+        self._find_moves.cache_clear()
+
+    def get_moves(self, up_mask, dice_total):
+        """
+        Returns a tuple of the combinations of flaps which sum to the
+        dice total, which is empty if no flaps can be lowered.
+
+        up_mask (int): bitmask of the flaps which are up
+        dice_total (int): sum of dice rolled
+        """
+        if not 0 < dice_total <= self.max_total:
+            return ()
+        return self._find_moves(up_mask, dice_total)
+
+    def get_highest(self, up_mask, dice_total):
+        """
+        Returns the combination preferring higher-numbered flaps as an
+        ascending list, or False if no flaps can be lowered.
+
+        up_mask (int): bitmask of the flaps which are up
+        dice_total (int): sum of dice rolled
+        """
+        # pylint: disable=protected-access
+        choice = MoveIndex._choose_highest(self.get_moves(up_mask, dice_total))
+        return list(choice) if choice else False
+
+    def get_lowest(self, up_mask, dice_total):
+        """
+        Returns the combination preferring lower-numbered flaps as an
+        ascending list, or False if no flaps can be lowered.
+
+        up_mask (int): bitmask of the flaps which are up
+        dice_total (int): sum of dice rolled
+        """
+        # pylint: disable=protected-access
+        choice = MoveIndex._choose_lowest(self.get_moves(up_mask, dice_total))
+        return list(choice) if choice else False
+
+@functools.lru_cache(maxsize=None)
+def get_move_index(num_flaps):
+    """
+    Returns the MoveIndex for a box with num_flaps flaps, building it
+    the first time it is requested, or a SubsetSumMoves if the box has
+    more than MAX_INDEXED_FLAPS flaps.
+
+    num_flaps (int): how many flaps the box has
+    """
+    if num_flaps > MAX_INDEXED_FLAPS:
+        return SubsetSumMoves(num_flaps)
+    return MoveIndex(num_flaps)
+
+@functools.lru_cache(maxsize=None)
+def get_reachable_sums(num_flaps):
+    """
+    Returns a list indexed by up_mask of integer bitsets in which bit s
+    is set if some combination of the up flaps sums to s (bit 0, the
+    empty combination, is always set). Built in one pass over all the
+    states of a box with num_flaps flaps.
+
+    num_flaps (int): how many flaps the box has
+    """
+    reachable_sums = [1] * (1 << num_flaps)
+    for up_mask in range(1, 1 << num_flaps):
+        # up_mask is the state without its lowest flap plus that flap
+        without_lowest = up_mask & (up_mask - 1)
+        lowest_flap_num = (up_mask ^ without_lowest).bit_length()
+        reachable_sums[up_mask] = (reachable_sums[without_lowest] |
+                                   reachable_sums[without_lowest] <<
+                                   lowest_flap_num)
+    return reachable_sums
+
+@functools.lru_cache(maxsize=None)
+def _success_probabilities(num_flaps, dice_sum_probabilities):
+    reachable_sums = get_reachable_sums(num_flaps)
+    success_probabilities = []
+    for reachable in reachable_sums:
+        prob = 0
+        # in ascending order of dice sum
+        for dice_sum, dice_prob in dice_sum_probabilities:
+            if reachable >> dice_sum & 1:
+                prob += dice_prob
+        success_probabilities.append(prob)
+    return success_probabilities
+
+class SubsetSumSuccessProbabilities:
+    """
+    The probability that at least one flap could be lowered after
+    rolling the dice, indexed by up_mask like the list returned by
+    get_success_probabilities() but computed when needed from the
+    subset sums of the up flaps up to the highest dice sum, for boxes
+    too large to tabulate. Recent results are cached.
+
+    dice_sum_probabilities (tuple): pairs of dice sum and probability in
+        ascending order of dice sum
+    """
+
+    def __init__(self, dice_sum_probabilities):
+        self.dice_sum_probabilities = dice_sum_probabilities
+        self.max_dice_sum = max(dice_sum for dice_sum, _ in
+                                dice_sum_probabilities)
+        self._lookup = functools.lru_cache(
+            maxsize=SUBSET_SUM_CACHE_SIZE)(self._calculate)
+
+    def _calculate(self, up_mask):
+        reachable = _reachable_sums(flap_nums_from_mask(up_mask),
+                                    self.max_dice_sum)
+        prob = 0
+        # in ascending order of dice sum
+        for dice_sum, dice_prob in self.dice_sum_probabilities:
+            if reachable >> dice_sum & 1:
+                prob += dice_prob
+        return prob
+
+    def __getitem__(self, up_mask):
+        return self._lookup(up_mask)
+
+    def clear_cache(self):
+        """
+        Forget the probabilities calculated so far.
+        """
+        self._lookup.cache_clear()
+
+def get_success_probabilities(num_flaps, dice_sum_probabilities):
+    """
+    Returns a list indexed by up_mask of the probability that at least
+    one flap could be lowered after rolling the dice, computed for every
+    state of the box at once and cached, or a
+    SubsetSumSuccessProbabilities if the box has more than
+    MAX_INDEXED_FLAPS flaps.
+
+    num_flaps (int): how many flaps the box has
+    dice_sum_probabilities (dict): probability of rolling each dice sum
+        e.g. from Dice.sum_probabilities()
+    """
+    dice_sum_probabilities = tuple(sorted(dice_sum_probabilities.items()))
+    if num_flaps > MAX_INDEXED_FLAPS:
+        return _subset_sum_success_probabilities(dice_sum_probabilities)
+    return _success_probabilities(num_flaps, dice_sum_probabilities)
+
+@functools.lru_cache(maxsize=None)
+def _subset_sum_success_probabilities(dice_sum_probabilities):
+    # shared by all large boxes, since only the flaps up matter
+    return SubsetSumSuccessProbabilities(dice_sum_probabilities)
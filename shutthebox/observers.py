@@ -0,0 +1,172 @@
+"""
+Defines the TurnObserver class of shutthebox, which receives events from
+ComputerTurn, and some observers which collect statistics or print
+debug information.
+"""
+
+# observers need the same arguments even if they don't use all of them
+# pylint: disable=unused-argument
+# pylint: disable=no-self-use
+
+class TurnObserver:
+    """
+    Base class for objects attached to a ComputerTurn with
+    add_observer(). Override the methods for the events of interest.
+    Nothing is timed or called when no observers are attached.
+    """
+
+    def on_turn_start(self, turn):
+        """
+        Called before the first roll of a turn.
+        """
+
+    def on_roll(self, turn, num_dice, dice_total):
+        """
+        Called after the dice have been rolled.
+
+        num_dice (int): how many dice were rolled
+        dice_total (int): sum of dice rolled
+        """
+
+    def on_decision(self, turn, dice_total, flap_nums, flap_decision_method,
+                    elapsed):
+        """
+        Called after the flap decision method has been used, before any
+        flaps are lowered.
+
+        dice_total (int): sum of dice rolled
+        flap_nums (list): flaps chosen, or False if none can be lowered
+        flap_decision_method (method): method which made the decision
+        elapsed (float): time taken by the decision method in seconds
+        """
+
+    def on_flaps_lowered(self, turn, flap_nums):
+        """
+        Called after flaps have been lowered.
+
+        flap_nums (list): flaps lowered
+        """
+
+    def on_turn_end(self, turn, score, num_rolls):
+        """
+        Called at the end of a turn, before the box is reset.
+
+        score (int): score of the turn
+        num_rolls (int): how many times the dice were rolled
+        """
+
+def _method_name(method):
+    return getattr(method, '__name__', repr(method))
+
+class DebugPrinter(TurnObserver):
+    """
+    Prints what happens during a turn. Used by ComputerTurn when debug
+    is True.
+    """
+
+    def on_turn_start(self, turn):
+        print(turn.box)
+        print('Flap sum:', turn.box.sum_available_flaps())
+
+    def on_roll(self, turn, num_dice, dice_total):
+        # as if a single die was chosen when allowed, even if that's all
+        # the dice
+        if (num_dice == 1 and turn.box.sum_available_flaps() <=
+                turn.max_flap_sum_single_die):
+            print('Rolling single die')
+        else:
+            print('Rolling all dice')
+        print('Dice total:', dice_total)
+
+    def on_decision(self, turn, dice_total, flap_nums, flap_decision_method,
+                    elapsed):
+        if not flap_nums:
+            print('Impossible to lower any flaps')
+        else:
+            print('Lowering flaps:', flap_nums)
+
+    def on_flaps_lowered(self, turn, flap_nums):
+        print('\n', turn.box)
+        print('Flap sum:', turn.box.sum_available_flaps())
+
+class DecisionTimer(TurnObserver):
+    """
+    Collects the number of calls and total time taken by each flap
+    decision method, keyed by method name.
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.total_time = {}
+
+    def on_decision(self, turn, dice_total, flap_nums, flap_decision_method,
+                    elapsed):
+        name = _method_name(flap_decision_method)
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.total_time[name] = self.total_time.get(name, 0) + elapsed
+
+    def mean_time(self, name):
+        """
+        Returns the mean time in seconds of a call of the named decision
+        method, or None if it hasn't been called.
+        """
+        if not self.calls.get(name):
+            return None
+        return self.total_time[name] / self.calls[name]
+
+class CombinationCounter(TurnObserver):
+    """
+    Collects the number of decisions made by each flap decision method
+    and the number of combinations of flaps they had to choose between,
+    keyed by method name.
+    """
+
+    def __init__(self):
+        self.decisions = {}
+        self.combinations = {}
+
+    def on_decision(self, turn, dice_total, flap_nums, flap_decision_method,
+                    elapsed):
+        name = _method_name(flap_decision_method)
+        # the box hasn't changed since the decision was made
+        num_combinations = len(turn.get_moves(dice_total))
+        self.decisions[name] = self.decisions.get(name, 0) + 1
+        self.combinations[name] = (self.combinations.get(name, 0) +
+                                   num_combinations)
+
+    def mean_combinations(self, name):
+        """
+        Returns the mean number of combinations per decision of the named
+        decision method, or None if it hasn't been called.
+        """
+        if not self.decisions.get(name):
+            return None
+        return self.combinations[name] / self.decisions[name]
+
+class TurnLengthCounter(TurnObserver):
+    """
+    Collects a histogram of the number of rolls per turn.
+    """
+
+    def __init__(self):
+        self.histogram = {}
+
+    def on_turn_end(self, turn, score, num_rolls):
+        self.histogram[num_rolls] = self.histogram.get(num_rolls, 0) + 1
+
+    @property
+    def num_turns(self):
+        """
+        How many turns have ended.
+        """
+        return sum(self.histogram.values())
+
+    @property
+    def mean_length(self):
+        """
+        Mean number of rolls per turn, or None if no turns have ended.
+        """
+        if not self.histogram:
+            return None
+        return (sum(length * freq for length, freq in self.histogram.items()) /
+                self.num_turns)
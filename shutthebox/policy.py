@@ -0,0 +1,301 @@
+"""
+Defines the PolicyTable class of shutthebox and the tabulate_policy()
+function, which records the decisions made by a pair of ComputerTurn
+decision methods for every state of the box, and functions to compile
+these tables to small binary files and memory-map them again.
+"""
+
+import array
+import hashlib
+import mmap
+import struct
+import sys
+
+from .box import flap_nums_from_mask, mask_from_flap_nums
+from .dice import DEFAULT_FACES
+
+# magic, format version, num_flaps, num_dice, max_flap_sum_single_die,
+# max_dice_total, bytes per move, fingerprint of the dice; followed by one
+# byte per state for the number of dice, padding to a multiple of 8 bytes
+# and then the moves, all little-endian
+POLICY_FILE_HEADER = struct.Struct('<4sHHHHHH8s')
+POLICY_FILE_MAGIC = b'STBP'
+POLICY_FILE_VERSION = 3
+
+def dice_fingerprint(faces=DEFAULT_FACES, weights=None):
+    """
+    Returns 8 bytes identifying the faces of a set of dice and the
+    probability of rolling each, so that a PolicyTable is only used with
+    the dice it was tabulated for.
+
+    faces (sequence): numbers shown on the faces of each die (default
+        1-6)
+    weights (sequence): relative probability of rolling each face, or
+        None if the dice are fair (default None)
+    """
+    if weights is not None:
+        total_weight = sum(weights)
+        weights = tuple(weight / total_weight for weight in weights)
+        if len(set(weights)) == 1: # as fair dice
+            weights = None
+    description = repr((tuple(faces), weights))
+    return hashlib.sha256(description.encode()).digest()[:8]
+
+# pylint: disable=too-few-public-methods
+
+class PolicyTable:
+    """
+    How many dice to roll in each state of the box and which flaps to
+    lower for each state and dice total, stored as flat arrays indexed
+    by up_mask (bit n - 1 set if flap n is up).
+
+    num_flaps (int): how many flaps the box has
+    num_dice (int): how many dice are being used
+    max_flap_sum_single_die (int): max sum of flap numbers to be allowed
+        to roll a single die
+    max_dice_total (int): highest possible sum of all the dice (default
+        6 * num_dice)
+    fingerprint (bytes): dice_fingerprint() of the dice (default that of
+        fair six-sided dice)
+    num_dice_choices (array): how many dice to roll for each up_mask
+    moves (array): bitmask of the flaps to lower for each up_mask and
+        dice total, at index up_mask * (max_dice_total + 1) + dice_total,
+        or 0 if no flaps can be lowered
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, num_flaps, num_dice, max_flap_sum_single_die,
+                 max_dice_total=None, num_dice_choices=None, moves=None,
+                 fingerprint=None):
+        self.num_flaps = num_flaps
+        self.num_dice = num_dice
+        self.max_flap_sum_single_die = max_flap_sum_single_die
+        self.num_states = 1 << num_flaps
+        if max_dice_total is None:
+            max_dice_total = 6 * num_dice
+        self.max_dice_total = max_dice_total
+        if fingerprint is None:
+            fingerprint = dice_fingerprint()
+        self.fingerprint = fingerprint
+
+        if num_dice_choices is None:
+            num_dice_choices = array.array('B', bytes(self.num_states))
+        if moves is None:
+            moves = array.array(
+                self.move_typecode(num_flaps),
+                bytes(self.num_states * (self.max_dice_total + 1) *
+                      array.array(self.move_typecode(num_flaps)).itemsize))
+        self.num_dice_choices = num_dice_choices
+        self.moves = moves
+
+    @staticmethod
+    def move_typecode(num_flaps):
+        """
+        Returns the array typecode used to store moves for a box with
+        num_flaps flaps.
+        """
+        if num_flaps > 32:
+            raise ValueError("Can't tabulate a policy for more than 32 " +
+                             'flaps')
+        return 'H' if num_flaps <= 16 else 'I'
+
+    def get_num_dice(self, up_mask):
+        """
+        Returns how many dice to roll.
+
+        up_mask (int): bitmask of the flaps which are up
+        """
+        return self.num_dice_choices[up_mask]
+
+    def get_move_mask(self, up_mask, dice_total):
+        """
+        Returns the bitmask of the flaps to lower, or 0 if no flaps can
+        be lowered.
+
+        up_mask (int): bitmask of the flaps which are up
+        dice_total (int): sum of dice rolled
+        """
+        if not 0 < dice_total <= self.max_dice_total:
+            return 0
+        return self.moves[up_mask * (self.max_dice_total + 1) + dice_total]
+
+    def _check_rules(self, turn):
+        if (turn.box.num_flaps != self.num_flaps or
+                turn.dice.num_dice != self.num_dice or
+                turn.max_flap_sum_single_die != self.max_flap_sum_single_die or
+                turn.dice.max_total() != self.max_dice_total or
+                dice_fingerprint(turn.dice.faces, turn.dice.weights) !=
+                self.fingerprint):
+            raise ValueError("This policy's rules don't match the turn")
+
+    def flap_decision_method(self, turn):
+        """
+        Returns a flap decision method for turn which looks up its
+        decisions in this table, for use like
+        ComputerTurn.make_flap_decision_highest.
+
+        turn: instance of ComputerTurn with the same rules as the table
+        """
+        self._check_rules(turn)
+        box = turn.box
+
+        # flap decision methods need the same arguments even if they don't
+        # use all of them
+        # pylint: disable=unused-argument
+        def make_flap_decision_policy(dice_total,
+                                      num_dice_decision_method=None):
+            move_mask = self.get_move_mask(box.up_mask, dice_total)
+            if not move_mask:
+                return False
+            return list(flap_nums_from_mask(move_mask))
+
+        return make_flap_decision_policy
+
+    def num_dice_decision_method(self, turn):
+        """
+        Returns a num dice decision method for turn which looks up its
+        decisions in this table, for use like
+        ComputerTurn.make_num_dice_decision_one_if_poss.
+
+        turn: instance of ComputerTurn with the same rules as the table
+        """
+        self._check_rules(turn)
+        box = turn.box
+
+        def make_num_dice_decision_policy():
+            return self.num_dice_choices[box.up_mask]
+
+        return make_num_dice_decision_policy
+
+    def save(self, file_path):
+        """
+        Write this table to a binary file which can be memory-mapped by
+        load_policy().
+
+        file_path (str)
+        """
+        moves = array.array(self.moves.typecode, self.moves)
+        if sys.byteorder != 'little': # pragma: no cover
+            moves.byteswap()
+
+        with open(file_path, 'wb') as policy_file:
+            policy_file.write(POLICY_FILE_HEADER.pack(
+                POLICY_FILE_MAGIC, POLICY_FILE_VERSION, self.num_flaps,
+                self.num_dice, self.max_flap_sum_single_die,
+                self.max_dice_total, moves.itemsize, self.fingerprint))
+            policy_file.write(bytes(self.num_dice_choices))
+            policy_file.write(bytes(-self.num_states % 8))
+            policy_file.write(moves.tobytes())
+
+def tabulate_policy(turn, flap_decision_method, num_dice_decision_method):
+    """
+    Returns a PolicyTable recording the decisions made by the supplied
+    decision methods in every state of turn's box. The state of the box
+    is restored afterwards.
+
+    turn: instance of ComputerTurn to which the decision methods belong
+    flap_decision_method (method): used in deciding which flaps to lower
+    num_dice_decision_method (method): used in deciding how many dice to
+        roll
+    """
+    box = turn.box
+    policy = PolicyTable(box.num_flaps, turn.dice.num_dice,
+                         turn.max_flap_sum_single_die,
+                         max_dice_total=turn.dice.max_total(),
+                         fingerprint=dice_fingerprint(turn.dice.faces,
+                                                      turn.dice.weights))
+    width = policy.max_dice_total + 1
+
+    original_up_mask = box.up_mask
+    try:
+        for up_mask in range(0, policy.num_states):
+            box.set_up_mask(up_mask)
+
+            # as in ComputerTurn.perform_roll
+            if (num_dice_decision_method() == 1 and
+                    box.up_sum <= turn.max_flap_sum_single_die):
+                policy.num_dice_choices[up_mask] = 1
+            else:
+                policy.num_dice_choices[up_mask] = turn.dice.num_dice
+
+            if up_mask == 0:
+                continue
+            for dice_total in range(1, policy.max_dice_total + 1):
+                flap_nums = flap_decision_method(
+                    dice_total, num_dice_decision_method)
+                if flap_nums:
+                    policy.moves[up_mask * width + dice_total] = \
+                        mask_from_flap_nums(flap_nums)
+    finally:
+        box.set_up_mask(original_up_mask)
+
+    return policy
+
+def compile_policy(turn, flap_decision_method, num_dice_decision_method,
+                   file_path):
+    """
+    Tabulate the supplied decision methods with tabulate_policy(), write
+    the table to a binary file and return it.
+
+    turn: instance of ComputerTurn to which the decision methods belong
+    flap_decision_method (method): used in deciding which flaps to lower
+    num_dice_decision_method (method): used in deciding how many dice to
+        roll
+    file_path (str)
+    """
+    policy = tabulate_policy(turn, flap_decision_method,
+                             num_dice_decision_method)
+    policy.save(file_path)
+    return policy
+
+def load_policy(file_path, dice=None):
+    """
+    Returns a PolicyTable whose arrays are memory-mapped from a file
+    written by PolicyTable.save() or compile_policy(). Raise ValueError
+    if dice are supplied and the table wasn't tabulated for dice with
+    the same faces and weights.
+
+    file_path (str)
+    dice: instance of Dice the table will be used with (default None
+        i.e. don't check)
+    """
+    with open(file_path, 'rb') as policy_file:
+        # the mapping stays open after the file is closed
+        mapped = mmap.mmap(policy_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapped)
+    if len(view) < POLICY_FILE_HEADER.size:
+        raise ValueError(file_path + ' is not a policy file')
+    (magic, version, num_flaps, num_dice, max_flap_sum_single_die,
+     max_dice_total, move_size,
+     fingerprint) = POLICY_FILE_HEADER.unpack_from(view)
+    if magic != POLICY_FILE_MAGIC:
+        raise ValueError(file_path + ' is not a policy file')
+    if version != POLICY_FILE_VERSION:
+        raise ValueError('Unsupported policy file version ' +
+                         '{}'.format(version))
+    if (dice is not None and
+            dice_fingerprint(dice.faces, dice.weights) != fingerprint):
+        raise ValueError(file_path + " wasn't tabulated for these dice")
+
+    typecode = PolicyTable.move_typecode(num_flaps)
+    if array.array(typecode).itemsize != move_size:
+        raise ValueError('Unexpected move size in ' + file_path)
+
+    num_states = 1 << num_flaps
+    start = POLICY_FILE_HEADER.size
+    num_dice_choices = view[start:start + num_states]
+    start += num_states + (-num_states % 8)
+    moves = view[start:]
+    if len(moves) != num_states * (max_dice_total + 1) * move_size:
+        raise ValueError(file_path + ' is the wrong size for its header')
+    if sys.byteorder == 'little':
+        moves = moves.cast(typecode)
+    else: # pragma: no cover
+        moves = array.array(typecode, moves)
+        moves.byteswap()
+
+    return PolicyTable(num_flaps, num_dice, max_flap_sum_single_die,
+                       max_dice_total=max_dice_total,
+                       num_dice_choices=num_dice_choices, moves=moves,
+                       fingerprint=fingerprint)
@@ -0,0 +1,214 @@
+"""
+Defines the ScoreFileWriter class of shutthebox, which writes the score
+of each turn of a simulation to a compact binary file, and the
+load_scores() function, which memory-maps such a file so that
+statistics can be computed without reading it all into memory.
+"""
+
+import array
+import collections
+import json
+import mmap
+import os
+import struct
+import sys
+
+from .stats import ScoreStats
+
+# magic, format version, bytes per score, bytes of metadata; followed by
+# the metadata as UTF-8 JSON, padding to a multiple of 8 bytes and then
+# the scores, all little-endian
+SCORE_FILE_HEADER = struct.Struct('<4sHHI')
+SCORE_FILE_MAGIC = b'STBS'
+SCORE_FILE_VERSION = 1
+
+# how many scores to count at once when computing statistics
+STATS_BLOCK_SIZE = 1 << 24
+
+def score_typecode(max_score):
+    """
+    Returns the array typecode used to store scores up to max_score:
+    one byte for boxes of up to 22 flaps, otherwise two.
+
+    max_score (int)
+    """
+    if max_score < 1 << 8:
+        return 'B'
+    if max_score < 1 << 16:
+        return 'H'
+    raise ValueError('Scores above 65535 are not supported')
+
+def _max_score(metadata):
+    num_flaps = metadata.get('num_flaps')
+    if not (isinstance(num_flaps, int) and num_flaps >= 1):
+        raise ValueError('metadata must include num_flaps')
+    return num_flaps * (num_flaps + 1) // 2
+
+def _read_header(score_file, file_path):
+    """
+    Returns a tuple of the metadata, score typecode and offset of the
+    first score of an open score file.
+    """
+    header = score_file.read(SCORE_FILE_HEADER.size)
+    if len(header) < SCORE_FILE_HEADER.size:
+        raise ValueError(file_path + ' is not a score file')
+    magic, version, score_size, metadata_size = (
+        SCORE_FILE_HEADER.unpack(header))
+    if magic != SCORE_FILE_MAGIC:
+        raise ValueError(file_path + ' is not a score file')
+    if version != SCORE_FILE_VERSION:
+        raise ValueError('Unsupported score file version ' +
+                         '{}'.format(version))
+
+    metadata = json.loads(score_file.read(metadata_size).decode())
+    typecode = score_typecode(_max_score(metadata))
+    if array.array(typecode).itemsize != score_size:
+        raise ValueError('Unexpected score size in ' + file_path)
+    start = SCORE_FILE_HEADER.size + metadata_size
+    return metadata, typecode, start + (-start % 8)
+
+class ScoreFileWriter:
+    """
+    Writes scores to a binary file, one byte per score for standard
+    boxes, after a header recording metadata such as the strategy, rules
+    and seed. An instance can be passed to simulate() as on_scores. Use
+    as a context manager, or call close() when finished.
+
+    file_path (str)
+    metadata (dict): must include num_flaps and be serialisable as JSON
+    keep (int): if supplied, add to an existing file with the same
+        metadata after its first keep scores, discarding any others e.g.
+        when resuming a simulation from a checkpoint (default None i.e.
+        start a new file)
+    """
+
+    def __init__(self, file_path, metadata, keep=None):
+        self.file_path = file_path
+        self.metadata = metadata
+        self.typecode = score_typecode(_max_score(metadata))
+
+        if keep is None:
+            self.file = open(file_path, 'wb')
+            encoded = json.dumps(metadata, sort_keys=True).encode()
+            self.file.write(SCORE_FILE_HEADER.pack(
+                SCORE_FILE_MAGIC, SCORE_FILE_VERSION,
+                array.array(self.typecode).itemsize, len(encoded)))
+            self.file.write(encoded)
+            self.file.write(bytes(-(SCORE_FILE_HEADER.size +
+                                    len(encoded)) % 8))
+            return
+
+        self.file = open(file_path, 'r+b')
+        try:
+            existing_metadata, _, start = _read_header(self.file, file_path)
+            if existing_metadata != json.loads(json.dumps(metadata)):
+                raise ValueError(file_path + ' has different metadata')
+            end = start + keep * array.array(self.typecode).itemsize
+            if self.file.seek(0, 2) < end:
+                raise ValueError(
+                    '{} has fewer than {} scores'.format(file_path, keep))
+            self.file.truncate(end)
+            self.file.seek(end)
+        except (ValueError, OSError):
+            self.file.close()
+            raise
+
+    def write(self, scores):
+        """
+        Append scores to the file.
+
+        scores (iterable): integers between 0 and the maximum score
+        """
+        scores = array.array(self.typecode, scores)
+        if sys.byteorder != 'little': # pragma: no cover
+            scores.byteswap()
+        scores.tofile(self.file)
+
+    __call__ = write
+
+    def sync(self):
+        """
+        Flush the scores written so far to disk, e.g. before saving a
+        checkpoint which counts them.
+        """
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        """
+        Close the file.
+        """
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class ScoreFile:
+    """
+    Scores memory-mapped from a file written by ScoreFileWriter. Get an
+    instance using load_scores().
+
+    metadata (dict): as supplied to ScoreFileWriter
+    max_score (int): highest possible score
+    scores: sequence of the scores, read from the file when accessed
+    """
+
+    def __init__(self, metadata, scores):
+        self.metadata = metadata
+        self.max_score = _max_score(metadata)
+        self.scores = scores
+
+    def __len__(self):
+        return len(self.scores)
+
+    def get_stats(self, start=0, stop=None):
+        """
+        Returns a ScoreStats for the scores from index start up to but
+        not including stop (default the end), counted a block at a time.
+        """
+        if stop is None:
+            stop = len(self.scores)
+        stats = ScoreStats(self.max_score)
+        for block_start in range(start, stop, STATS_BLOCK_SIZE):
+            block = self.scores[block_start:min(stop, block_start +
+                                                STATS_BLOCK_SIZE)]
+            if isinstance(block, memoryview) and block.itemsize == 1:
+                # one pass over the bytes per score with bytes.count,
+                # which is still quicker than counting score by score
+                block = block.tobytes()
+                counts = {score: block.count(score)
+                          for score in range(0, self.max_score + 1)}
+            else:
+                counts = collections.Counter(block)
+            stats.merge(ScoreStats.from_histogram(
+                [counts.get(score, 0)
+                 for score in range(0, self.max_score + 1)]))
+        return stats
+
+def load_scores(file_path):
+    """
+    Returns a ScoreFile whose scores are memory-mapped from a file
+    written by ScoreFileWriter.
+
+    file_path (str)
+    """
+    with open(file_path, 'rb') as score_file:
+        metadata, typecode, start = _read_header(score_file, file_path)
+        size = score_file.seek(0, 2)
+        if (size - start) % array.array(typecode).itemsize:
+            raise ValueError(file_path + ' ends part way through a score')
+        if size == start: # can't map an empty range
+            return ScoreFile(metadata, array.array(typecode))
+        # the mapping stays open after the file is closed
+        mapped = mmap.mmap(score_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    scores = memoryview(mapped)[start:]
+    if sys.byteorder == 'little':
+        scores = scores.cast(typecode)
+    else: # pragma: no cover
+        scores = array.array(typecode, scores)
+        scores.byteswap()
+    return ScoreFile(metadata, scores)
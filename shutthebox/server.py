@@ -0,0 +1,94 @@
+"""
+Serve games of Shut the Box to human players over TCP, for example with
+telnet or netcat, hosting many concurrent sessions in one process using
+asyncio.
+"""
+
+import asyncio
+
+from .box import Box
+from .dice import Dice
+from .humanturn import HumanTurn
+from .session import HumanSession
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8023
+
+# longest line accepted from a player, to limit memory per session
+MAX_LINE_LENGTH = 1024
+
+class GameServer:
+    """
+    Hosts a HumanSession for each connection. Sessions share the dice
+    and hold only their own box and state, so each costs kilobytes.
+
+    num_flaps (int): how many flaps each box has (default 9)
+    num_dice (int): how many dice are being used (default 2)
+    """
+
+    def __init__(self, num_flaps=9, num_dice=2):
+        self.num_flaps = num_flaps
+        self.dice = Dice(num_dice)
+        self.num_sessions = 0 # currently connected
+        self.total_sessions = 0 # since the server started
+        self.server = None
+
+    def create_session(self):
+        """
+        Returns a new HumanSession using the shared dice.
+        """
+        return HumanSession(HumanTurn(Box(self.num_flaps), self.dice))
+
+    async def handle_connection(self, reader, writer):
+        """
+        Play a session with the player connected by reader and writer
+        until the session finishes or they disconnect.
+        """
+        self.num_sessions += 1
+        self.total_sessions += 1
+        session = self.create_session()
+        try:
+            writer.write(session.start().encode())
+            await writer.drain()
+            while not session.finished:
+                line = await reader.readline()
+                if not line: # disconnected
+                    break
+                writer.write(session.handle_input(
+                    line.decode(errors='replace')).encode())
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            # disconnected, or line too long
+            pass
+        finally:
+            self.num_sessions -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError: # already disconnected
+                pass
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """
+        Start listening for connections and return the asyncio server.
+
+        host (str): address to listen on (default localhost only)
+        port (int): port to listen on, or 0 for any free port
+        """
+        self.server = await asyncio.start_server(
+            self.handle_connection, host, port, limit=MAX_LINE_LENGTH)
+        return self.server
+
+    async def serve_forever(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """
+        Start listening for connections and serve them until cancelled.
+        """
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+def run_server(host=DEFAULT_HOST, port=DEFAULT_PORT, num_flaps=9, num_dice=2):
+    """
+    Run a GameServer until interrupted.
+    """
+    asyncio.run(GameServer(num_flaps, num_dice).serve_forever(host, port))
@@ -0,0 +1,184 @@
+"""
+Defines the HumanSession class of shutthebox, a non-blocking state
+machine for a human playing one or more turns, which is given the
+player's input a line at a time and returns the text to show them.
+"""
+
+from .box import Box
+from .dice import Dice
+from .humanturn import HumanTurn
+
+class HumanSession:
+    """
+    A game of one or more turns taken by a human player. Nothing is read
+    or printed directly: call start() and then handle_input() with each
+    line the player enters, showing them the text returned each time,
+    until finished is True. The player's input is validated by the
+    HumanTurn's check_num_dice_decision and check_flaps_decision.
+
+    turn (HumanTurn): the turn to play, default a turn with a standard
+        box and dice
+    play_again (bool): ask the player whether to play another turn at
+        the end of each turn? (default True)
+    single_roll (bool): finish after one roll, leaving the box as it is
+        rather than ending the turn? (default False)
+    """
+
+    # the input the session is waiting for
+    NUM_DICE = 'num_dice'
+    FLAPS = 'flaps'
+    PLAY_AGAIN = 'play_again'
+    FINISHED = 'finished'
+
+    # keep sessions small so that many can be held in memory at once
+    __slots__ = ('turn', 'play_again', 'single_roll', 'state',
+                 'dice_total', 'scores', '_output')
+
+    def __init__(self, turn=None, play_again=True, single_roll=False):
+        if turn is None:
+            turn = HumanTurn(Box(), Dice())
+        if not isinstance(turn, HumanTurn):
+            raise ValueError('turn must be a HumanTurn')
+        self.turn = turn
+        self.play_again = play_again
+        self.single_roll = single_roll
+        self.state = None
+        self.dice_total = None
+        self.scores = [] # score of each turn completed
+        self._output = []
+        # explanations of invalid input become part of the output
+        self.turn.output = self._write_line
+
+    @property
+    def finished(self):
+        """
+        Whether the session has ended.
+        """
+        return self.state == self.FINISHED
+
+    def _write(self, text):
+        self._output.append(text)
+
+    def _write_line(self, text=''):
+        self._output.append(text + '\n')
+
+    def _flush(self):
+        text = ''.join(self._output)
+        self._output = []
+        return text
+
+    def start(self):
+        """
+        Start the first turn and return the text to show the player.
+        Raise RuntimeError if already started.
+        """
+        if self.state is not None:
+            raise RuntimeError('Session already started')
+        if self.turn.box.sum_available_flaps() == 0: # nothing to play
+            if self.single_roll:
+                self.state = self.FINISHED
+            else:
+                self._end_turn()
+        else:
+            self._begin_roll()
+        return self._flush()
+
+    def handle_input(self, line):
+        """
+        Act on a line entered by the player and return the text to show
+        them. Raise RuntimeError if the session hasn't started or has
+        finished.
+
+        line (str): player's input, with or without a trailing newline
+        """
+        line = line.rstrip('\r\n')
+        if self.state is None:
+            raise RuntimeError('Session not started')
+        if self.state == self.NUM_DICE:
+            num_dice = self.turn.check_num_dice_decision(line)
+            if num_dice:
+                self._roll(num_dice)
+            else:
+                self._prompt_num_dice()
+        elif self.state == self.FLAPS:
+            self._handle_flaps_decision(line)
+        elif self.state == self.PLAY_AGAIN:
+            self._handle_play_again_choice(line)
+        else:
+            raise RuntimeError('Session finished')
+        return self._flush()
+
+    def _begin_roll(self):
+        turn = self.turn
+        self._write_line('{}\n'.format(turn.box))
+        # if flap sum <= max_flap_sum_single_die, ask how many dice to roll
+        if turn.box.sum_available_flaps() <= turn.max_flap_sum_single_die:
+            self._prompt_num_dice()
+        else: # use all dice
+            self._roll(turn.dice.num_dice)
+
+    def _prompt_num_dice(self):
+        self.state = self.NUM_DICE
+        self._write('How many dice would you like to roll? (between ' +
+                    '1 and {}) '.format(self.turn.dice.num_dice))
+
+    def _roll(self, num_dice):
+        self.dice_total = self.turn.dice.roll(num_dice)
+        self._write_line('Dice total: {}'.format(self.dice_total))
+        self._prompt_flaps()
+
+    def _prompt_flaps(self):
+        self.state = self.FLAPS
+        self._write('Which flaps would you like to lower?\n' +
+                    '(Separate with spaces and leave blank for none) ')
+
+    def _handle_flaps_decision(self, line):
+        flap_nums = self.turn.check_flaps_decision(line, self.dice_total)
+        if not isinstance(flap_nums, list): # invalid
+            self._prompt_flaps()
+            return
+        if not flap_nums: # empty list i.e. no flaps
+            if self.single_roll:
+                self.state = self.FINISHED
+            else:
+                self._end_turn()
+            return
+
+        for this_flap_num in flap_nums:
+            self.turn.box.lower_flap(this_flap_num)
+        self._write_line()
+
+        if self.single_roll:
+            self.state = self.FINISHED
+        elif self.turn.box.sum_available_flaps() > 0:
+            self._begin_roll()
+        else:
+            self._end_turn()
+
+    def _end_turn(self):
+        self._write_line()
+        score = self.turn.box.sum_available_flaps()
+        if score == 0:
+            self._write_line(
+                'You have lowered all the flaps and shut the box. Well done!')
+        else:
+            self._write_line('Your score was {}'.format(score))
+        self.scores.append(score)
+        self.turn.box.reset() # raise all flaps again
+
+        if self.play_again:
+            self.state = self.PLAY_AGAIN
+            self._write('Play another turn? [Y/N] ')
+        else:
+            self.state = self.FINISHED
+
+    def _handle_play_again_choice(self, line):
+        choice = line.strip()[:1].lower()
+        if choice == 'y':
+            self._write_line()
+            self._begin_roll()
+        elif choice == 'n':
+            self.state = self.FINISHED
+        else:
+            self._write_line('Please enter Y or N')
+            self._write('Play another turn? [Y/N] ')
@@ -0,0 +1,544 @@
+"""
+Simulate many turns of Shut the Box taken by the computer, optionally
+spread across a pool of processes.
+"""
+
+import collections
+import contextlib
+import hashlib
+import itertools
+import json
+import os
+import random
+import signal
+import sys
+import threading
+import time
+
+from .box import Box
+from .dice import Dice
+from .computerturn import ComputerTurn
+from .scorefile import ScoreFileWriter
+from .stats import ScoreStats
+
+# turns are simulated in chunks of this many turns, each with its own
+# seed, so that results don't depend on how many workers are used
+DEFAULT_CHUNK_SIZE = 10000
+
+def derive_seed(master_seed, chunk_index):
+    """
+    Returns an integer seed for one chunk of turns, derived from the
+    master seed so that each chunk has an independent stream of random
+    numbers.
+
+    master_seed (int)
+    chunk_index (int)
+    """
+    digest = hashlib.sha256(
+        '{}:{}'.format(master_seed, chunk_index).encode()).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+def text_score_writer(file):
+    """
+    Returns a function which can be passed to simulate() as on_scores to
+    write the score of each turn to a file, one per line.
+
+    file: text file object e.g. sys.stdout
+    """
+    def write_scores(scores):
+        file.write(''.join('{}\n'.format(score) for score in scores))
+    return write_scores
+
+def simulate_chunk(num_turns, seed, flap_decision, num_dice_decision,
+                   num_flaps, num_dice, keep_scores=False):
+    """
+    Simulate num_turns turns and return a tuple of a ScoreStats and a
+    list of the scores if keep_scores is True, otherwise None. Defined
+    at module level so that it can be run in a worker process.
+    """
+    box = Box(num_flaps)
+    dice = Dice(num_dice, rng=random.Random(seed))
+    turn = ComputerTurn(box, dice)
+    flap_decision_method = turn.get_flap_decision_method(flap_decision)
+    num_dice_decision_method = turn.get_num_dice_decision_method(
+        num_dice_decision)
+
+    stats = ScoreStats.for_box(num_flaps)
+    scores = [] if keep_scores else None
+
+    for _ in range(0, num_turns):
+        score = turn.perform_turn(
+            num_dice_decision_method=num_dice_decision_method,
+            flap_decision_method=flap_decision_method)
+        stats.add(score)
+        if keep_scores:
+            scores.append(score)
+
+    return stats, scores
+
+def add_stopping_arguments(parser):
+    """
+    Add command line arguments for how many turns to simulate and where
+    to save checkpoints to an argparse.ArgumentParser, to be passed to
+    simulate() using stopping_options().
+    """
+    parser.add_argument(
+        '--turns', type=int,
+        help='number of turns (default 10000, or no limit with ' +
+        '--precision, --shut-rate-precision or --time)')
+    parser.add_argument(
+        '--precision', type=float,
+        help='stop when the 95%% confidence interval for the mean score ' +
+        'is no wider than this either side')
+    parser.add_argument(
+        '--shut-rate-precision', type=float,
+        help='stop when the 95%% confidence interval for the shut-the-box ' +
+        'rate is no wider than this either side')
+    parser.add_argument('--time', type=float,
+                        help='stop after about this many seconds')
+    parser.add_argument(
+        '--checkpoint', metavar='FILE',
+        help='save progress to this file, or resume from it if it exists')
+
+def stopping_options(args):
+    """
+    Returns a dict of keyword arguments for simulate() from command line
+    arguments added by add_stopping_arguments().
+    """
+    if args.precision is not None and args.shut_rate_precision is not None:
+        raise ValueError('Use only one of --precision and ' +
+                         '--shut-rate-precision')
+    options = {'num_turns': args.turns, 'time_budget': args.time,
+               'checkpoint': args.checkpoint}
+    if args.shut_rate_precision is not None:
+        options.update(precision=args.shut_rate_precision,
+                       statistic='shut_rate')
+    else:
+        options['precision'] = args.precision
+    if options['precision'] is None and args.time is None:
+        if args.turns is None:
+            options['num_turns'] = 10000
+    else:
+        # check whether to stop more often
+        options['chunk_size'] = 1000
+    return options
+
+def add_simulation_arguments(parser):
+    """
+    Add command line arguments for the output, seed and length of a
+    simulation to an argparse.ArgumentParser, including those added by
+    add_stopping_arguments(), to be passed to simulate() using
+    simulation_options().
+    """
+    parser.add_argument('--scores', action='store_true',
+                        help='output the score for each turn')
+    parser.add_argument(
+        '--scores-file', metavar='FILE',
+        help='write the score for each turn to this binary file')
+    parser.add_argument('--seed', type=int,
+                        help='seed for reproducible results')
+    add_stopping_arguments(parser)
+
+@contextlib.contextmanager
+def simulation_options(args, **kwargs):
+    """
+    Context manager giving a dict of keyword arguments for simulate()
+    from command line arguments added by add_simulation_arguments() and
+    any supplied keyword arguments, e.g. flap_decision. The file for
+    --scores-file is closed on leaving the context, and synced to disk
+    before each checkpoint is saved. If resuming from a checkpoint, the
+    seed is read from it and the scores file is truncated to the turns
+    it records.
+    """
+    options = stopping_options(args)
+    options.update(kwargs)
+    options['seed'] = args.seed
+
+    kept_scores = None
+    if args.checkpoint is not None:
+        saver = SimulationCheckpoint(args.checkpoint, {})
+        saved = saver.load()
+        if saved is not None:
+            options['seed'] = saver.parameters['seed']
+            kept_scores = saved[0].count
+    if options['seed'] is None:
+        options['seed'] = random.SystemRandom().getrandbits(64)
+
+    if args.scores:
+        options['on_scores'] = text_score_writer(sys.stdout)
+    if args.scores_file is None:
+        yield options
+        return
+
+    # record every parameter of the simulation with the scores
+    import inspect # pylint: disable=import-outside-toplevel
+    parameters = inspect.signature(simulate).bind(**options)
+    parameters.apply_defaults()
+    metadata = {name: parameters.arguments[name] for name in [
+        'flap_decision', 'num_dice_decision', 'num_flaps', 'num_dice',
+        'seed', 'chunk_size']}
+    with ScoreFileWriter(args.scores_file, metadata,
+                         keep=kept_scores) as writer:
+        options['on_checkpoint'] = writer.sync
+        if 'on_scores' in options:
+            write_text = options['on_scores']
+            def write_both(scores):
+                write_text(scores)
+                writer.write(scores)
+            options['on_scores'] = write_both
+        else:
+            options['on_scores'] = writer
+        yield options
+
+# version of the JSON checkpoint format written by SimulationCheckpoint
+CHECKPOINT_VERSION = 1
+
+# seconds between checkpoints of a simulation
+DEFAULT_CHECKPOINT_INTERVAL = 60
+
+class SimulationInterrupted(KeyboardInterrupt):
+    """
+    Raised by simulate() when interrupted e.g. by SIGINT (Ctrl-C), after
+    saving a checkpoint if one was requested.
+
+    stats (ScoreStats): statistics of the chunks completed
+    checkpoint_path (str): checkpoint file, or None if not requested
+    """
+
+    def __init__(self, stats, checkpoint_path=None):
+        super(SimulationInterrupted, self).__init__()
+        self.stats = stats
+        self.checkpoint_path = checkpoint_path
+
+    def __str__(self):
+        message = 'Interrupted after {} turns'.format(self.stats.count)
+        if self.checkpoint_path is not None:
+            message += ('; run again with the same options to resume from ' +
+                        self.checkpoint_path)
+        return message + '\n' + str(self.stats)
+
+class SimulationCheckpoint:
+    """
+    A JSON file recording the progress of a simulation: its parameters,
+    including the master seed, the statistics of the chunks completed
+    and the index of the next chunk. Since each chunk's random numbers
+    are derived from the master seed and chunk index, this is enough to
+    resume and get the same result as an uninterrupted simulation. The
+    file is replaced atomically so that it is never left half-written.
+
+    file_path (str)
+    parameters (dict): parameters which must match to resume
+    interval (float): minimum seconds between saves by save_if_due()
+    before_save (function): if supplied, called before each save e.g.
+        to sync a file holding the scores the checkpoint counts
+    """
+
+    def __init__(self, file_path, parameters,
+                 interval=DEFAULT_CHECKPOINT_INTERVAL, before_save=None):
+        self.file_path = file_path
+        self.parameters = parameters
+        self.interval = interval
+        self.before_save = before_save
+        self.last_saved = time.monotonic()
+
+    def load(self):
+        """
+        Returns a tuple of the ScoreStats, the index of the next chunk
+        and whether the simulation finished, or None if there is no
+        checkpoint file. Raise ValueError if the checkpoint is for a
+        simulation with different parameters.
+        """
+        try:
+            with open(self.file_path) as checkpoint_file:
+                checkpoint = json.load(checkpoint_file)
+        except FileNotFoundError:
+            return None
+
+        if checkpoint.get('version') != CHECKPOINT_VERSION:
+            raise ValueError('{} is not a version {} checkpoint'.format(
+                self.file_path, CHECKPOINT_VERSION))
+        for name, value in self.parameters.items():
+            if name == 'seed' and value is None: # use the checkpoint's seed
+                continue
+            if checkpoint['parameters'].get(name) != value:
+                raise ValueError(
+                    '{} is a checkpoint of a simulation with a '.format(
+                        self.file_path) +
+                    'different {} ({})'.format(
+                        name, checkpoint['parameters'].get(name)))
+        self.parameters = checkpoint['parameters']
+        return (ScoreStats.from_histogram(checkpoint['histogram']),
+                checkpoint['next_chunk'], checkpoint['finished'])
+
+    def save(self, stats, next_chunk, finished=False):
+        """
+        Write the checkpoint.
+
+        stats (ScoreStats): statistics of the chunks completed
+        next_chunk (int): index of the first chunk not completed
+        finished (bool): whether the simulation has finished
+        """
+        if self.before_save is not None:
+            self.before_save()
+        temp_path = self.file_path + '.tmp'
+        with open(temp_path, 'w') as checkpoint_file:
+            json.dump({'version': CHECKPOINT_VERSION,
+                       'parameters': self.parameters,
+                       'histogram': stats.histogram,
+                       'next_chunk': next_chunk,
+                       'finished': finished}, checkpoint_file)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(temp_path, self.file_path)
+        self.last_saved = time.monotonic()
+
+    def save_if_due(self, stats, next_chunk):
+        """
+        Write the checkpoint if interval seconds have passed since it
+        was last written.
+        """
+        if time.monotonic() - self.last_saved >= self.interval:
+            self.save(stats, next_chunk)
+
+def _ignore_interrupts():
+    """
+    Let worker processes carry on when Ctrl-C is pressed so that the
+    main process can finish merging chunks and save a checkpoint.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+class _DeferredInterrupt:
+    """
+    Context manager which, in the main thread, records SIGINT instead of
+    raising KeyboardInterrupt straight away, so that simulate() can stop
+    between chunks with consistent statistics. A second SIGINT
+    interrupts immediately.
+    """
+
+    def __init__(self):
+        self.requested = False
+        self.previous_handler = None
+
+    def _handle(self, signum, frame):
+        self.requested = True
+        signal.signal(signal.SIGINT, self.previous_handler)
+
+    def __enter__(self):
+        if threading.current_thread() is threading.main_thread():
+            self.previous_handler = signal.signal(signal.SIGINT, self._handle)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.previous_handler is not None:
+            signal.signal(signal.SIGINT, self.previous_handler)
+
+# adaptive simulations don't stop on precision before this many turns,
+# so that the variance is estimated well enough to trust
+DEFAULT_MIN_TURNS = 1000
+
+# pylint: disable=too-many-arguments
+# pylint: disable=too-many-locals
+
+def simulate(num_turns, flap_decision='next_roll_probability',
+             num_dice_decision='one_if_poss', num_flaps=9, num_dice=2,
+             seed=None, workers=1, chunk_size=DEFAULT_CHUNK_SIZE,
+             on_scores=None, precision=None, statistic='mean',
+             confidence=0.95, min_turns=DEFAULT_MIN_TURNS, time_budget=None,
+             checkpoint=None, checkpoint_interval=DEFAULT_CHECKPOINT_INTERVAL,
+             on_checkpoint=None):
+    """
+    Simulate up to num_turns turns and return a ScoreStats aggregating
+    their scores. For a given seed, the results are the same however
+    many workers are used.
+
+    If interrupted by SIGINT (Ctrl-C), stop after the chunk being merged
+    and raise SimulationInterrupted with the statistics so far. If
+    checkpoint is supplied, progress is saved to that file every
+    checkpoint_interval seconds, at the end and if interrupted. If the
+    file already exists, the simulation resumes from it and gives the
+    same result as if it had never been interrupted, apart from scores
+    already passed to on_scores. The seed may be omitted when resuming.
+
+    If precision is supplied, stop after the first chunk of turns at
+    which the confidence interval for the statistic is no wider than
+    precision either side (a fixed-width sequential stopping rule). If
+    time_budget is supplied, stop after the first chunk to finish once
+    the budget has been used, which makes the number of turns
+    unpredictable. Use a smaller chunk_size to check more often.
+
+    num_turns (int): how many turns to simulate, or None for no limit
+        if precision or time_budget is supplied
+    flap_decision (str): name of flap decision method e.g. 'highest'
+        for make_flap_decision_highest (default 'next_roll_probability')
+    num_dice_decision (str): name of num dice decision method e.g.
+        'always_all' (default 'one_if_poss')
+    num_flaps (int): how many flaps the box has (default 9)
+    num_dice (int): how many dice are being used (default 2)
+    seed (int): master seed from which the seed of each chunk of turns
+        is derived (default None i.e. unpredictable)
+    workers (int): how many processes to use, or None for one per CPU
+        (default 1 i.e. run in this process)
+    chunk_size (int): how many turns to simulate with each seed
+    on_scores (function): if supplied, called with a list of the scores
+        of each chunk of turns, in order e.g. text_score_writer(file)
+    precision (float): target half-width of the confidence interval
+        (default None i.e. don't stop on precision)
+    statistic (str): 'mean' for the mean score or 'shut_rate' for the
+        shut-the-box rate (default 'mean')
+    confidence (float): confidence level of the interval (default 0.95)
+    min_turns (int): don't stop on precision before this many turns
+    time_budget (float): seconds after which to stop (default None)
+    checkpoint (str): path of checkpoint file (default None)
+    checkpoint_interval (float): seconds between checkpoints
+    on_checkpoint (function): if supplied, called before each checkpoint
+        is saved e.g. ScoreFileWriter.sync, so that the scores already
+        passed to on_scores are on disk when the checkpoint counts them
+    """
+    if num_turns is None:
+        if precision is None and time_budget is None:
+            raise ValueError('num_turns is required unless precision or ' +
+                             'time_budget is supplied')
+    elif not (isinstance(num_turns, int) and num_turns >= 0):
+        raise ValueError('num_turns must be an integer >= 0')
+    if not (isinstance(chunk_size, int) and chunk_size >= 1):
+        raise ValueError('chunk_size must be an integer >= 1')
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if not (isinstance(workers, int) and workers >= 1):
+        raise ValueError('workers must be an integer >= 1')
+    if precision is not None and not precision > 0:
+        raise ValueError('precision must be > 0')
+    if time_budget is not None and not time_budget > 0:
+        raise ValueError('time_budget must be > 0')
+    # check statistic and confidence
+    ScoreStats().confidence_interval(statistic, confidence)
+
+    # check the decision methods exist before starting any workers
+    turn = ComputerTurn(Box(num_flaps), Dice(num_dice))
+    turn.get_flap_decision_method(flap_decision)
+    turn.get_num_dice_decision_method(num_dice_decision)
+
+    stats = ScoreStats.for_box(num_flaps)
+    first_chunk = 0
+    saver = None
+    if checkpoint is not None:
+        saver = SimulationCheckpoint(checkpoint, {
+            'num_turns': num_turns, 'flap_decision': flap_decision,
+            'num_dice_decision': num_dice_decision, 'num_flaps': num_flaps,
+            'num_dice': num_dice, 'seed': seed, 'chunk_size': chunk_size},
+                                     checkpoint_interval, on_checkpoint)
+        saved = saver.load()
+        if saved is not None:
+            stats, first_chunk, finished = saved
+            if finished:
+                return stats
+            seed = saver.parameters['seed']
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    if saver is not None:
+        saver.parameters['seed'] = seed
+
+    def get_chunk_args(index):
+        if num_turns is None:
+            this_chunk_size = chunk_size
+        else:
+            this_chunk_size = min(chunk_size, num_turns - index * chunk_size)
+        return (this_chunk_size, derive_seed(seed, index), flap_decision,
+                num_dice_decision, num_flaps, num_dice, on_scores is not None)
+
+    def should_stop(stats):
+        if time_budget is not None and time.monotonic() >= deadline:
+            return True
+        if precision is None or stats.count < max(min_turns, 2):
+            return False
+        lower, upper = stats.confidence_interval(statistic, confidence)
+        return (upper - lower) / 2 <= precision
+
+    if num_turns is None:
+        chunk_indices = itertools.count(first_chunk)
+    else:
+        # round up
+        chunk_indices = range(first_chunk, -(-num_turns // chunk_size))
+
+    deadline = (time.monotonic() + time_budget
+                if time_budget is not None else None)
+    progress = {'next_chunk': first_chunk, 'finished': False}
+
+    def on_merged(stats, stopping):
+        progress['next_chunk'] += 1
+        # recorded first so that an interrupt on the last chunk doesn't
+        # make a resumed simulation carry on past it
+        progress['finished'] = stopping
+        if interrupt.requested:
+            raise KeyboardInterrupt
+        if saver is not None:
+            saver.save_if_due(stats, progress['next_chunk'])
+
+    try:
+        with _DeferredInterrupt() as interrupt:
+            if workers == 1:
+                chunk_results = (simulate_chunk(*get_chunk_args(index))
+                                 for index in chunk_indices)
+                _merge_chunks(stats, chunk_results, on_scores, should_stop,
+                              on_merged)
+            else:
+                # imported here as it's slow to import and not needed by
+                # single-process runs
+                # pylint: disable=import-outside-toplevel
+                import concurrent.futures
+                with concurrent.futures.ProcessPoolExecutor(
+                        max_workers=workers,
+                        initializer=_ignore_interrupts) as executor:
+                    _merge_chunks(stats, _submit_chunks(
+                        executor, workers, chunk_indices, get_chunk_args),
+                                  on_scores, should_stop, on_merged)
+    except KeyboardInterrupt:
+        if saver is not None:
+            saver.save(stats, progress['next_chunk'], progress['finished'])
+        raise SimulationInterrupted(stats, checkpoint)
+
+    if saver is not None:
+        saver.save(stats, progress['next_chunk'], finished=True)
+    return stats
+
+def _submit_chunks(executor, workers, chunk_indices, get_chunk_args):
+    """
+    Yield the results of each chunk in order, keeping two chunks per
+    worker in progress. Chunks still in progress when the caller stops
+    asking for results are cancelled or ignored.
+    """
+    chunk_indices = iter(chunk_indices)
+    pending = collections.deque()
+    try:
+        while True:
+            while len(pending) < 2 * workers:
+                index = next(chunk_indices, None)
+                if index is None:
+                    break
+                pending.append(executor.submit(
+                    simulate_chunk, *get_chunk_args(index)))
+            if not pending:
+                return
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+def _merge_chunks(stats, chunk_results, on_scores, should_stop=None,
+                  on_merged=None):
+    """
+    Merge the results of each chunk into stats as they arrive, passing
+    their scores to on_scores, until should_stop(stats) returns True if
+    supplied. After each chunk, on_merged is called if supplied with
+    stats and whether this is the last chunk to be merged because
+    should_stop returned True.
+    """
+    for chunk_stats, chunk_scores in chunk_results:
+        stats.merge(chunk_stats)
+        if on_scores is not None:
+            on_scores(chunk_scores)
+        stopping = should_stop is not None and should_stop(stats)
+        if on_merged is not None:
+            on_merged(stats, stopping)
+        if stopping:
+            break
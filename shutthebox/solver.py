@@ -0,0 +1,119 @@
+"""
+Defines the OptimalStrategy class of shutthebox and the solve()
+function, which computes the strategy minimising the expected score.
+"""
+
+import functools
+
+from .box import flap_nums_from_mask, mask_from_flap_nums
+from .dice import DEFAULT_FACES, dice_sum_probabilities
+from .moves import get_move_index
+
+# pylint: disable=too-few-public-methods
+
+class OptimalStrategy:
+    """
+    The strategy which minimises the expected score of a turn, found by
+    dynamic programming over every state of the box. Create it using
+    solve() rather than directly.
+
+    expected_scores (list): expected final score for each up_mask when
+        playing optimally from that state
+    num_dice_choices (list): how many dice to roll for each up_mask
+    moves (list): moves[up_mask] is a dict with the flaps to lower (an
+        ascending tuple, or None if impossible) for each dice total
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, num_flaps, num_dice, max_flap_sum_single_die,
+                 faces=DEFAULT_FACES, weights=None):
+        self.num_flaps = num_flaps
+        self.num_dice = num_dice
+        self.max_flap_sum_single_die = max_flap_sum_single_die
+
+        move_index = get_move_index(num_flaps)
+        probabilities = {
+            1: dice_sum_probabilities(1, faces, weights),
+            num_dice: dice_sum_probabilities(num_dice, faces, weights)}
+        dice_totals = sorted(set(probabilities[1]) |
+                             set(probabilities[num_dice]))
+
+        num_states = 1 << num_flaps
+        self.expected_scores = [0.0] * num_states
+        self.num_dice_choices = [num_dice] * num_states
+        self.moves = [{} for _ in range(0, num_states)]
+
+        # lowering flaps always clears bits, so every state reachable from
+        # up_mask has a smaller mask and has already been solved
+        for up_mask in range(1, num_states):
+            flap_sum = sum(flap_nums_from_mask(up_mask))
+
+            # value of the best move for each dice total
+            values = {}
+            for dice_total in dice_totals:
+                best_value = flap_sum # score if no flaps can be lowered
+                best_move = None
+                for this_combination in move_index.get_moves(
+                        up_mask, dice_total):
+                    value = self.expected_scores[
+                        up_mask ^ mask_from_flap_nums(this_combination)]
+                    if best_move is None or value < best_value:
+                        best_value = value
+                        best_move = tuple(sorted(this_combination))
+                values[dice_total] = best_value
+                self.moves[up_mask][dice_total] = best_move
+
+            # choose how many dice to roll
+            options = [num_dice]
+            if flap_sum <= max_flap_sum_single_die and num_dice != 1:
+                options.append(1)
+            for this_num_dice in options:
+                expected = sum(prob * values[dice_total] for dice_total, prob
+                               in probabilities[this_num_dice].items())
+                if (this_num_dice == options[0] or
+                        expected < self.expected_scores[up_mask]):
+                    self.expected_scores[up_mask] = expected
+                    self.num_dice_choices[up_mask] = this_num_dice
+
+    def get_move(self, up_mask, dice_total):
+        """
+        Returns a list of the flaps to lower in ascending order, or False
+        if no flaps can be lowered.
+
+        up_mask (int): bitmask of the flaps which are up
+        dice_total (int): sum of dice rolled
+        """
+        move = self.moves[up_mask].get(dice_total)
+        if move is None:
+            return False
+        return list(move)
+
+@functools.lru_cache(maxsize=None)
+def _solve(num_flaps, num_dice, max_flap_sum_single_die, faces, weights):
+    """
+    Cached by positional arguments only, so that solve() returns the same
+    object however its arguments are passed.
+    """
+    return OptimalStrategy(num_flaps, num_dice, max_flap_sum_single_die,
+                           faces, weights)
+
+def solve(num_flaps=9, num_dice=2, max_flap_sum_single_die=6,
+          faces=DEFAULT_FACES, weights=None):
+    """
+    Returns the OptimalStrategy for the given rules, solving it the
+    first time it is requested.
+
+    num_flaps (int): how many flaps the box has (default 9)
+    num_dice (int): how many dice are being used (default 2)
+    max_flap_sum_single_die (int): max sum of flap numbers to be allowed
+        to roll a single die (default 6)
+    faces (tuple): numbers shown on the faces of each die (default 1-6)
+    weights (tuple): relative probability of each face, or None if the
+        dice are fair (default None)
+    """
+    if not (isinstance(num_flaps, int) and num_flaps >= 1):
+        raise ValueError('num_flaps must be an integer >= 1')
+    if not (isinstance(num_dice, int) and num_dice >= 1):
+        raise ValueError('num_dice must be an integer >= 1')
+    return _solve(num_flaps, num_dice, max_flap_sum_single_die, tuple(faces),
+                  None if weights is None else tuple(weights))
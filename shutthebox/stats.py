@@ -0,0 +1,261 @@
+"""
+Defines the SampleStats class of shutthebox, the running mean and
+variance of any measurements such as differences between paired scores,
+and its subclass ScoreStats, which aggregates the scores of many turns
+in constant memory.
+"""
+
+import math
+
+def z_value(confidence):
+    """
+    Returns the number of standard errors either side of the mean which
+    gives a normal confidence interval with the supplied confidence.
+
+    confidence (float): between 0 and 1 e.g. 0.95
+    """
+    if not 0 < confidence < 1:
+        raise ValueError('confidence must be between 0 and 1')
+    # imported here as it's slow to import and only needed for intervals
+    import statistics # pylint: disable=import-outside-toplevel
+    return statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+
+class SampleStats:
+    """
+    Running mean and variance of real-valued samples, with a confidence
+    interval for the mean. Statistics for separate runs can be merged.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.total_squares = 0
+
+    def add(self, value):
+        """
+        Add one sample.
+
+        value (float)
+        """
+        self.count += 1
+        self.total += value
+        self.total_squares += value * value
+
+    def merge(self, other):
+        """
+        Add the statistics from another SampleStats to these and return
+        self.
+
+        other: instance of SampleStats
+        """
+        self.count += other.count
+        self.total += other.total
+        self.total_squares += other.total_squares
+        return self
+
+    @property
+    def mean(self):
+        """
+        Mean of the samples, or None if there are none.
+        """
+        if not self.count:
+            return None
+        return self.total / self.count
+
+    @property
+    def variance(self):
+        """
+        Sample variance, or None if there are fewer than two samples.
+        """
+        if self.count < 2:
+            return None
+        return max((self.total_squares - self.total * self.total /
+                    self.count) / (self.count - 1), 0)
+
+    @property
+    def std_error(self):
+        """
+        Standard error of the mean, or None if there are fewer than two
+        samples.
+        """
+        if self.count < 2:
+            return None
+        return math.sqrt(self.variance / self.count)
+
+    def confidence_interval(self, confidence=0.95):
+        """
+        Returns a tuple of the lower and upper bounds of a normal
+        confidence interval for the mean, or None if there are fewer
+        than two samples.
+
+        confidence (float): between 0 and 1 (default 0.95)
+        """
+        z = z_value(confidence)
+        if self.count < 2:
+            return None
+        half_width = z * self.std_error
+        return (self.mean - half_width, self.mean + half_width)
+
+class ScoreStats(SampleStats):
+    """
+    Running statistics for the scores of many turns: a histogram of
+    every possible score, from which the count, mean, variance,
+    shut-the-box rate and percentiles are found exactly. Statistics for
+    separate runs can be merged.
+
+    max_score (int): highest possible score i.e. the sum of all flaps
+        (default 45 for 9 flaps)
+    """
+
+    def __init__(self, max_score=45):
+        if not (isinstance(max_score, int) and max_score >= 0):
+            raise ValueError('max_score must be an integer >= 0')
+
+        super().__init__()
+        self.max_score = max_score
+        self.histogram = [0] * (max_score + 1)
+
+    @classmethod
+    def for_box(cls, num_flaps):
+        """
+        Returns an empty ScoreStats for a box with num_flaps flaps.
+        """
+        return cls(num_flaps * (num_flaps + 1) // 2)
+
+    @classmethod
+    def from_histogram(cls, histogram):
+        """
+        Returns a ScoreStats for the scores counted in a histogram, e.g.
+        the histogram of another ScoreStats saved to a file.
+
+        histogram (list): number of turns with each score from 0
+        """
+        if not histogram or any(not (isinstance(freq, int) and freq >= 0)
+                                for freq in histogram):
+            raise ValueError('histogram must be a list of integers >= 0')
+        stats = cls(len(histogram) - 1)
+        for score, freq in enumerate(histogram):
+            stats.histogram[score] = freq
+            stats.count += freq
+            stats.total += score * freq
+            stats.total_squares += score * score * freq
+        return stats
+
+    def add(self, score):
+        """
+        Add the score of one turn.
+
+        score (int)
+        """
+        self.histogram[score] += 1
+        super().add(score)
+
+    def add_scores(self, scores):
+        """
+        Add the scores of several turns.
+
+        scores (iterable)
+        """
+        for score in scores:
+            self.add(score)
+
+    def merge(self, other):
+        """
+        Add the statistics from another ScoreStats to these and return
+        self.
+
+        other: instance of ScoreStats with the same max_score
+        """
+        if other.max_score != self.max_score:
+            raise ValueError("Can't merge statistics with different " +
+                             'max_score')
+        for score, freq in enumerate(other.histogram):
+            self.histogram[score] += freq
+        return super().merge(other)
+
+    @property
+    def std_dev(self):
+        """
+        Sample standard deviation of the scores, or None if there are
+        fewer than two scores.
+        """
+        if self.count < 2:
+            return None
+        return math.sqrt(self.variance)
+
+    @property
+    def shut_rate(self):
+        """
+        Proportion of turns in which all flaps were lowered, or None if
+        there are no scores.
+        """
+        if not self.count:
+            return None
+        return self.histogram[0] / self.count
+
+    # the statistic comes first, unlike SampleStats
+    # pylint: disable=arguments-differ
+    def confidence_interval(self, statistic='mean', confidence=0.95):
+        """
+        Returns a tuple of the lower and upper bounds of a confidence
+        interval for the mean score (normal) or the shut-the-box rate
+        (Wilson score interval), or None if there are fewer than two
+        scores.
+
+        statistic (str): 'mean' or 'shut_rate' (default 'mean')
+        confidence (float): between 0 and 1 (default 0.95)
+        """
+        if statistic not in ('mean', 'shut_rate'):
+            raise ValueError("statistic must be 'mean' or 'shut_rate'")
+        if statistic == 'mean':
+            return super().confidence_interval(confidence)
+
+        z = z_value(confidence)
+        if self.count < 2:
+            return None
+        rate = self.shut_rate
+        z_squared_per_count = z * z / self.count
+        centre = (rate + z_squared_per_count / 2) / (1 + z_squared_per_count)
+        half_width = (z * math.sqrt(rate * (1 - rate) / self.count +
+                                    z_squared_per_count / self.count / 4) /
+                      (1 + z_squared_per_count))
+        return (centre - half_width, centre + half_width)
+
+    def percentile(self, percent):
+        """
+        Returns the score below or at which percent % of scores fall
+        (nearest-rank method), or None if there are no scores.
+
+        percent (float): between 0 and 100
+        """
+        if not 0 <= percent <= 100:
+            raise ValueError('percent must be between 0 and 100')
+        if not self.count:
+            return None
+
+        rank = max(1, math.ceil(percent / 100 * self.count))
+        cumulative = 0
+        for score, freq in enumerate(self.histogram):
+            cumulative += freq
+            if cumulative >= rank:
+                return score
+        return self.max_score # pragma: no cover
+
+    def __str__(self):
+        """
+        Get a summary of the statistics e.g.
+        Turns: 10000
+        Mean score: 11.14 (standard deviation 7.02)
+        Shut the box: 9.81%
+        Percentiles (10/50/90): 0 10 21
+        """
+        if not self.count:
+            return 'Turns: 0'
+        std_dev = self.std_dev if self.std_dev is not None else 0
+        return ('Turns: {}\n'.format(self.count) +
+                'Mean score: {:.2f} (standard deviation {:.2f})\n'.format(
+                    self.mean, std_dev) +
+                'Shut the box: {:.2%}\n'.format(self.shut_rate) +
+                'Percentiles (10/50/90): {} {} {}'.format(
+                    self.percentile(10), self.percentile(50),
+                    self.percentile(90)))
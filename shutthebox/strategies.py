@@ -0,0 +1,31 @@
+"""
+The named strategies of shutthebox, each a pair of ComputerTurn decision
+methods, as played by the tournament and measured by the benchmarks.
+"""
+
+from .bill import DEFAULT_BILL_FILENAME
+from .box import Box
+from .dice import Dice
+from .computerturn import ComputerTurn
+
+# flap decision method and num dice decision method for each strategy
+STRATEGIES = {
+    'highest': ('highest', 'one_if_poss'),
+    'lowest': ('lowest', 'one_if_poss'),
+    'next_roll_probability': ('next_roll_probability', 'one_if_poss'),
+    'expectimax': ('expectimax', 'one_if_poss'),
+    'optimal': ('optimal', 'optimal'),
+    'bill': ('bill', 'one_if_poss'),
+}
+
+def available_strategies(bill_filename=DEFAULT_BILL_FILENAME):
+    """
+    Returns the names of the strategies in STRATEGIES which can be used,
+    leaving out 'bill' if Durango Bill's file can't be found.
+
+    bill_filename (str): name or path of Bill's file (default as for
+        ComputerTurn)
+    """
+    turn = ComputerTurn(Box(), Dice(), bill_filename=bill_filename)
+    return [name for name in STRATEGIES
+            if name != 'bill' or turn.bill_table]
@@ -0,0 +1,61 @@
+"""
+Tests for the batch simulator of shutthebox, which requires NumPy.
+"""
+
+from nose.plugins.skip import SkipTest
+from nose.tools import raises
+import shutthebox
+from shutthebox.policy import tabulate_policy
+
+try:
+    from shutthebox.batch import simulate_batch, simulate_batch_turn
+except ImportError: # pragma: no cover
+    simulate_batch = simulate_batch_turn = None
+
+# pylint: disable=missing-docstring
+# pylint: disable=no-self-use
+# pylint: disable=attribute-defined-outside-init
+
+class TestBatch:
+    def setup(self):
+        if simulate_batch is None: # pragma: no cover
+            raise SkipTest('NumPy is not installed')
+        self.turn = shutthebox.ComputerTurn(
+            shutthebox.Box(), shutthebox.Dice())
+        self.policy = tabulate_policy(
+            self.turn, self.turn.make_flap_decision_optimal,
+            self.turn.make_num_dice_decision_optimal)
+
+    def test_returns_valid_scores(self):
+        scores = simulate_batch(self.policy, 1000, seed=1)
+        assert len(scores) == 1000
+        assert scores.min() >= 0 and scores.max() <= 45
+
+    def test_same_seed_same_scores(self):
+        assert (simulate_batch(self.policy, 1000, seed=2) ==
+                simulate_batch(self.policy, 1000, seed=2)).all()
+
+    def test_no_turns(self):
+        assert len(simulate_batch(self.policy, 0)) == 0
+
+    @raises(ValueError)
+    def test_number_of_turns_negative(self):
+        simulate_batch(self.policy, -1)
+
+    def test_mean_close_to_optimal_expected_score(self):
+        scores = simulate_batch(self.policy, 100000, seed=3)
+        expected = self.turn.get_optimal_strategy().expected_scores[-1]
+        assert abs(scores.mean() - expected) < 0.2
+
+    def test_single_flap_box(self):
+        turn = shutthebox.ComputerTurn(shutthebox.Box(1), shutthebox.Dice())
+        scores = simulate_batch_turn(
+            turn, 6000, flap_decision_method=turn.make_flap_decision_highest,
+            seed=4)
+        # flap 1 can only be lowered by rolling a 1 with a single die
+        assert set(scores.tolist()) == {0, 1}
+        assert 800 < (scores == 0).sum() < 1200
+
+    @raises(ValueError)
+    def test_faces_must_match_policy(self):
+        simulate_batch(self.policy, 10, seed=5, faces=range(1, 8))
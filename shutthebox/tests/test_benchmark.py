@@ -0,0 +1,74 @@
+"""
+Tests for the benchmarks of shutthebox.
+"""
+
+import os
+import tempfile
+import shutthebox
+from shutthebox import benchmark
+
+# pylint: disable=missing-docstring
+# pylint: disable=no-self-use
+# pylint: disable=attribute-defined-outside-init
+
+def make_results(**values):
+    return {'metrics': {
+        name: {'value': value, 'unit': 'x',
+               'higher_is_better': name.startswith('turns')}
+        for name, value in values.items()}}
+
+class TestBenchmark:
+    def test_available_strategies_without_bill(self):
+        strategies = benchmark.available_strategies('wrong.txt')
+        assert 'bill' not in strategies
+        assert 'optimal' in strategies
+
+    def test_run_benchmarks(self):
+        results = benchmark.run_benchmarks(num_turns=20,
+                                           bill_filename='wrong.txt')
+        metrics = results['metrics']
+        assert metrics['decision.highest']['value'] > 0
+        assert metrics['turns.optimal']['higher_is_better']
+        assert metrics['memory.lowest']['unit'] == 'bytes/turn'
+        assert 'construction' in metrics
+        assert 'construction_with_bill' not in metrics
+
+    def test_caches_cleared(self):
+        # pylint: disable=protected-access
+        turn = shutthebox.ComputerTurn(shutthebox.Box(12), shutthebox.Dice())
+        turn.perform_turn(
+            flap_decision_method=turn.make_flap_decision_expectimax)
+        benchmark._clear_caches(turn)
+        assert len(turn.expectimax_table) == 0
+        assert turn.move_index._find_moves.cache_info().currsize == 0
+
+    def test_decisions_uncached(self):
+        # searching from scratch every time is slower than one-roll
+        # lookahead, which it would not be if the table was kept
+        assert (benchmark.benchmark_decisions('expectimax') >
+                benchmark.benchmark_decisions('next_roll_probability'))
+
+    def test_save_and_load(self):
+        results = make_results(turns_a=1.5)
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'results.json')
+            benchmark.save_results(results, file_path)
+            assert benchmark.load_results(file_path) == results
+
+    def test_compare_no_regressions(self):
+        baseline = make_results(turns_a=100, decision_a=1.0)
+        current = make_results(turns_a=95, decision_a=1.05, decision_b=9)
+        assert benchmark.compare_results(baseline, current, 0.1) == []
+
+    def test_compare_lower_is_better_regression(self):
+        baseline = make_results(decision_a=1.0)
+        current = make_results(decision_a=1.2)
+        regressions = benchmark.compare_results(baseline, current, 0.1)
+        assert len(regressions) == 1
+        assert regressions[0].startswith('decision_a')
+
+    def test_compare_higher_is_better_regression(self):
+        baseline = make_results(turns_a=100)
+        current = make_results(turns_a=80)
+        assert len(benchmark.compare_results(baseline, current, 0.1)) == 1
+        assert benchmark.compare_results(baseline, current, 0.25) == []
@@ -0,0 +1,75 @@
+"""
+Tests for loading Durango Bill's optimal strategy table in shutthebox.
+"""
+
+import itertools
+import os
+import tempfile
+import shutthebox
+from shutthebox import bill
+
+# pylint: disable=missing-docstring
+# pylint: disable=no-self-use
+# pylint: disable=attribute-defined-outside-init
+
+def write_bill_file(file_path):
+    """
+    Write a file in the format of Durango Bill's table in which the only
+    moves are to lower flap 9 on rolling 9 and flaps 1 and 2 on rolling 3
+    """
+    lines = ['header'] * 21
+    for length in range(0, 9 + 1):
+        for flaps_down in itertools.combinations(range(1, 9 + 1), length):
+            cells = ['0'] * 12
+            if 9 not in flaps_down:
+                cells[9 - 1] = '9'
+            if 1 not in flaps_down and 2 not in flaps_down:
+                cells[3 - 1] = '12'
+            lines.append(' '.join(
+                [''.join(str(n) for n in flaps_down) or '0', '0.0'] + cells))
+    with open(file_path, 'w') as bill_file:
+        bill_file.write('\n'.join(lines) + '\n')
+
+class TestBill:
+    def setup(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.directory.name, 'bill.txt')
+        write_bill_file(self.file_path)
+
+    def teardown(self):
+        self.directory.cleanup()
+
+    def test_import_bill(self):
+        table = bill.import_bill(self.file_path)
+        assert len(table) == 512
+        assert table[()][9] == [9]
+        assert table[(9,)][9] == []
+
+    def test_load_bill_table(self):
+        policy = bill.load_bill_table(self.file_path)
+        assert policy.get_move_mask(0b111111111, 9) == 0b100000000
+        assert policy.get_move_mask(0b111111111, 3) == 0b000000011
+        assert policy.get_move_mask(0b011111111, 9) == 0
+        assert policy.get_num_dice(0b000000111) == 1
+
+    def test_loaded_once_per_process(self):
+        assert (bill.load_bill_table(self.file_path) is
+                bill.load_bill_table(self.file_path))
+
+    def test_binary_cache_written_and_used(self):
+        policy = bill.load_bill_table(self.file_path)
+        assert os.path.exists(self.file_path + '.stbp')
+        # forget the parsed table so that the binary copy is loaded
+        bill._BILL_TABLES.clear() # pylint: disable=protected-access
+        loaded = bill.load_bill_table(self.file_path)
+        assert loaded is not policy
+        assert list(loaded.moves) == list(policy.moves)
+
+    def test_computer_turn_uses_table(self):
+        turn = shutthebox.ComputerTurn(
+            shutthebox.Box(), shutthebox.Dice(),
+            bill_filename=self.file_path)
+        assert turn.make_flap_decision_bill(
+            3, turn.make_num_dice_decision_one_if_poss) == [1, 2]
+        assert turn.make_flap_decision_bill(
+            4, turn.make_num_dice_decision_one_if_poss) is False
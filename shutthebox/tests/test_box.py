@@ -68,3 +68,52 @@ class TestBox:
         self.big_box.flaps[11].lower()
         assert str(self.big_box) == ('  UP: 1 2 3 4 5 6   8 9 10    12\n' +
                                      'DOWN:             7        11   ')
+
+    def test_up_mask_all_up(self):
+        assert self.box.up_mask == 0b111111111
+        assert self.box.get_lowered_mask() == 0
+
+    def test_lower_flap_updates_mask_and_sum(self):
+        self.box.lower_flap(3)
+        assert self.box.up_mask == 0b111111011
+        assert self.box.get_lowered_mask() == 0b000000100
+        assert self.box.sum_available_flaps() == 42
+
+    def test_flap_view_reflects_box_state(self):
+        self.box.lower_flap(5)
+        assert self.box.flaps[5].is_down
+        self.box.flaps[6].lower()
+        assert self.box.get_lowered_flap_nums() == (5, 6)
+
+    @raises(RuntimeError)
+    def test_lower_flap_already_down(self):
+        self.box.lower_flap(2)
+        self.box.flaps[2].lower()
+
+    def test_get_available_flap_nums(self):
+        self.box.lower_flaps_except([2, 4, 9])
+        assert self.box.get_available_flap_nums() == (2, 4, 9)
+        assert self.box.sum_available_flaps() == 15
+
+    def test_flap_nums_from_mask(self):
+        assert shutthebox.box.flap_nums_from_mask(0b101001) == (1, 4, 6)
+        assert shutthebox.box.flap_nums_from_mask(0) == ()
+
+    def test_set_up_mask(self):
+        self.box.set_up_mask(0b100000011)
+        assert self.box.get_available_flap_nums() == (1, 2, 9)
+        assert self.box.sum_available_flaps() == 12
+        assert self.box.flaps[3].is_down
+
+    @raises(ValueError)
+    def test_set_up_mask_too_large(self):
+        self.box.set_up_mask(1 << 9)
+
+    def test_reset(self):
+        flaps = self.big_box.flaps
+        self.big_box.lower_flaps_except([1])
+        self.big_box.reset()
+        assert self.big_box.flaps is flaps
+        assert self.big_box.num_flaps == 12
+        assert self.big_box.sum_available_flaps() == 78
+        assert not self.big_box.flaps[12].is_down
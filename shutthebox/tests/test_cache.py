@@ -0,0 +1,112 @@
+"""
+Tests for the DecisionCache class and cached_decision decorator of
+shutthebox.
+"""
+
+from nose.tools import raises
+import shutthebox
+from shutthebox.cache import DecisionCache
+
+# pylint: disable=missing-docstring
+# pylint: disable=no-self-use
+# pylint: disable=attribute-defined-outside-init
+
+class TestDecisionCache:
+    def setup(self):
+        self.cache = DecisionCache(maxsize=2)
+        self.turn = shutthebox.ComputerTurn(
+            shutthebox.Box(), shutthebox.Dice())
+        self.turn.decision_cache = DecisionCache()
+
+    @raises(ValueError)
+    def test_maxsize_too_small(self):
+        DecisionCache(maxsize=0)
+
+    def test_get_counts_hits_and_misses(self):
+        self.cache.put('a', [1])
+        assert self.cache.get('a') == [1]
+        assert self.cache.get('b') is None
+        assert self.cache.info() == {'hits': 1, 'misses': 1,
+                                     'size': 1, 'maxsize': 2}
+
+    def test_least_recently_used_evicted(self):
+        self.cache.put('a', 1)
+        self.cache.put('b', 2)
+        self.cache.get('a')
+        self.cache.put('c', 3)
+        assert self.cache.get('b') is None
+        assert self.cache.get('a') == 1
+        assert len(self.cache) == 2
+
+    def test_resize_evicts(self):
+        self.cache.put('a', 1)
+        self.cache.put('b', 2)
+        self.cache.resize(1)
+        assert self.cache.get('a') is None
+        assert self.cache.get('b') == 2
+
+    def test_clear(self):
+        self.cache.put('a', 1)
+        self.cache.get('a')
+        self.cache.clear()
+        assert self.cache.info() == {'hits': 0, 'misses': 0,
+                                     'size': 0, 'maxsize': 2}
+
+    def test_decision_cached(self):
+        cache = self.turn.decision_cache
+        one_if_poss = self.turn.make_num_dice_decision_one_if_poss
+        flap_nums = self.turn.make_flap_decision_next_roll_probability(
+            7, one_if_poss)
+        assert self.turn.make_flap_decision_next_roll_probability(
+            7, one_if_poss) == flap_nums
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_decision_shared_between_instances(self):
+        other_turn = shutthebox.ComputerTurn(
+            shutthebox.Box(), shutthebox.Dice())
+        other_turn.decision_cache = self.turn.decision_cache
+        self.turn.make_flap_decision_next_roll_probability(
+            7, self.turn.make_num_dice_decision_one_if_poss)
+        other_turn.make_flap_decision_next_roll_probability(
+            7, other_turn.make_num_dice_decision_one_if_poss)
+        assert self.turn.decision_cache.hits == 1
+
+    def test_decision_depends_on_box_state(self):
+        one_if_poss = self.turn.make_num_dice_decision_one_if_poss
+        assert self.turn.make_flap_decision_next_roll_probability(
+            9, one_if_poss) == [9]
+        self.turn.box.lower_flap(9)
+        assert self.turn.make_flap_decision_next_roll_probability(
+            9, one_if_poss) != [9]
+
+    def test_cached_impossible_decision(self):
+        one_if_poss = self.turn.make_num_dice_decision_one_if_poss
+        self.turn.box.lower_flaps_except([3])
+        assert self.turn.make_flap_decision_next_roll_probability(
+            2, one_if_poss) is False
+        assert self.turn.make_flap_decision_next_roll_probability(
+            2, one_if_poss) is False
+        assert self.turn.decision_cache.hits == 1
+
+    def test_cached_decision_not_altered_by_caller(self):
+        one_if_poss = self.turn.make_num_dice_decision_one_if_poss
+        flap_nums = self.turn.make_flap_decision_next_roll_probability(
+            9, one_if_poss)
+        flap_nums.append(1)
+        assert self.turn.make_flap_decision_next_roll_probability(
+            9, one_if_poss) == [9]
+
+    def test_caching_disabled(self):
+        self.turn.decision_cache = None
+        assert self.turn.make_flap_decision_highest(7) == [7]
+        assert self.turn.make_flap_decision_next_roll_probability(
+            9, self.turn.make_num_dice_decision_one_if_poss) == [9]
+
+    def test_table_lookups_not_cached(self):
+        # looking up these decisions is quicker than caching them
+        cache = self.turn.decision_cache
+        self.turn.make_flap_decision_highest(7)
+        self.turn.make_flap_decision_lowest(7)
+        self.turn.make_flap_decision_optimal(7)
+        assert cache.info()['hits'] == cache.info()['misses'] == 0
+        assert len(cache) == 0
@@ -0,0 +1,113 @@
+"""
+Tests for the command line interface of shutthebox and the lazy
+imports which keep it fast to start.
+"""
+
+import contextlib
+import io
+import subprocess
+import sys
+from nose.tools import raises
+import shutthebox
+from shutthebox.box import Box
+from shutthebox.cli import main
+from shutthebox.tournament import run_tournament
+
+# pylint: disable=missing-docstring
+# pylint: disable=no-self-use
+# pylint: disable=attribute-defined-outside-init
+
+def run_main(argv, stdin=''):
+    """
+    Returns the exit status and output of main() with the supplied
+    arguments and input.
+    """
+    output = io.StringIO()
+    original_stdin = sys.stdin
+    sys.stdin = io.StringIO(stdin)
+    try:
+        with contextlib.redirect_stdout(output):
+            status = main(argv)
+    finally:
+        sys.stdin = original_stdin
+    return status, output.getvalue()
+
+class TestMain:
+    @raises(SystemExit)
+    def test_unknown_command(self):
+        with contextlib.redirect_stderr(io.StringIO()):
+            main(['unknown'])
+
+    @raises(SystemExit)
+    def test_command_help(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            main(['simulate', '--help'])
+
+    def test_simulate(self):
+        status, output = run_main(['simulate', '--turns', '500', '--seed',
+                                   '1', '--flap-decision', 'highest'])
+        assert status == 0
+        assert 'Turns: 500' in output
+
+    def test_simulate_scores(self):
+        status, output = run_main(['simulate', '--turns', '20', '--seed',
+                                   '1', '--scores'])
+        assert status == 0
+        assert len(output.split()) == 20
+
+    def test_simulate_same_as_before(self):
+        # the arguments of the simulate_*.py scripts are unchanged
+        first = run_main(['simulate', '--turns', '300', '--seed', '2',
+                          '--num-dice-decision', 'always_all'])
+        second = run_main(['simulate', '--turns', '300', '--seed', '2',
+                           '--num-dice-decision', 'always_all'])
+        assert first == second
+
+    def test_solve(self):
+        status, output = run_main(['solve', '--flaps', '4'])
+        assert status == 0
+        assert output.startswith('expected score: ')
+        assert 'shut the box: ' in output
+
+    def test_play_until_end_of_input(self):
+        status, output = run_main(['play', '--flaps', '3'])
+        assert status == 0
+        assert output.endswith('\n')
+
+    def test_play(self):
+        # roll one die, lower no flaps and don't play again
+        status, output = run_main(['play', '--flaps', '3'], '1\n\nN\n')
+        assert status == 0
+        assert 'Dice total: ' in output
+        assert 'Play another turn?' in output
+
+    def test_tournament_rules(self):
+        status, output = run_main(['tournament', 'highest', 'lowest',
+                                   '--flaps', '4', '--dice', '1',
+                                   '--turns', '200', '--seed', '1',
+                                   '--workers', '1'])
+        assert status == 0
+        expected = run_tournament(200, ['highest', 'lowest'], num_flaps=4,
+                                  num_dice=1, seed=1)
+        assert output == expected.format(0.95) + '\n'
+
+class TestLazyImports:
+    def test_classes_available(self):
+        assert shutthebox.Box is Box
+        assert 'ComputerTurn' in dir(shutthebox)
+
+    @raises(AttributeError)
+    def test_missing_attribute(self):
+        shutthebox.NoSuchClass # pylint: disable=no-member,pointless-statement
+
+    def test_package_imports_little(self):
+        # importing the package and the command line interface mustn't
+        # import the modules needed only by particular commands
+        output = subprocess.check_output([
+            sys.executable, '-c',
+            'import sys, shutthebox.cli; print(sorted(sys.modules))'],
+                                         universal_newlines=True)
+        for module in ['shutthebox.box', 'shutthebox.computerturn',
+                       'shutthebox.simulation', 'concurrent.futures',
+                       'numpy']:
+            assert "'" + module + "'" not in output
@@ -4,6 +4,7 @@ Tests for the ComputerTurn class of shutthebox.
 
 from nose.tools import raises
 import shutthebox
+from shutthebox.evaluation import expected_score, score_distribution
 
 # pylint: disable=missing-docstring
 # pylint: disable=no-self-use
@@ -164,3 +165,136 @@ class TestComputerTurn:
     def test_turn_with_debug(self):
         score = self.turn.perform_turn(debug=True)
         assert isinstance(score, int) and 0 <= score <= 45
+
+    def test_get_flap_decision_method(self):
+        assert (self.turn.get_flap_decision_method('highest') ==
+                self.turn.make_flap_decision_highest)
+
+    def test_get_num_dice_decision_method(self):
+        assert (self.turn.get_num_dice_decision_method('always_all') ==
+                self.turn.make_num_dice_decision_always_all)
+
+    @raises(ValueError)
+    def test_get_decision_method_unknown(self):
+        self.turn.get_flap_decision_method('banana')
+
+    def test_dice_sum_probabilities_custom_dice(self):
+        dice = shutthebox.Dice(1, faces=(1, 2, 3, 4))
+        turn = shutthebox.ComputerTurn(shutthebox.Box(), dice)
+        assert turn.dice_sum_probabilities == {1: 0.25, 2: 0.25,
+                                               3: 0.25, 4: 0.25}
+
+    def test_calculate_success_probability_custom_dice(self):
+        dice = shutthebox.Dice(2, faces=(1, 2))
+        turn = shutthebox.ComputerTurn(shutthebox.Box(), dice)
+        # sums 2, 3, 4 with probability 1/4, 1/2, 1/4
+        prob = turn.calculate_success_probability(
+            [2, 9], turn.make_num_dice_decision_always_all)
+        assert abs(prob - 0.25) < 0.001
+
+    def test_turn_keeps_box_size(self):
+        turn = shutthebox.ComputerTurn(shutthebox.Box(5), shutthebox.Dice())
+        flaps = turn.box.flaps
+        turn.perform_turn(flap_decision_method=turn.make_flap_decision_highest)
+        assert turn.box.num_flaps == 5
+        assert turn.box.sum_available_flaps() == 15
+        assert turn.box.flaps is flaps
+
+class TestExpectimax:
+    def setup(self):
+        self.turn = shutthebox.ComputerTurn(shutthebox.Box(),
+                                            shutthebox.Dice())
+        self.turn.decision_cache = None
+        self.one_if_poss = self.turn.make_num_dice_decision_one_if_poss
+
+    def test_impossible(self):
+        self.turn.box.lower_flaps_except([3])
+        assert self.turn.make_flap_decision_expectimax(
+            2, self.one_if_poss) is False
+
+    def test_1to5_roll_7(self):
+        self.turn.box.lower_flaps_except([1, 2, 3, 4, 5])
+        flaps = self.turn.make_flap_decision_expectimax(7, self.one_if_poss)
+        assert sum(flaps) == 7
+        assert flaps == sorted(flaps)
+
+    def test_depth_0_as_next_roll_probability(self):
+        # the flaps left have the same chance of success on the next
+        # roll, though equally good choices may differ by rounding
+        self.turn.expectimax_depth = 0
+        for up_mask in range(1, 1 << 9):
+            self.turn.box.set_up_mask(up_mask)
+            up_flaps = self.turn.box.get_available_flaps()
+            for dice_total in range(2, 13):
+                expectimax = self.turn.make_flap_decision_expectimax(
+                    dice_total, self.one_if_poss)
+                next_roll = \
+                    self.turn.make_flap_decision_next_roll_probability(
+                        dice_total, self.one_if_poss)
+                if not next_roll:
+                    assert expectimax is False
+                    continue
+                probs = [self.turn.calculate_success_probability(
+                    [flap_num for flap_num in up_flaps
+                     if flap_num not in flap_nums], self.one_if_poss)
+                         for flap_nums in [expectimax, next_roll]]
+                assert abs(probs[0] - probs[1]) < 1e-9
+
+    def test_deeper_is_better(self):
+        expected_scores = []
+        for depth in [0, 1, 3]:
+            self.turn.expectimax_depth = depth
+            expected_scores.append(expected_score(score_distribution(
+                self.turn, self.turn.make_flap_decision_expectimax,
+                self.one_if_poss)))
+        assert expected_scores[0] > expected_scores[1] > expected_scores[2]
+        optimal = self.turn.get_optimal_strategy().expected_scores[
+            self.turn.box.full_mask]
+        assert abs(expected_scores[2] - optimal) < 0.001
+
+    def test_table_persists_across_turns(self):
+        self.turn.perform_turn(
+            flap_decision_method=self.turn.make_flap_decision_expectimax)
+        table = dict(self.turn.expectimax_table.decisions)
+        assert table
+        self.turn.perform_turn(
+            flap_decision_method=self.turn.make_flap_decision_expectimax)
+        for key, value in table.items():
+            assert self.turn.expectimax_table.decisions[key] == value
+
+    def test_table_reused(self):
+        # a value in the table is used without searching again
+        self.turn.expectimax_table.put((0b111111110, 1, True, 6, 0.001), -1)
+        self.turn.expectimax_depth = 1
+        assert self.turn.make_flap_decision_expectimax(
+            1, self.one_if_poss) == [1]
+
+    def test_prune_unlikely_dice_totals(self):
+        turn = shutthebox.ComputerTurn(shutthebox.Box(),
+                                       shutthebox.Dice(3))
+        # only a total of 3, with probability 1/216, lowers flap 3
+        turn.expectimax_min_probability = 0.01
+        assert abs(turn.expectimax_value(0b100, 3, 1, False) - 3) < 1e-9
+        turn.expectimax_min_probability = 0
+        assert abs(turn.expectimax_value(0b100, 3, 1, False) -
+                   3 * 215 / 216) < 1e-9
+
+    def test_settings_change_values(self):
+        # flaps 1 and 2 can only be lowered with a single die
+        turn = shutthebox.ComputerTurn(shutthebox.Box(), shutthebox.Dice())
+        with_single_die = turn.expectimax_value(0b11, 3, 1, True)
+        turn.max_flap_sum_single_die = 0
+        assert turn.expectimax_value(0b11, 3, 1, True) > with_single_die
+
+    def test_table_size_limited(self):
+        turn = shutthebox.ComputerTurn(shutthebox.Box(), shutthebox.Dice())
+        turn.expectimax_table.resize(10)
+        turn.expectimax_depth = 3
+        turn.perform_turn(
+            flap_decision_method=turn.make_flap_decision_expectimax)
+        assert len(turn.expectimax_table) == 10
+
+    @raises(ValueError)
+    def test_invalid_depth(self):
+        self.turn.expectimax_depth = -1
+        self.turn.make_flap_decision_expectimax(7, self.one_if_poss)
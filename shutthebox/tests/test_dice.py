@@ -2,6 +2,8 @@
 Tests for the Dice class of shutthebox.
 """
 
+import random
+from nose.plugins.skip import SkipTest
 from nose.tools import raises
 import shutthebox
 
@@ -57,3 +59,107 @@ class TestDice:
     @raises(ValueError)
     def test_roll_dice_non_int(self):
         self.two_dice.roll(1.5)
+
+    def test_default_faces(self):
+        assert self.two_dice.faces == (1, 2, 3, 4, 5, 6)
+        assert self.two_dice.max_total() == 12
+        assert self.two_dice.max_total(1) == 6
+
+    @raises(ValueError)
+    def test_faces_empty(self):
+        shutthebox.Dice(faces=())
+
+    @raises(ValueError)
+    def test_faces_too_small(self):
+        shutthebox.Dice(faces=(0, 1, 2))
+
+    @raises(ValueError)
+    def test_weights_wrong_length(self):
+        shutthebox.Dice(weights=(1, 2))
+
+    @raises(ValueError)
+    def test_weights_all_zero(self):
+        shutthebox.Dice(faces=(1, 2), weights=(0, 0))
+
+    def test_roll_custom_faces(self):
+        dice = shutthebox.Dice(3, faces=(2, 4))
+        # try 1000 rolls
+        for _ in range(0, 1000):
+            assert dice.roll() in (6, 8, 10, 12)
+
+    def test_roll_weighted_never_zero_weight_face(self):
+        dice = shutthebox.Dice(1, faces=(1, 2, 3), weights=(1, 0, 1))
+        # try 1000 rolls
+        for _ in range(0, 1000):
+            assert dice.roll() in (1, 3)
+
+    def test_sum_probabilities_two_dice(self):
+        probabilities = self.two_dice.sum_probabilities()
+        assert list(probabilities) == list(range(2, 12 + 1))
+        assert probabilities[7] == 6 / 36
+
+    def test_sum_probabilities_single_die_from_two(self):
+        assert self.two_dice.sum_probabilities(1) == {
+            n: 1 / 6 for n in range(1, 6 + 1)}
+
+    def test_sum_probabilities_weighted(self):
+        dice = shutthebox.Dice(2, faces=(1, 2), weights=(3, 1))
+        assert dice.sum_probabilities() == {2: 9 / 16, 3: 6 / 16, 4: 1 / 16}
+
+    def test_sum_probabilities_many_dice(self):
+        probabilities = shutthebox.dice.dice_sum_probabilities(20)
+        assert len(probabilities) == 101
+        assert round(sum(probabilities.values()), 9) == 1
+
+    def test_sum_probabilities_not_shared(self):
+        self.two_dice.sum_probabilities()[7] = 0
+        assert self.two_dice.sum_probabilities()[7] == 6 / 36
+
+    def test_seeded_rng_repeatable(self):
+        first = shutthebox.Dice(rng=random.Random(1))
+        second = shutthebox.Dice(rng=random.Random(1))
+        assert ([first.roll() for _ in range(0, 2000)] ==
+                [second.roll() for _ in range(0, 2000)])
+
+    def test_seeded_rng_independent_of_global_random(self):
+        dice = shutthebox.Dice(rng=random.Random(2))
+        expected = [dice.roll() for _ in range(0, 10)]
+        dice = shutthebox.Dice(rng=random.Random(2))
+        random.seed(3)
+        random.random()
+        assert [dice.roll() for _ in range(0, 10)] == expected
+
+    def test_roll_with_rng_returns_int(self):
+        dice = shutthebox.Dice(rng=random.Random(4))
+        for _ in range(0, 1000):
+            total = dice.roll()
+            assert isinstance(total, int) and 2 <= total <= 12
+
+    def test_roll_many(self):
+        totals = self.two_dice.roll_many(1000)
+        assert len(totals) == 1000
+        assert all(2 <= total <= 12 for total in totals)
+
+    def test_roll_many_single_die_with_rng(self):
+        dice = shutthebox.Dice(rng=random.Random(5))
+        totals = dice.roll_many(1000, 1)
+        assert set(totals) == {1, 2, 3, 4, 5, 6}
+
+    def test_roll_many_numpy_generator(self):
+        try:
+            import numpy # pylint: disable=import-outside-toplevel
+        except ImportError: # pragma: no cover
+            raise SkipTest('NumPy is not installed')
+        dice = shutthebox.Dice(rng=numpy.random.default_rng(6))
+        totals = dice.roll_many(1000)
+        assert totals.shape == (1000,)
+        assert totals.min() >= 2 and totals.max() <= 12
+        assert isinstance(dice.roll(), int)
+
+    @raises(ValueError)
+    def test_roll_many_count_negative(self):
+        self.two_dice.roll_many(-1)
+
+    @raises(ValueError)
+    def test_roll_many_dice_too_many(self):
+        self.one_die.roll_many(10, 2)
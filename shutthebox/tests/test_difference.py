@@ -0,0 +1,78 @@
+"""
+Tests for the decision method comparison of shutthebox.
+"""
+
+from nose.tools import raises
+import shutthebox
+from shutthebox.difference import (compare_decisions, compare_chunk,
+                                   get_dice_counts)
+
+# pylint: disable=missing-docstring
+# pylint: disable=no-self-use
+# pylint: disable=attribute-defined-outside-init
+
+class TestDifference:
+    def setup(self):
+        self.differences = compare_decisions(
+            ['highest', 'next_roll_probability', 'optimal'], num_flaps=6)
+
+    def test_dice_counts(self):
+        turn = shutthebox.ComputerTurn(shutthebox.Box(), shutthebox.Dice())
+        assert get_dice_counts(turn) == (2,)
+        turn.box.lower_flaps_except([1, 5])
+        assert get_dice_counts(turn) == (1, 2)
+
+    def test_num_situations(self):
+        # every state, dice count and total with at least one legal move
+        num_situations, _ = compare_chunk(
+            [0b1], ['highest', 'lowest'], 'one_if_poss', 1, 2)
+        assert num_situations == 1 # rolling a single die and getting 1
+
+    def test_identical_methods_never_disagree(self):
+        differences = compare_decisions(['optimal', 'optimal'], num_flaps=5)
+        assert differences.num_situations > 0
+        assert differences.disagreements == []
+        assert differences.get_disagreement_matrix() == [[0, 0], [0, 0]]
+
+    def test_disagreements_differ(self):
+        assert self.differences.disagreements
+        for _, _, _, decisions in self.differences.disagreements:
+            assert len(set(decisions)) > 1
+
+    def test_disagreement_matrix_symmetric(self):
+        matrix = self.differences.get_disagreement_matrix()
+        for a in range(0, 3):
+            assert matrix[a][a] == 0
+            for b in range(0, 3):
+                assert matrix[a][b] == matrix[b][a]
+
+    def test_optimal_never_costs(self):
+        costs = self.differences.get_cost_matrix()
+        assert costs[0][2] > 0
+        assert costs[1][2] > 0
+        assert costs[2][0] == -costs[0][2]
+
+    def test_mean_cost(self):
+        means = self.differences.get_mean_cost_matrix()
+        counts = self.differences.get_disagreement_matrix()
+        costs = self.differences.get_cost_matrix()
+        assert means[0][2] == costs[0][2] / counts[0][2]
+        assert means[0][0] == 0
+
+    def test_same_results_however_many_workers(self):
+        parallel = compare_decisions(
+            ['highest', 'next_roll_probability', 'optimal'], num_flaps=6,
+            workers=2)
+        assert parallel.num_situations == self.differences.num_situations
+        assert parallel.disagreements == self.differences.disagreements
+
+    def test_str(self):
+        assert 'Disagreements' in str(self.differences)
+
+    @raises(ValueError)
+    def test_one_method(self):
+        compare_decisions(['highest'])
+
+    @raises(ValueError)
+    def test_unknown_method(self):
+        compare_decisions(['highest', 'no_such_method'])
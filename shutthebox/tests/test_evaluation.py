@@ -0,0 +1,52 @@
+"""
+Tests for the exact evaluation of decision methods in shutthebox.
+"""
+
+import shutthebox
+from shutthebox.evaluation import expected_score, score_distribution
+
+# pylint: disable=missing-docstring
+# pylint: disable=no-self-use
+# pylint: disable=attribute-defined-outside-init
+
+class TestEvaluation:
+    def setup(self):
+        self.turn = shutthebox.ComputerTurn(
+            shutthebox.Box(), shutthebox.Dice())
+
+    def test_probabilities_sum_to_one(self):
+        distribution = score_distribution(
+            self.turn, self.turn.make_flap_decision_highest)
+        assert abs(sum(distribution.values()) - 1) < 1e-9
+        assert list(distribution) == sorted(distribution)
+        assert all(0 <= score <= 45 for score in distribution)
+
+    def test_single_flap_box(self):
+        turn = shutthebox.ComputerTurn(shutthebox.Box(1), shutthebox.Dice())
+        distribution = score_distribution(turn)
+        # flap 1 can only be lowered by rolling a 1 with a single die
+        assert abs(distribution[0] - 1 / 6) < 1e-9
+        assert abs(distribution[1] - 5 / 6) < 1e-9
+
+    def test_optimal_matches_solver(self):
+        distribution = score_distribution(
+            self.turn, self.turn.make_flap_decision_optimal,
+            self.turn.make_num_dice_decision_optimal)
+        expected = self.turn.get_optimal_strategy().expected_scores[-1]
+        assert abs(expected_score(distribution) - expected) < 1e-9
+
+    def test_optimal_no_worse_than_highest(self):
+        optimal = score_distribution(
+            self.turn, self.turn.make_flap_decision_optimal,
+            self.turn.make_num_dice_decision_optimal)
+        highest = score_distribution(
+            self.turn, self.turn.make_flap_decision_highest)
+        assert expected_score(optimal) <= expected_score(highest)
+
+    def test_box_state_restored(self):
+        self.turn.box.lower_flap(9)
+        score_distribution(self.turn, self.turn.make_flap_decision_lowest)
+        assert self.turn.box.get_lowered_flap_nums() == (9,)
+
+    def test_expected_score(self):
+        assert expected_score({0: 0.5, 10: 0.25, 20: 0.25}) == 7.5
@@ -2,6 +2,9 @@
 Tests for the HumanTurn class of shutthebox.
 """
 
+import contextlib
+import io
+import sys
 from nose.tools import raises
 import shutthebox
 
@@ -76,3 +79,51 @@ class TestHumanTurn:
 
     def test_check_flaps_decision_valid_duplicate(self):
         assert self.turn.check_flaps_decision('1 1 2 3 2', 6) == [1, 2, 3]
+
+    def test_perform_turn(self):
+        # lower no flaps after the first roll
+        original_stdin = sys.stdin
+        sys.stdin = io.StringIO('abc\n\n')
+        output = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(output):
+                score = self.turn.perform_turn()
+        finally:
+            sys.stdin = original_stdin
+        assert score == 45
+        assert 'abc is not a valid flap number' in output.getvalue()
+        assert output.getvalue().endswith('Your score was 45\n')
+        assert self.turn.output is print
+        assert self.turn.box.sum_available_flaps() == 45
+
+    def perform(self, method, stdin):
+        original_stdin = sys.stdin
+        sys.stdin = io.StringIO(stdin)
+        output = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(output):
+                result = method()
+        finally:
+            sys.stdin = original_stdin
+        return result, output.getvalue()
+
+    def test_perform_roll(self):
+        # always rolls 1 with both dice
+        self.turn.dice = shutthebox.Dice(faces=(1,))
+        lowered, output = self.perform(self.turn.perform_roll, '2\n')
+        assert lowered
+        assert 'Dice total: 2' in output
+        assert self.turn.box.sum_available_flaps() == 43
+        assert self.turn.output is print
+
+    def test_perform_roll_no_flaps(self):
+        lowered, output = self.perform(self.turn.perform_roll, '\n')
+        assert not lowered
+        assert 'Your score' not in output
+        assert self.turn.box.sum_available_flaps() == 45
+
+    def test_perform_turn_box_shut(self):
+        self.turn.box.lower_flaps_except([])
+        score, output = self.perform(self.turn.perform_turn, '')
+        assert score == 0
+        assert 'shut the box' in output
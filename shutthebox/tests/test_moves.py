@@ -0,0 +1,145 @@
+"""
+Tests for the MoveIndex and SubsetSumMoves classes of shutthebox.
+"""
+
+import itertools
+from nose.tools import raises
+import shutthebox
+from shutthebox.moves import (MoveIndex, SubsetSumMoves, MAX_INDEXED_FLAPS,
+                              get_move_index, get_reachable_sums,
+                              get_success_probabilities)
+
+# pylint: disable=missing-docstring
+# pylint: disable=no-self-use
+# pylint: disable=attribute-defined-outside-init
+
+class TestMoveIndex:
+    def setup(self):
+        self.index = get_move_index(9)
+
+    def test_index_built_once_per_box_size(self):
+        assert get_move_index(9) is self.index
+
+    @raises(ValueError)
+    def test_number_of_flaps_too_small(self):
+        MoveIndex(0)
+
+    def test_moves_all_flaps_up(self):
+        assert self.index.get_moves(0b111111111, 4) == ((4,), (3, 1))
+
+    def test_moves_impossible(self):
+        assert self.index.get_moves(0b000001101, 10) == ()
+
+    def test_moves_dice_total_out_of_range(self):
+        assert self.index.get_moves(0b111111111, 46) == ()
+        assert self.index.get_moves(0b111111111, 0) == ()
+
+    def test_moves_match_combinations(self):
+        small_index = get_move_index(5)
+        for up_mask in range(0, 1 << 5):
+            flap_nums = [n for n in range(1, 6) if up_mask & 1 << (n - 1)]
+            for dice_total in range(1, 13):
+                expected = sorted(
+                    sorted(c) for length in range(1, len(flap_nums) + 1)
+                    for c in itertools.combinations(flap_nums, length)
+                    if sum(c) == dice_total)
+                found = sorted(sorted(c) for c in
+                               small_index.get_moves(up_mask, dice_total))
+                assert found == expected
+
+    def test_highest(self):
+        assert self.index.get_highest(0b000001111, 9) == [2, 3, 4]
+        assert self.index.get_highest(0b000001101, 10) is False
+
+    def test_lowest(self):
+        assert self.index.get_lowest(0b111111111, 8) == [1, 2, 5]
+        assert self.index.get_lowest(0b000001101, 10) is False
+
+    def test_computer_turn_uses_index(self):
+        turn = shutthebox.ComputerTurn(shutthebox.Box(), shutthebox.Dice())
+        assert turn.move_index is self.index
+
+class TestReachableSums:
+    def setup(self):
+        self.reachable_sums = get_reachable_sums(9)
+
+    def test_reachable_sums_1_3_4(self):
+        # 0 (no flaps), 1, 3, 4, 1 + 3, 1 + 4, 3 + 4, 1 + 3 + 4
+        reachable = self.reachable_sums[0b000001101]
+        assert [s for s in range(0, 46) if reachable >> s & 1] == [
+            0, 1, 3, 4, 5, 7, 8]
+
+    def test_reachable_sums_all_flaps(self):
+        assert self.reachable_sums[0b111111111] == (1 << 46) - 1
+
+    def test_reachable_sums_no_flaps(self):
+        assert self.reachable_sums[0] == 1
+
+    def test_success_probabilities_two_dice(self):
+        dice = shutthebox.Dice()
+        probabilities = get_success_probabilities(9, dice.sum_probabilities())
+        assert abs(probabilities[0b000001101] - 20 / 36) < 1e-9
+        assert probabilities[0] == 0
+
+    def test_success_probabilities_computed_once(self):
+        dice = shutthebox.Dice()
+        assert (get_success_probabilities(9, dice.sum_probabilities()) is
+                get_success_probabilities(9, dice.sum_probabilities()))
+
+class TestSubsetSumMoves:
+    def setup(self):
+        self.index = get_move_index(9)
+        self.moves = SubsetSumMoves(9)
+
+    def test_used_for_large_boxes(self):
+        assert isinstance(get_move_index(MAX_INDEXED_FLAPS), MoveIndex)
+        assert isinstance(get_move_index(MAX_INDEXED_FLAPS + 1),
+                          SubsetSumMoves)
+
+    @raises(ValueError)
+    def test_number_of_flaps_too_small(self):
+        SubsetSumMoves(0)
+
+    def test_same_as_index(self):
+        for up_mask in range(0, 1 << 9):
+            for dice_total in range(0, 47):
+                assert (self.moves.get_moves(up_mask, dice_total) ==
+                        self.index.get_moves(up_mask, dice_total))
+                assert (self.moves.get_highest(up_mask, dice_total) ==
+                        self.index.get_highest(up_mask, dice_total))
+                assert (self.moves.get_lowest(up_mask, dice_total) ==
+                        self.index.get_lowest(up_mask, dice_total))
+
+    def test_large_box(self):
+        moves = get_move_index(30)
+        up_mask = (1 << 30) - 1
+        assert moves.get_moves(up_mask, 4) == ((4,), (3, 1))
+        assert moves.get_highest(up_mask, 30) == [30]
+        assert moves.get_lowest(up_mask, 12) == [1, 2, 3, 6]
+        assert moves.get_moves(up_mask, 466) == ()
+        # only flaps 20 and 25 up
+        assert moves.get_highest((1 << 19) | (1 << 24), 12) is False
+
+    def test_clear_cache(self):
+        moves = SubsetSumMoves(9)
+        moves.get_moves(0b111111111, 7)
+        moves.clear_cache()
+        # pylint: disable=protected-access
+        assert moves._find_moves.cache_info().currsize == 0
+
+    def test_large_box_success_probabilities(self):
+        dice = shutthebox.Dice()
+        small = get_success_probabilities(9, dice.sum_probabilities())
+        large = get_success_probabilities(20, dice.sum_probabilities())
+        for up_mask in range(0, 1 << 9):
+            assert large[up_mask] == small[up_mask]
+        # flaps 13 and up can never be lowered with two dice
+        assert large[1 << 12 | 1 << 19] == 0
+
+    def test_large_box_turn(self):
+        turn = shutthebox.ComputerTurn(shutthebox.Box(25), shutthebox.Dice())
+        for name in ['highest', 'lowest', 'next_roll_probability']:
+            score = turn.perform_turn(
+                flap_decision_method=turn.get_flap_decision_method(name))
+            # only flaps 1-12 can ever be lowered with two dice
+            assert 325 - 78 <= score <= 325
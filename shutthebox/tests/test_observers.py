@@ -0,0 +1,138 @@
+"""
+Tests for the observers of shutthebox.
+"""
+
+import contextlib
+import io
+import random
+import shutthebox
+from shutthebox.observers import (TurnObserver, DebugPrinter, DecisionTimer,
+                                  CombinationCounter, TurnLengthCounter)
+
+# pylint: disable=missing-docstring
+# pylint: disable=no-self-use
+# pylint: disable=attribute-defined-outside-init
+
+class RecordingObserver(TurnObserver):
+    def __init__(self):
+        self.events = []
+
+    def on_turn_start(self, turn):
+        self.events.append('start')
+
+    def on_roll(self, turn, num_dice, dice_total):
+        self.events.append('roll')
+
+    def on_decision(self, turn, dice_total, flap_nums, flap_decision_method,
+                    elapsed):
+        self.events.append('decision')
+
+    def on_flaps_lowered(self, turn, flap_nums):
+        self.events.append('lowered')
+
+    def on_turn_end(self, turn, score, num_rolls):
+        self.events.append(('end', score, num_rolls))
+
+class TestObservers:
+    def setup(self):
+        random.seed(4)
+        box = shutthebox.Box()
+        dice = shutthebox.Dice()
+        self.turn = shutthebox.ComputerTurn(box, dice)
+
+    def test_no_observers_by_default(self):
+        assert self.turn.observers == []
+
+    def test_event_order(self):
+        observer = RecordingObserver()
+        self.turn.add_observer(observer)
+        score = self.turn.perform_turn()
+        events = observer.events
+        assert events[0] == 'start'
+        num_rolls = events.count('roll')
+        assert events[-1] == ('end', score, num_rolls)
+        assert events.count('decision') == num_rolls
+        # every roll but the last lowers flaps, unless the box was shut
+        assert events.count('lowered') in (num_rolls - 1, num_rolls)
+
+    def test_remove_observer(self):
+        observer = RecordingObserver()
+        self.turn.add_observer(observer)
+        self.turn.remove_observer(observer)
+        self.turn.perform_turn()
+        assert observer.events == []
+
+    def test_base_observer_does_nothing(self):
+        self.turn.add_observer(TurnObserver())
+        assert 0 <= self.turn.perform_turn() <= 45
+
+    def test_debug_printer(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.turn.perform_turn(debug=True)
+        assert 'Dice total:' in output.getvalue()
+        assert 'Flap sum: 45' in output.getvalue()
+
+    def test_debug_printer_single_die(self):
+        turn = shutthebox.ComputerTurn(shutthebox.Box(3), shutthebox.Dice(1))
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            turn.perform_roll(debug=True)
+        assert 'Rolling single die' in output.getvalue()
+
+    def test_debug_printer_all_dice(self):
+        turn = shutthebox.ComputerTurn(shutthebox.Box(), shutthebox.Dice(1))
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            turn.perform_roll(debug=True)
+        assert 'Rolling all dice' in output.getvalue()
+
+    def test_debug_adds_no_observer(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.turn.perform_turn(debug=True)
+        assert self.turn.observers == []
+
+    def test_debug_printer_is_observer(self):
+        assert isinstance(DebugPrinter(), TurnObserver)
+
+    def test_decision_timer(self):
+        timer = DecisionTimer()
+        self.turn.add_observer(timer)
+        for _ in range(10):
+            self.turn.perform_turn(
+                flap_decision_method=self.turn.make_flap_decision_highest)
+        name = 'make_flap_decision_highest'
+        assert timer.calls[name] >= 10
+        assert timer.mean_time(name) >= 0
+        assert timer.mean_time('make_flap_decision_lowest') is None
+
+    def test_combination_counter(self):
+        counter = CombinationCounter()
+        self.turn.add_observer(counter)
+        for _ in range(10):
+            self.turn.perform_turn()
+        name = 'make_flap_decision_next_roll_probability'
+        assert counter.decisions[name] >= 10
+        assert counter.mean_combinations(name) > 0
+        assert counter.mean_combinations('other') is None
+
+    def test_turn_length_counter(self):
+        counter = TurnLengthCounter()
+        self.turn.add_observer(counter)
+        for _ in range(20):
+            self.turn.perform_turn()
+        assert counter.num_turns == 20
+        assert min(counter.histogram) >= 1
+        assert counter.mean_length >= 1
+
+    def test_turn_length_counter_empty(self):
+        assert TurnLengthCounter().mean_length is None
+
+    def test_same_scores_with_observers(self):
+        scores = [self.turn.perform_turn() for _ in range(50)]
+        random.seed(4)
+        self.turn.add_observer(TurnLengthCounter())
+        assert [self.turn.perform_turn() for _ in range(50)] == scores
+
+    def test_get_moves(self):
+        assert self.turn.get_moves(3) == ((3,), (2, 1))
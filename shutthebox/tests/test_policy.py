@@ -0,0 +1,158 @@
+"""
+Tests for the PolicyTable class and tabulate_policy() function of
+shutthebox.
+"""
+
+import os
+import tempfile
+from nose.tools import raises
+import shutthebox
+from shutthebox.policy import (PolicyTable, compile_policy, dice_fingerprint,
+                               load_policy, tabulate_policy)
+
+# pylint: disable=missing-docstring
+# pylint: disable=no-self-use
+# pylint: disable=attribute-defined-outside-init
+
+class TestPolicyTable:
+    def setup(self):
+        self.turn = shutthebox.ComputerTurn(
+            shutthebox.Box(), shutthebox.Dice())
+        self.policy = tabulate_policy(
+            self.turn, self.turn.make_flap_decision_highest,
+            self.turn.make_num_dice_decision_one_if_poss)
+
+    def test_empty_table(self):
+        policy = PolicyTable(3, 2, 6)
+        assert len(policy.num_dice_choices) == 8
+        assert len(policy.moves) == 8 * 13
+        assert policy.get_move_mask(0b111, 3) == 0
+
+    def test_large_box_move_typecode(self):
+        assert PolicyTable.move_typecode(9) == 'H'
+        assert PolicyTable.move_typecode(20) == 'I'
+
+    @raises(ValueError)
+    def test_too_many_flaps(self):
+        PolicyTable.move_typecode(33)
+
+    def test_num_dice(self):
+        assert self.policy.get_num_dice(0b111111111) == 2
+        assert self.policy.get_num_dice(0b000000111) == 1
+
+    def test_moves_match_decision_method(self):
+        # flaps 2 and 5 i.e. bits 1 and 4
+        assert self.policy.get_move_mask(0b000011111, 7) == 0b000010010
+        assert self.policy.get_move_mask(0b000001101, 10) == 0
+
+    def test_dice_total_out_of_range(self):
+        assert self.policy.get_move_mask(0b111111111, 13) == 0
+
+    def test_box_state_restored(self):
+        self.turn.box.lower_flap(4)
+        tabulate_policy(self.turn, self.turn.make_flap_decision_lowest,
+                        self.turn.make_num_dice_decision_always_all)
+        assert self.turn.box.get_lowered_flap_nums() == (4,)
+        assert self.turn.box.sum_available_flaps() == 41
+
+    def test_flap_decision_method(self):
+        make_flap_decision = self.policy.flap_decision_method(self.turn)
+        self.turn.box.lower_flaps_except([1, 2, 3, 4, 5])
+        assert make_flap_decision(7) == [2, 5]
+        self.turn.box.lower_flaps_except([1, 3, 4])
+        assert make_flap_decision(10) is False
+
+    def test_num_dice_decision_method(self):
+        make_num_dice_decision = self.policy.num_dice_decision_method(
+            self.turn)
+        assert make_num_dice_decision() == 2
+        self.turn.box.lower_flaps_except([1, 2])
+        assert make_num_dice_decision() == 1
+
+    @raises(ValueError)
+    def test_decision_method_rules_must_match(self):
+        turn = shutthebox.ComputerTurn(shutthebox.Box(8), shutthebox.Dice())
+        self.policy.flap_decision_method(turn)
+
+    @raises(ValueError)
+    def test_decision_method_weights_must_match(self):
+        turn = shutthebox.ComputerTurn(
+            shutthebox.Box(), shutthebox.Dice(weights=[1, 1, 1, 1, 1, 2]))
+        self.policy.flap_decision_method(turn)
+
+    def test_fingerprint(self):
+        assert dice_fingerprint() == dice_fingerprint(range(1, 7), [3] * 6)
+        assert dice_fingerprint((1, 2, 3, 4, 5, 7)) != dice_fingerprint()
+        assert len(dice_fingerprint()) == 8
+
+    @raises(ValueError)
+    def test_decision_method_dice_must_match(self):
+        turn = shutthebox.ComputerTurn(
+            shutthebox.Box(), shutthebox.Dice(faces=(1, 2, 3, 4)))
+        self.policy.num_dice_decision_method(turn)
+
+    def test_turn_with_policy_decision_methods(self):
+        for _ in range(0, 100):
+            score = self.turn.perform_turn(
+                num_dice_decision_method=self.policy.num_dice_decision_method(
+                    self.turn),
+                flap_decision_method=self.policy.flap_decision_method(
+                    self.turn))
+            assert isinstance(score, int) and 0 <= score <= 45
+
+class TestPolicyFile:
+    def setup(self):
+        self.turn = shutthebox.ComputerTurn(
+            shutthebox.Box(), shutthebox.Dice())
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.directory.name, 'policy.stbp')
+
+    def teardown(self):
+        self.directory.cleanup()
+
+    def test_compile_and_load(self):
+        policy = compile_policy(
+            self.turn, self.turn.make_flap_decision_optimal,
+            self.turn.make_num_dice_decision_optimal, self.file_path)
+        loaded = load_policy(self.file_path)
+        assert loaded.num_flaps == 9 and loaded.num_dice == 2
+        assert loaded.max_flap_sum_single_die == 6
+        assert list(loaded.moves) == list(policy.moves)
+        assert list(loaded.num_dice_choices) == list(policy.num_dice_choices)
+        assert loaded.get_move_mask(0b000011111, 7) == 0b000001100
+
+    def test_file_is_small(self):
+        compile_policy(self.turn, self.turn.make_flap_decision_highest,
+                       self.turn.make_num_dice_decision_one_if_poss,
+                       self.file_path)
+        # 512 states * 13 dice totals * 2 bytes, plus 512 bytes and header
+        assert os.path.getsize(self.file_path) == 24 + 512 + 512 * 13 * 2
+
+    def test_load_for_same_dice(self):
+        compile_policy(self.turn, self.turn.make_flap_decision_highest,
+                       self.turn.make_num_dice_decision_one_if_poss,
+                       self.file_path)
+        load_policy(self.file_path, dice=shutthebox.Dice(weights=[2] * 6))
+
+    @raises(ValueError)
+    def test_load_for_other_dice(self):
+        compile_policy(self.turn, self.turn.make_flap_decision_highest,
+                       self.turn.make_num_dice_decision_one_if_poss,
+                       self.file_path)
+        load_policy(self.file_path,
+                    dice=shutthebox.Dice(weights=[1, 1, 1, 1, 1, 2]))
+
+    @raises(ValueError)
+    def test_loaded_table_checks_dice(self):
+        compile_policy(self.turn, self.turn.make_flap_decision_highest,
+                       self.turn.make_num_dice_decision_one_if_poss,
+                       self.file_path)
+        turn = shutthebox.ComputerTurn(
+            shutthebox.Box(), shutthebox.Dice(faces=(1, 1, 2, 3, 5, 6)))
+        load_policy(self.file_path).flap_decision_method(turn)
+
+    @raises(ValueError)
+    def test_load_not_policy_file(self):
+        with open(self.file_path, 'wb') as policy_file:
+            policy_file.write(b'not a policy file')
+        load_policy(self.file_path)
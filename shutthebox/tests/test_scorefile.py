@@ -0,0 +1,110 @@
+"""
+Tests for the binary score files of shutthebox.
+"""
+
+import os
+import shutil
+import tempfile
+from nose.tools import raises
+from shutthebox.scorefile import (ScoreFileWriter, load_scores,
+                                  score_typecode)
+from shutthebox.stats import ScoreStats
+
+# pylint: disable=missing-docstring
+# pylint: disable=no-self-use
+# pylint: disable=attribute-defined-outside-init
+
+class TestScoreFile:
+    def setup(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'scores.stbs')
+        self.metadata = {'num_flaps': 9, 'flap_decision': 'highest',
+                         'seed': 3}
+        self.scores = [0, 45, 7, 7, 12, 3]
+        with ScoreFileWriter(self.path, self.metadata) as writer:
+            writer.write(self.scores[:2])
+            writer(self.scores[2:]) # as on_scores
+
+    def teardown(self):
+        shutil.rmtree(self.directory)
+
+    def test_one_byte_per_score(self):
+        # scores start after the header, padded to a multiple of 8 bytes
+        size = os.path.getsize(self.path)
+        assert (size - len(self.scores)) % 8 == 0
+        assert size < 100
+
+    def test_read_scores(self):
+        score_file = load_scores(self.path)
+        assert len(score_file) == 6
+        assert list(score_file.scores) == self.scores
+        assert score_file.metadata == self.metadata
+        assert score_file.max_score == 45
+
+    def test_stats(self):
+        expected = ScoreStats()
+        expected.add_scores(self.scores)
+        stats = load_scores(self.path).get_stats()
+        assert stats.histogram == expected.histogram
+        assert stats.total_squares == expected.total_squares
+
+    def test_stats_range(self):
+        stats = load_scores(self.path).get_stats(1, 3)
+        assert stats.count == 2
+        assert stats.total == 52
+
+    def test_empty_file(self):
+        with ScoreFileWriter(self.path, self.metadata):
+            pass
+        score_file = load_scores(self.path)
+        assert len(score_file) == 0
+        assert score_file.get_stats().count == 0
+
+    def test_two_bytes_for_large_boxes(self):
+        assert score_typecode(45) == 'B'
+        assert score_typecode(300) == 'H'
+        path = os.path.join(self.directory, 'large.stbs')
+        with ScoreFileWriter(path, {'num_flaps': 25}) as writer:
+            writer.write([325, 0, 300])
+        score_file = load_scores(path)
+        assert list(score_file.scores) == [325, 0, 300]
+        assert score_file.get_stats().histogram[300] == 1
+
+    def test_keep(self):
+        with ScoreFileWriter(self.path, self.metadata, keep=4) as writer:
+            writer.write([1, 2])
+        assert list(load_scores(self.path).scores) == [0, 45, 7, 7, 1, 2]
+
+    def test_sync(self):
+        with ScoreFileWriter(self.path, self.metadata) as writer:
+            writer.write([1, 2, 3])
+            writer.sync()
+            assert list(load_scores(self.path).scores) == [1, 2, 3]
+
+    @raises(ValueError)
+    def test_keep_different_metadata(self):
+        ScoreFileWriter(self.path, {'num_flaps': 9, 'seed': 4}, keep=4)
+
+    @raises(ValueError)
+    def test_keep_too_many(self):
+        ScoreFileWriter(self.path, self.metadata, keep=7)
+
+    @raises(ValueError)
+    def test_metadata_without_num_flaps(self):
+        ScoreFileWriter(self.path, {'seed': 1})
+
+    @raises(ValueError)
+    def test_not_score_file(self):
+        path = os.path.join(self.directory, 'other')
+        with open(path, 'wb') as other_file:
+            other_file.write(b'not a score file')
+        load_scores(path)
+
+    @raises(ValueError)
+    def test_truncated_score(self):
+        path = os.path.join(self.directory, 'large.stbs')
+        with ScoreFileWriter(path, {'num_flaps': 25}) as writer:
+            writer.write([325])
+        with open(path, 'ab') as score_file:
+            score_file.write(b'\x00')
+        load_scores(path)
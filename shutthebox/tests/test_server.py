@@ -0,0 +1,52 @@
+"""
+Tests for the game server of shutthebox.
+"""
+
+import asyncio
+from shutthebox.server import GameServer
+
+# pylint: disable=missing-docstring
+# pylint: disable=no-self-use
+# pylint: disable=attribute-defined-outside-init
+
+async def play_sessions(game_server, num_sessions):
+    """
+    Connect num_sessions players at once, have each end their turn
+    without lowering any flaps and decline another turn, and return
+    everything each was sent.
+    """
+    server = await game_server.start(port=0)
+    port = server.sockets[0].getsockname()[1]
+    connections = [await asyncio.open_connection('127.0.0.1', port)
+                   for _ in range(0, num_sessions)]
+    outputs = []
+    for reader, writer in connections:
+        output = await reader.readuntil(b'for none) ')
+        writer.write(b'\n')
+        output += await reader.readuntil(b'[Y/N] ')
+        writer.write(b'n\n')
+        output += await reader.read() # until the server disconnects
+        outputs.append(output.decode())
+        writer.close()
+    server.close()
+    await server.wait_closed()
+    return outputs
+
+class TestGameServer:
+    def setup(self):
+        self.game_server = GameServer()
+
+    def test_concurrent_sessions(self):
+        outputs = asyncio.run(play_sessions(self.game_server, 50))
+        assert len(outputs) == 50
+        for output in outputs:
+            assert 'Dice total:' in output
+            assert 'Your score was 45' in output
+        assert self.game_server.total_sessions == 50
+        assert self.game_server.num_sessions == 0
+
+    def test_sessions_share_dice(self):
+        first = self.game_server.create_session()
+        second = self.game_server.create_session()
+        assert first.turn.dice is second.turn.dice
+        assert first.turn.box is not second.turn.box
@@ -0,0 +1,129 @@
+"""
+Tests for the HumanSession class of shutthebox.
+"""
+
+import random
+from nose.tools import raises
+import shutthebox
+from shutthebox.session import HumanSession
+
+# pylint: disable=missing-docstring
+# pylint: disable=no-self-use
+# pylint: disable=attribute-defined-outside-init
+
+class TestHumanSession:
+    def setup(self):
+        random.seed(0)
+        self.session = HumanSession()
+        self.output = self.session.start()
+
+    def test_first_roll_uses_all_dice(self):
+        assert 'Dice total:' in self.output
+        assert self.output.endswith('leave blank for none) ')
+        assert self.session.state == HumanSession.FLAPS
+
+    def test_invalid_flaps_explained_and_asked_again(self):
+        output = self.session.handle_input('99\n')
+        assert '99 is not a valid flap number\n' in output
+        assert output.endswith('leave blank for none) ')
+        assert self.session.state == HumanSession.FLAPS
+
+    def test_lower_flaps(self):
+        dice_total = self.session.dice_total
+        output = self.session.handle_input(str(dice_total))
+        assert self.session.turn.box.flaps[dice_total].is_down
+        assert 'Dice total:' in output
+
+    def test_no_flaps_ends_turn(self):
+        output = self.session.handle_input('')
+        assert 'Your score was 45' in output
+        assert output.endswith('Play another turn? [Y/N] ')
+        assert self.session.scores == [45]
+        # box is ready for the next turn
+        assert self.session.turn.box.sum_available_flaps() == 45
+
+    def test_play_again(self):
+        self.session.handle_input('')
+        assert 'Please enter Y or N' in self.session.handle_input('')
+        assert 'Dice total:' in self.session.handle_input('yes')
+        self.session.handle_input('')
+        self.session.handle_input('N')
+        assert self.session.finished
+        assert self.session.scores == [45, 45]
+
+    def test_single_turn(self):
+        session = HumanSession(play_again=False)
+        session.start()
+        session.handle_input('')
+        assert session.finished
+
+    def test_ask_num_dice(self):
+        box = shutthebox.Box()
+        box.lower_flaps_except([1, 2])
+        session = HumanSession(shutthebox.HumanTurn(box, shutthebox.Dice()))
+        output = session.start()
+        assert output.endswith('(between 1 and 2) ')
+        assert session.state == HumanSession.NUM_DICE
+        assert 'must be an integer' in session.handle_input('3')
+        assert session.state == HumanSession.NUM_DICE
+        session.handle_input('1')
+        assert 1 <= session.dice_total <= 6
+        assert session.state == HumanSession.FLAPS
+
+    def test_shut_the_box(self):
+        box = shutthebox.Box()
+        box.lower_flaps_except([1])
+        dice = shutthebox.Dice(1, faces=(1,)) # always rolls 1
+        session = HumanSession(shutthebox.HumanTurn(box, dice))
+        session.start()
+        session.handle_input('1')
+        output = session.handle_input('1')
+        assert 'shut the box' in output
+        assert session.scores == [0]
+
+    def test_box_already_shut(self):
+        # the turn ends with a score of 0 without asking for any input
+        box = shutthebox.Box()
+        box.lower_flaps_except([])
+        session = HumanSession(shutthebox.HumanTurn(box, shutthebox.Dice()),
+                               play_again=False)
+        output = session.start()
+        assert 'shut the box' in output
+        assert 'How many dice' not in output
+        assert session.finished
+        assert session.scores == [0]
+
+    def test_single_roll(self):
+        session = HumanSession(play_again=False, single_roll=True)
+        session.start()
+        dice_total = session.dice_total
+        session.handle_input(str(dice_total))
+        assert session.finished
+        assert session.scores == []
+        assert session.turn.box.flaps[dice_total].is_down
+
+    def test_single_roll_no_flaps(self):
+        session = HumanSession(play_again=False, single_roll=True)
+        session.start()
+        assert 'Your score' not in session.handle_input('')
+        assert session.finished
+        assert session.scores == []
+
+    @raises(RuntimeError)
+    def test_start_twice(self):
+        self.session.start()
+
+    @raises(RuntimeError)
+    def test_input_before_start(self):
+        HumanSession().handle_input('')
+
+    @raises(RuntimeError)
+    def test_input_after_finish(self):
+        self.session.handle_input('')
+        self.session.handle_input('n')
+        self.session.handle_input('')
+
+    @raises(ValueError)
+    def test_not_human_turn(self):
+        HumanSession(shutthebox.ComputerTurn(shutthebox.Box(),
+                                             shutthebox.Dice()))
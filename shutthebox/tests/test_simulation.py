@@ -0,0 +1,332 @@
+"""
+Tests for the simulation runner of shutthebox.
+"""
+
+import argparse
+import io
+import json
+import os
+import shutil
+import signal
+import tempfile
+from nose.tools import raises
+from shutthebox.simulation import (derive_seed, simulate, text_score_writer,
+                                   add_stopping_arguments, stopping_options,
+                                   add_simulation_arguments,
+                                   simulation_options, SimulationInterrupted)
+from shutthebox.scorefile import load_scores
+
+# pylint: disable=missing-docstring
+# pylint: disable=no-self-use
+# pylint: disable=attribute-defined-outside-init
+
+class TestSimulation:
+    def test_derive_seed_deterministic(self):
+        assert derive_seed(1, 0) == derive_seed(1, 0)
+        assert derive_seed(1, 0) != derive_seed(1, 1)
+        assert derive_seed(1, 0) != derive_seed(2, 0)
+
+    def test_returns_stats(self):
+        stats = simulate(100, flap_decision='highest', seed=1)
+        assert stats.count == 100
+        assert stats.max_score == 45
+
+    def test_same_seed_same_scores(self):
+        assert (simulate(50, flap_decision='lowest', seed=2).histogram ==
+                simulate(50, flap_decision='lowest', seed=2).histogram)
+
+    def test_same_scores_however_many_workers(self):
+        serial = io.StringIO()
+        parallel = io.StringIO()
+        simulate(60, flap_decision='highest', seed=3, chunk_size=7,
+                 on_scores=text_score_writer(serial))
+        simulate(60, flap_decision='highest', seed=3, chunk_size=7,
+                 workers=3, on_scores=text_score_writer(parallel))
+        assert serial.getvalue() == parallel.getvalue()
+
+    def test_scores_match_stats(self):
+        output = io.StringIO()
+        stats = simulate(30, seed=5, on_scores=text_score_writer(output))
+        scores = [int(line) for line in output.getvalue().split()]
+        assert len(scores) == 30
+        assert sum(scores) == stats.total
+
+    def test_stop_on_precision(self):
+        stats = simulate(None, flap_decision='highest', seed=6,
+                         chunk_size=500, precision=0.5)
+        lower, upper = stats.confidence_interval()
+        assert (upper - lower) / 2 <= 0.5
+        assert stats.count % 500 == 0
+        # the previous chunk wasn't precise enough
+        previous = simulate(stats.count - 500, flap_decision='highest',
+                            seed=6, chunk_size=500)
+        if previous.count >= 1000:
+            lower, upper = previous.confidence_interval()
+            assert (upper - lower) / 2 > 0.5
+
+    def test_stop_on_precision_however_many_workers(self):
+        serial = simulate(None, seed=7, chunk_size=300,
+                          precision=0.02, statistic='shut_rate')
+        parallel = simulate(None, seed=7, chunk_size=300, workers=3,
+                            precision=0.02, statistic='shut_rate')
+        assert serial.histogram == parallel.histogram
+
+    def test_min_turns(self):
+        stats = simulate(None, seed=8, chunk_size=100, precision=100,
+                         min_turns=1000)
+        assert stats.count == 1000
+
+    def test_max_turns_before_precision(self):
+        stats = simulate(200, seed=8, chunk_size=100, precision=0.001)
+        assert stats.count == 200
+
+    def test_time_budget(self):
+        stats = simulate(None, seed=9, chunk_size=50, time_budget=0.01)
+        assert stats.count >= 50
+
+    @raises(ValueError)
+    def test_no_limit(self):
+        simulate(None)
+
+    @raises(ValueError)
+    def test_precision_not_positive(self):
+        simulate(None, precision=0)
+
+    @raises(ValueError)
+    def test_unknown_statistic(self):
+        simulate(10, precision=1, statistic='median')
+
+    def test_no_turns(self):
+        assert simulate(0, seed=4).count == 0
+
+    @raises(ValueError)
+    def test_unknown_flap_decision(self):
+        simulate(10, flap_decision='banana')
+
+    @raises(ValueError)
+    def test_unknown_num_dice_decision(self):
+        simulate(10, num_dice_decision='banana')
+
+    @raises(ValueError)
+    def test_workers_too_few(self):
+        simulate(10, workers=0)
+
+def interrupt_after(num_chunks):
+    """
+    Returns an on_scores function which sends SIGINT to this process
+    after num_chunks chunks.
+    """
+    chunks = []
+    def on_scores(scores):
+        chunks.append(scores)
+        if len(chunks) == num_chunks:
+            os.kill(os.getpid(), signal.SIGINT)
+    return on_scores
+
+class TestCheckpoint:
+    def setup(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'checkpoint.json')
+
+    def teardown(self):
+        shutil.rmtree(self.directory)
+
+    def interrupt(self, **kwargs):
+        try:
+            simulate(2000, seed=12, chunk_size=200, checkpoint=self.path,
+                     on_scores=interrupt_after(3), **kwargs)
+        except SimulationInterrupted as interrupted:
+            return interrupted
+        raise AssertionError('not interrupted')
+
+    def test_interrupt_saves_checkpoint(self):
+        interrupted = self.interrupt()
+        assert interrupted.stats.count == 600
+        assert interrupted.checkpoint_path == self.path
+        assert 'Turns: 600' in str(interrupted)
+        with open(self.path) as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+        assert checkpoint['next_chunk'] == 3
+        assert not checkpoint['finished']
+        assert checkpoint['parameters']['seed'] == 12
+        assert sum(checkpoint['histogram']) == 600
+
+    def test_interrupt_restores_handler(self):
+        self.interrupt()
+        assert signal.getsignal(signal.SIGINT) is signal.default_int_handler
+
+    def test_resume_same_as_uninterrupted(self):
+        uninterrupted = simulate(2000, seed=12, chunk_size=200)
+        self.interrupt()
+        # seed is read from the checkpoint
+        resumed = simulate(2000, chunk_size=200, checkpoint=self.path)
+        assert resumed.histogram == uninterrupted.histogram
+
+    def test_resume_with_workers(self):
+        uninterrupted = simulate(2000, seed=12, chunk_size=200)
+        self.interrupt(workers=2)
+        resumed = simulate(2000, chunk_size=200, checkpoint=self.path,
+                           workers=2)
+        assert resumed.histogram == uninterrupted.histogram
+
+    def test_finished_checkpoint(self):
+        first = simulate(300, seed=13, chunk_size=100, checkpoint=self.path)
+        output = io.StringIO()
+        again = simulate(300, seed=13, chunk_size=100, checkpoint=self.path,
+                         on_scores=text_score_writer(output))
+        assert again.histogram == first.histogram
+        assert output.getvalue() == '' # nothing simulated
+
+    def test_interrupt_on_last_chunk(self):
+        # stops on precision after the fourth chunk, when interrupted
+        options = {'num_turns': None, 'seed': 12, 'chunk_size': 200,
+                   'precision': 1.0, 'min_turns': 800}
+        uninterrupted = simulate(**options)
+        assert uninterrupted.count == 800
+        try:
+            simulate(checkpoint=self.path, on_scores=interrupt_after(4),
+                     **options)
+        except SimulationInterrupted:
+            pass
+        else:
+            raise AssertionError('not interrupted')
+        resumed = simulate(checkpoint=self.path, **options)
+        assert resumed.histogram == uninterrupted.histogram
+
+    @raises(ValueError)
+    def test_different_parameters(self):
+        simulate(300, seed=13, chunk_size=100, checkpoint=self.path)
+        simulate(300, seed=13, chunk_size=100, checkpoint=self.path,
+                 flap_decision='lowest')
+
+    def test_interrupt_without_checkpoint(self):
+        try:
+            simulate(1000, seed=14, chunk_size=100,
+                     on_scores=interrupt_after(2))
+        except SimulationInterrupted as interrupted:
+            assert interrupted.stats.count == 200
+            assert interrupted.checkpoint_path is None
+        else:
+            raise AssertionError('not interrupted')
+
+class TestStoppingArguments:
+    def setup(self):
+        self.parser = argparse.ArgumentParser()
+        add_stopping_arguments(self.parser)
+
+    def options(self, arguments):
+        return stopping_options(self.parser.parse_args(arguments))
+
+    def test_default(self):
+        assert self.options([])['num_turns'] == 10000
+        assert self.options([])['checkpoint'] is None
+
+    def test_checkpoint(self):
+        options = self.options(['--checkpoint', 'progress.json'])
+        assert options['checkpoint'] == 'progress.json'
+
+    def test_turns(self):
+        assert self.options(['--turns', '5'])['num_turns'] == 5
+
+    def test_precision(self):
+        options = self.options(['--precision', '0.1'])
+        assert options['num_turns'] is None
+        assert options['precision'] == 0.1
+
+    def test_shut_rate_precision(self):
+        options = self.options(['--shut-rate-precision', '0.01',
+                                '--turns', '100'])
+        assert options['num_turns'] == 100
+        assert options['statistic'] == 'shut_rate'
+
+    def test_time(self):
+        options = self.options(['--time', '2'])
+        assert options['num_turns'] is None
+        assert options['time_budget'] == 2
+
+    @raises(ValueError)
+    def test_both_precisions(self):
+        self.options(['--precision', '0.1', '--shut-rate-precision', '0.1'])
+
+class TestSimulationOptions:
+    def setup(self):
+        self.parser = argparse.ArgumentParser()
+        add_simulation_arguments(self.parser)
+        self.directory = tempfile.mkdtemp()
+        self.scores_path = os.path.join(self.directory, 'scores.stbs')
+
+    def teardown(self):
+        shutil.rmtree(self.directory)
+
+    def test_seed(self):
+        args = self.parser.parse_args(['--seed', '5'])
+        with simulation_options(args, flap_decision='lowest') as options:
+            assert options['seed'] == 5
+            assert options['flap_decision'] == 'lowest'
+            assert 'on_scores' not in options
+
+    def test_random_seed_chosen(self):
+        args = self.parser.parse_args([])
+        with simulation_options(args) as options:
+            assert isinstance(options['seed'], int)
+
+    def test_scores_file(self):
+        args = self.parser.parse_args(['--turns', '50', '--seed', '6',
+                                       '--scores-file', self.scores_path])
+        with simulation_options(args, flap_decision='lowest') as options:
+            stats = simulate(**options)
+        score_file = load_scores(self.scores_path)
+        assert score_file.get_stats().histogram == stats.histogram
+        assert score_file.metadata['seed'] == 6
+        assert score_file.metadata['flap_decision'] == 'lowest'
+        assert score_file.metadata['num_flaps'] == 9
+
+    def test_scores_file_resumed(self):
+        checkpoint_path = os.path.join(self.directory, 'checkpoint.json')
+        args = self.parser.parse_args([
+            '--turns', '1000', '--seed', '7', '--scores-file',
+            self.scores_path, '--checkpoint', checkpoint_path])
+        try:
+            with simulation_options(args) as options:
+                write_scores = options['on_scores']
+                interrupt = interrupt_after(3)
+                def on_scores(scores):
+                    write_scores(scores)
+                    interrupt(scores)
+                options.update(chunk_size=100, on_scores=on_scores)
+                simulate(**options)
+        except SimulationInterrupted:
+            pass
+        # pretend more scores were written after the checkpoint
+        with open(self.scores_path, 'ab') as scores_file:
+            scores_file.write(bytes(5))
+
+        args.seed = None # read from the checkpoint
+        with simulation_options(args) as options:
+            options['chunk_size'] = 100
+            stats = simulate(**options)
+        assert len(load_scores(self.scores_path)) == 1000
+        assert load_scores(self.scores_path).get_stats().histogram == (
+            simulate(1000, seed=7, chunk_size=100).histogram)
+        assert stats.count == 1000
+
+    def test_scores_file_synced_for_checkpoint(self):
+        checkpoint_path = os.path.join(self.directory, 'checkpoint.json')
+        args = self.parser.parse_args([
+            '--turns', '500', '--seed', '8', '--scores-file',
+            self.scores_path, '--checkpoint', checkpoint_path])
+        counts = []
+        with simulation_options(args) as options:
+            write_scores = options['on_scores']
+            def on_scores(scores):
+                if os.path.exists(checkpoint_path):
+                    with open(checkpoint_path) as checkpoint_file:
+                        checkpoint = json.load(checkpoint_file)
+                    # the file holds every score the checkpoint counts
+                    counts.append((sum(checkpoint['histogram']),
+                                   len(load_scores(self.scores_path))))
+                write_scores(scores)
+            options.update(chunk_size=100, on_scores=on_scores,
+                           checkpoint_interval=0)
+            simulate(**options)
+        assert counts == [(100, 100), (200, 200), (300, 300), (400, 400)]
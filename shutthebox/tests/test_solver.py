@@ -0,0 +1,72 @@
+"""
+Tests for the OptimalStrategy class and solve() function of shutthebox.
+"""
+
+import time
+from nose.tools import raises
+import shutthebox
+from shutthebox.solver import solve
+
+# pylint: disable=missing-docstring
+# pylint: disable=no-self-use
+# pylint: disable=attribute-defined-outside-init
+
+class TestSolver:
+    def setup(self):
+        self.strategy = solve()
+
+    def test_solved_once_per_rules(self):
+        assert solve() is self.strategy
+        assert solve(num_dice=1) is not self.strategy
+
+    @raises(ValueError)
+    def test_number_of_flaps_too_small(self):
+        solve(num_flaps=0)
+
+    @raises(ValueError)
+    def test_number_of_dice_non_int(self):
+        solve(num_dice=1.5)
+
+    def test_expected_score_all_flaps_down(self):
+        assert self.strategy.expected_scores[0] == 0
+
+    def test_expected_score_single_flap(self):
+        # flap 1 can only be lowered by rolling a 1 with a single die
+        assert abs(self.strategy.expected_scores[0b1] - 5 / 6) < 0.001
+        assert self.strategy.num_dice_choices[0b1] == 1
+
+    def test_expected_score_never_exceeds_flap_sum(self):
+        for up_mask, expected in enumerate(self.strategy.expected_scores):
+            flap_sum = sum(shutthebox.box.flap_nums_from_mask(up_mask))
+            assert expected <= flap_sum
+
+    def test_two_dice_when_single_die_not_allowed(self):
+        assert self.strategy.num_dice_choices[0b111111111] == 2
+
+    def test_move_1to5_roll_7(self):
+        # agrees with Durango Bill's optimal strategy table
+        assert self.strategy.get_move(0b000011111, 7) == [3, 4]
+
+    def test_move_impossible(self):
+        assert self.strategy.get_move(0b000000100, 2) is False
+
+    def test_solve_quickly(self):
+        start = time.time()
+        solve(num_flaps=9, num_dice=2, max_flap_sum_single_die=5)
+        assert time.time() - start < 1
+
+    def test_computer_turn_optimal_decisions(self):
+        turn = shutthebox.ComputerTurn(shutthebox.Box(), shutthebox.Dice())
+        assert turn.get_optimal_strategy() is self.strategy
+        turn.box.lower_flaps_except([1, 2, 3, 4, 5])
+        assert turn.make_flap_decision_optimal(7) == [3, 4]
+        turn.box.lower_flaps_except([1, 2])
+        assert turn.make_num_dice_decision_optimal() == 1
+
+    def test_computer_turn_optimal_turn(self):
+        turn = shutthebox.ComputerTurn(shutthebox.Box(), shutthebox.Dice())
+        for _ in range(0, 100):
+            score = turn.perform_turn(
+                num_dice_decision_method=turn.make_num_dice_decision_optimal,
+                flap_decision_method=turn.make_flap_decision_optimal)
+            assert isinstance(score, int) and 0 <= score <= 45
@@ -0,0 +1,159 @@
+"""
+Tests for the ScoreStats and SampleStats classes of shutthebox.
+"""
+
+import math
+import statistics
+from nose.tools import raises
+from shutthebox.stats import ScoreStats, SampleStats, z_value
+
+# pylint: disable=missing-docstring
+# pylint: disable=no-self-use
+# pylint: disable=attribute-defined-outside-init
+
+class TestScoreStats:
+    def setup(self):
+        self.scores = [0, 3, 7, 7, 12, 0, 45, 20]
+        self.stats = ScoreStats()
+        self.stats.add_scores(self.scores)
+
+    def test_for_box(self):
+        assert ScoreStats.for_box(9).max_score == 45
+        assert len(ScoreStats.for_box(12).histogram) == 79
+
+    @raises(ValueError)
+    def test_max_score_negative(self):
+        ScoreStats(-1)
+
+    def test_count_and_histogram(self):
+        assert self.stats.count == 8
+        assert self.stats.histogram[7] == 2
+        assert sum(self.stats.histogram) == 8
+
+    def test_mean_and_variance(self):
+        assert self.stats.mean == statistics.mean(self.scores)
+        assert abs(self.stats.variance -
+                   statistics.variance(self.scores)) < 1e-9
+        assert abs(self.stats.std_dev -
+                   statistics.stdev(self.scores)) < 1e-9
+
+    def test_shut_rate(self):
+        assert self.stats.shut_rate == 0.25
+
+    def test_percentile(self):
+        assert self.stats.percentile(0) == 0
+        assert self.stats.percentile(50) == 7
+        assert self.stats.percentile(100) == 45
+
+    @raises(ValueError)
+    def test_percentile_out_of_range(self):
+        self.stats.percentile(101)
+
+    def test_empty(self):
+        stats = ScoreStats()
+        assert stats.mean is None and stats.variance is None
+        assert stats.shut_rate is None and stats.percentile(50) is None
+        assert str(stats) == 'Turns: 0'
+
+    def test_merge(self):
+        other = ScoreStats()
+        other.add_scores([1, 2])
+        self.stats.merge(other)
+        assert self.stats.count == 10
+        assert self.stats.mean == statistics.mean(self.scores + [1, 2])
+
+    @raises(ValueError)
+    def test_merge_different_max_score(self):
+        self.stats.merge(ScoreStats(78))
+
+    def test_str(self):
+        assert str(self.stats).startswith('Turns: 8\nMean score: 11.75')
+
+    def test_from_histogram(self):
+        stats = ScoreStats.from_histogram(self.stats.histogram)
+        assert stats.max_score == 45
+        assert stats.count == self.stats.count
+        assert stats.total == self.stats.total
+        assert stats.total_squares == self.stats.total_squares
+
+    @raises(ValueError)
+    def test_from_histogram_invalid(self):
+        ScoreStats.from_histogram([1, -1])
+
+    def test_std_error(self):
+        assert (abs(self.stats.std_error - statistics.stdev(self.scores) /
+                    math.sqrt(8)) < 1e-12)
+
+    def test_mean_confidence_interval(self):
+        lower, upper = self.stats.confidence_interval()
+        assert abs((lower + upper) / 2 - self.stats.mean) < 1e-12
+        assert abs((upper - lower) / 2 -
+                   1.959964 * self.stats.std_error) < 1e-5
+
+    def test_shut_rate_confidence_interval(self):
+        # Wilson score interval for 2 of 8
+        lower, upper = self.stats.confidence_interval('shut_rate', 0.95)
+        assert abs(lower - 0.0715) < 1e-4
+        assert abs(upper - 0.5907) < 1e-4
+
+    def test_shut_rate_confidence_interval_never_shut(self):
+        stats = ScoreStats()
+        stats.add_scores([5, 6, 7])
+        lower, upper = stats.confidence_interval('shut_rate')
+        assert lower == 0
+        assert 0 < upper < 1
+
+    def test_confidence_interval_too_few(self):
+        assert ScoreStats().confidence_interval() is None
+
+    @raises(ValueError)
+    def test_confidence_interval_unknown_statistic(self):
+        self.stats.confidence_interval('median')
+
+    def test_same_as_sample_stats(self):
+        sample_stats = SampleStats()
+        for score in self.scores:
+            sample_stats.add(score)
+        assert isinstance(self.stats, SampleStats)
+        assert self.stats.variance == sample_stats.variance
+        assert (self.stats.confidence_interval('mean', 0.9) ==
+                sample_stats.confidence_interval(0.9))
+
+class TestSampleStats:
+    def setup(self):
+        self.values = [0.5, -1.5, 2.0, 3.0, 0.0]
+        self.stats = SampleStats()
+        for value in self.values:
+            self.stats.add(value)
+
+    def test_mean_and_variance(self):
+        assert abs(self.stats.mean - statistics.mean(self.values)) < 1e-12
+        assert (abs(self.stats.variance - statistics.variance(self.values)) <
+                1e-12)
+
+    def test_empty(self):
+        stats = SampleStats()
+        assert stats.mean is None
+        assert stats.variance is None
+        assert stats.std_error is None
+        assert stats.confidence_interval() is None
+
+    def test_confidence_interval(self):
+        lower, upper = self.stats.confidence_interval(0.95)
+        half_width = 1.959964 * math.sqrt(
+            statistics.variance(self.values) / len(self.values))
+        assert abs(lower - (self.stats.mean - half_width)) < 1e-5
+        assert abs(upper - (self.stats.mean + half_width)) < 1e-5
+        narrower = self.stats.confidence_interval(0.5)
+        assert lower < narrower[0] < narrower[1] < upper
+
+    def test_merge(self):
+        other = SampleStats()
+        other.add(10)
+        self.stats.merge(other)
+        assert self.stats.count == 6
+        assert self.stats.mean == statistics.mean(self.values + [10])
+
+    @raises(ValueError)
+    def test_z_value_invalid_confidence(self):
+        z_value(1)
@@ -0,0 +1,22 @@
+"""
+Tests for the named strategies of shutthebox.
+"""
+
+import shutthebox
+from shutthebox.strategies import STRATEGIES, available_strategies
+
+# pylint: disable=missing-docstring
+# pylint: disable=no-self-use
+# pylint: disable=attribute-defined-outside-init
+
+class TestStrategies:
+    def test_decision_methods_exist(self):
+        turn = shutthebox.ComputerTurn(shutthebox.Box(), shutthebox.Dice())
+        for flap_decision, num_dice_decision in STRATEGIES.values():
+            turn.get_flap_decision_method(flap_decision)
+            turn.get_num_dice_decision_method(num_dice_decision)
+
+    def test_available_strategies_without_bill(self):
+        strategies = available_strategies('wrong.txt')
+        assert 'bill' not in strategies
+        assert set(strategies) == set(STRATEGIES) - {'bill'}
@@ -0,0 +1,118 @@
+"""
+Tests for the common random numbers tournament of shutthebox.
+"""
+
+import subprocess
+import sys
+from nose.tools import raises
+from shutthebox.tournament import (SharedRolls, ReplayDice, TournamentResults,
+                                   run_tournament)
+
+# pylint: disable=missing-docstring
+# pylint: disable=no-self-use
+# pylint: disable=attribute-defined-outside-init
+
+class TestReplayDice:
+    def setup(self):
+        self.shared_rolls = SharedRolls()
+        self.shared_rolls.start_turn(1)
+        self.dice = ReplayDice(self.shared_rolls)
+
+    def test_replays_same_rolls(self):
+        other = ReplayDice(self.shared_rolls)
+        totals = [self.dice.roll() for _ in range(0, 5)]
+        assert [other.roll() for _ in range(0, 5)] == totals
+        self.dice.start_turn()
+        assert [self.dice.roll() for _ in range(0, 5)] == totals
+
+    def test_single_die_uses_first_die(self):
+        first_roll = self.shared_rolls.get(0)
+        assert self.dice.roll(1) == first_roll[0]
+
+    def test_antithetic(self):
+        antithetic = ReplayDice(self.shared_rolls, antithetic=True)
+        for _ in range(0, 5):
+            assert self.dice.roll() + antithetic.roll() == 14
+
+    def test_new_turn_new_rolls(self):
+        first_turn = [self.dice.roll() for _ in range(0, 10)]
+        self.shared_rolls.start_turn(2)
+        self.dice.start_turn()
+        assert [self.dice.roll() for _ in range(0, 10)] != first_turn
+
+    @raises(ValueError)
+    def test_too_many_dice(self):
+        self.dice.roll(3)
+
+    @raises(ValueError)
+    def test_antithetic_weighted_dice(self):
+        ReplayDice(SharedRolls(weights=(1, 1, 1, 1, 1, 2)), antithetic=True)
+
+class TestTournament:
+    def setup(self):
+        self.results = run_tournament(
+            400, strategies=['highest', 'lowest', 'optimal'], seed=1,
+            chunk_size=150)
+
+    def test_samples(self):
+        for name in ['highest', 'lowest', 'optimal']:
+            assert self.results.scores[name].count == 400
+        assert self.results.differences['highest', 'optimal'].count == 400
+
+    def test_differences_match_scores(self):
+        difference = self.results.differences['highest', 'lowest'].mean
+        assert abs(difference - (self.results.scores['highest'].mean -
+                                 self.results.scores['lowest'].mean)) < 1e-9
+
+    def test_lowest_worse(self):
+        upper = self.results.differences[
+            'highest', 'lowest'].confidence_interval()[1]
+        assert upper < 0
+
+    def test_common_random_numbers_reduce_variance(self):
+        assert self.results.variance_reduction('highest', 'optimal') > 2
+
+    def test_identical_strategies_never_differ(self):
+        results = TournamentResults(['highest', 'highest'])
+        results.add([3, 3])
+        assert results.variance_reduction('highest', 'highest') is None
+
+    def test_same_results_however_many_workers(self):
+        parallel = run_tournament(
+            400, strategies=['highest', 'lowest', 'optimal'], seed=1,
+            chunk_size=150, workers=2)
+        for name in ['highest', 'lowest', 'optimal']:
+            assert (parallel.scores[name].total ==
+                    self.results.scores[name].total)
+
+    def test_antithetic(self):
+        results = run_tournament(
+            100, strategies=['highest', 'optimal'], seed=1, antithetic=True)
+        assert results.scores['highest'].count == 50
+
+    def test_default_strategies(self):
+        results = run_tournament(10, seed=1)
+        assert 'optimal' in results.strategies
+
+    def test_format(self):
+        assert 'highest - optimal' in self.results.format(0.9)
+
+    @raises(ValueError)
+    def test_odd_antithetic(self):
+        run_tournament(5, antithetic=True)
+
+    @raises(ValueError)
+    def test_one_strategy(self):
+        run_tournament(5, strategies=['highest'])
+
+    @raises(ValueError)
+    def test_unknown_strategy(self):
+        run_tournament(5, strategies=['highest', 'no_such_strategy'])
+
+    def test_benchmarks_not_imported(self):
+        output = subprocess.check_output([
+            sys.executable, '-c',
+            'import sys, shutthebox.tournament; print(sorted(sys.modules))'],
+                                         universal_newlines=True)
+        for module in ['shutthebox.benchmark', 'tracemalloc']:
+            assert "'" + module + "'" not in output
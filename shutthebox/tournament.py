@@ -0,0 +1,313 @@
+"""
+Compare strategies by playing them all with the same dice (common random
+numbers), optionally with antithetic pairs of turns, and report the
+differences between their mean scores with confidence intervals.
+Because the strategies see the same rolls, the differences vary much
+less than those between independent simulations, so far fewer turns are
+needed for a given precision.
+"""
+
+import itertools
+import os
+import random
+
+from .box import Box
+from .dice import Dice, DEFAULT_FACES
+from .computerturn import ComputerTurn
+from .bill import DEFAULT_BILL_FILENAME
+from .simulation import DEFAULT_CHUNK_SIZE, derive_seed
+from .stats import SampleStats
+from .strategies import STRATEGIES, available_strategies
+
+class SharedRolls:
+    """
+    The rolls of the dice for one turn, drawn when first needed and then
+    replayed to every strategy. Each roll is a tuple of one face per die.
+
+    num_dice (int): how many dice are being used
+    faces (tuple): numbers shown on the faces of each die
+    weights (tuple): relative probability of each face, or None if the
+        dice are fair
+    """
+
+    def __init__(self, num_dice=2, faces=DEFAULT_FACES, weights=None):
+        self.num_dice = num_dice
+        self.faces = tuple(faces)
+        self.weights = weights
+        self.rng = random.Random()
+        self.rolls = []
+
+    def start_turn(self, seed):
+        """
+        Forget the rolls of the last turn and draw the rolls of the next
+        turn from the supplied seed.
+
+        seed (int)
+        """
+        self.rng.seed(seed)
+        self.rolls = []
+
+    def get(self, index):
+        """
+        Returns roll number index of this turn, counting from 0.
+        """
+        while len(self.rolls) <= index:
+            self.rolls.append(tuple(self.rng.choices(
+                self.faces, self.weights, k=self.num_dice)))
+        return self.rolls[index]
+
+class ReplayDice(Dice):
+    """
+    Dice which replay the rolls of a SharedRolls, so that roll n of a
+    turn shows the same faces whichever strategy is used. Rolling a
+    single die uses the first die of the roll. If antithetic is True,
+    each face is replaced by its mirror image (e.g. 6 for 1), which
+    requires fair dice.
+
+    shared_rolls (SharedRolls)
+    antithetic (bool)
+    """
+
+    def __init__(self, shared_rolls, antithetic=False):
+        super(ReplayDice, self).__init__(
+            shared_rolls.num_dice, shared_rolls.faces, shared_rolls.weights)
+        if antithetic and self.weights is not None:
+            raise ValueError('Antithetic rolls require fair dice')
+        self.shared_rolls = shared_rolls
+        self.roll_index = 0
+        # faces in order, mapped to faces in reverse order
+        sorted_faces = sorted(self.faces)
+        self.mirror = (dict(zip(sorted_faces, reversed(sorted_faces)))
+                       if antithetic else None)
+
+    def start_turn(self):
+        """
+        Replay from the first roll of the turn.
+        """
+        self.roll_index = 0
+
+    def roll(self, roll_dice=None):
+        """
+        Replay the next roll of one or more of the dice.
+
+        roll_dice (int): how many dice to roll (default all)
+        """
+        if roll_dice is None:
+            roll_dice = self.num_dice
+        if (not isinstance(roll_dice, int) or roll_dice < 1 or
+                roll_dice > self.num_dice):
+            raise ValueError('roll_dice must be an integer between 1 and ' +
+                             '{}'.format(self.num_dice))
+
+        faces = self.shared_rolls.get(self.roll_index)[:roll_dice]
+        self.roll_index += 1
+        if self.mirror is not None:
+            return sum(self.mirror[face] for face in faces)
+        return sum(faces)
+
+class TournamentResults:
+    """
+    Statistics of the scores of each strategy and of the differences
+    between each pair of strategies' scores, where each sample is one
+    turn, or the mean of an antithetic pair of turns, played by every
+    strategy with the same dice.
+
+    strategies (tuple): names of the strategies (keys of STRATEGIES)
+    """
+
+    def __init__(self, strategies):
+        self.strategies = tuple(strategies)
+        self.scores = {name: SampleStats() for name in self.strategies}
+        self.differences = {
+            pair: SampleStats()
+            for pair in itertools.combinations(self.strategies, 2)}
+
+    def add(self, scores):
+        """
+        Add one sample of scores, one for each strategy in order.
+
+        scores (sequence)
+        """
+        for name, score in zip(self.strategies, scores):
+            self.scores[name].add(score)
+        for (index_a, score_a), (index_b, score_b) in itertools.combinations(
+                enumerate(scores), 2):
+            self.differences[self.strategies[index_a],
+                             self.strategies[index_b]].add(score_a - score_b)
+
+    def merge(self, other):
+        """
+        Add the results from another TournamentResults for the same
+        strategies to these and return self.
+        """
+        if other.strategies != self.strategies:
+            raise ValueError("Can't merge results for different strategies")
+        for name in self.strategies:
+            self.scores[name].merge(other.scores[name])
+        for pair in self.differences:
+            self.differences[pair].merge(other.differences[pair])
+        return self
+
+    def variance_reduction(self, strategy_a, strategy_b):
+        """
+        Returns how many times more samples independent simulations
+        would need for the same precision in the difference between the
+        mean scores of two strategies, or None if it can't be estimated.
+        """
+        difference = self.differences[strategy_a, strategy_b].variance
+        if not difference: # None, or no variance at all
+            return None
+        return ((self.scores[strategy_a].variance +
+                 self.scores[strategy_b].variance) / difference)
+
+    def format(self, confidence=0.95):
+        """
+        Returns a summary of the mean score of each strategy and the
+        difference between each pair with confidence intervals.
+
+        confidence (float): between 0 and 1 (default 0.95)
+        """
+        lines = ['Samples: {}'.format(self.scores[self.strategies[0]].count),
+                 '', 'Mean scores ({:.0%} confidence)'.format(confidence)]
+        for name in self.strategies:
+            lines.append('{:<25} {}'.format(
+                name, _format_interval(self.scores[name], confidence)))
+        lines += ['', 'Differences ({:.0%} confidence)'.format(confidence)]
+        for (name_a, name_b), stats in sorted(self.differences.items()):
+            reduction = self.variance_reduction(name_a, name_b)
+            lines.append('{:<50} {}{}'.format(
+                '{} - {}'.format(name_a, name_b),
+                _format_interval(stats, confidence),
+                '' if reduction is None else
+                ' (variance reduced {:.1f}x)'.format(reduction)))
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return self.format()
+
+def _format_interval(stats, confidence):
+    interval = stats.confidence_interval(confidence)
+    if interval is None:
+        return '{:.4f}'.format(stats.mean) if stats.count else '-'
+    return '{:.4f} [{:.4f}, {:.4f}]'.format(stats.mean, *interval)
+
+# pylint: disable=too-many-arguments
+# pylint: disable=too-many-locals
+
+def play_chunk(num_samples, seed, strategies, num_flaps, num_dice,
+               antithetic, bill_filename=DEFAULT_BILL_FILENAME):
+    """
+    Play num_samples turns, or antithetic pairs of turns, with every
+    strategy and return a TournamentResults. Defined at module level so
+    that it can be run in a worker process.
+    """
+    shared_rolls = SharedRolls(num_dice)
+    players = []
+    for name in strategies:
+        flap_decision, num_dice_decision = STRATEGIES[name]
+        dice = [ReplayDice(shared_rolls)]
+        if antithetic:
+            dice.append(ReplayDice(shared_rolls, antithetic=True))
+        turn = ComputerTurn(Box(num_flaps), dice[0], bill_filename)
+        players.append((turn, dice,
+                        turn.get_flap_decision_method(flap_decision),
+                        turn.get_num_dice_decision_method(num_dice_decision)))
+
+    rng = random.Random(seed)
+    results = TournamentResults(strategies)
+    for _ in range(0, num_samples):
+        shared_rolls.start_turn(rng.getrandbits(64))
+        scores = []
+        for turn, dice, flap_decision_method, num_dice_decision_method in (
+                players):
+            total = 0
+            for these_dice in dice:
+                these_dice.start_turn()
+                turn.dice = these_dice
+                total += turn.perform_turn(
+                    num_dice_decision_method=num_dice_decision_method,
+                    flap_decision_method=flap_decision_method)
+            scores.append(total / len(dice))
+        results.add(scores)
+
+    return results
+
+def run_tournament(num_turns, strategies=None, num_flaps=9, num_dice=2,
+                   antithetic=False, seed=None, workers=1,
+                   chunk_size=DEFAULT_CHUNK_SIZE,
+                   bill_filename=DEFAULT_BILL_FILENAME):
+    """
+    Play num_turns turns with each strategy, with the same dice for
+    every strategy, and return a TournamentResults. For a given seed,
+    the results are the same however many workers are used.
+
+    num_turns (int): how many turns each strategy plays, which must be
+        even if antithetic is True
+    strategies (list): names of strategies (keys of STRATEGIES), default
+        every strategy which can be used with these rules
+    num_flaps (int): how many flaps the box has (default 9)
+    num_dice (int): how many dice are being used (default 2)
+    antithetic (bool): play each set of rolls twice, the second time
+        with every face mirrored, and use the mean score of each pair as
+        one sample? (default False)
+    seed (int): master seed (default None i.e. unpredictable)
+    workers (int): how many processes to use, or None for one per CPU
+        (default 1 i.e. run in this process)
+    chunk_size (int): how many samples to play with each seed
+    bill_filename (str): Durango Bill's strategy file, used by 'bill'
+    """
+    if not (isinstance(num_turns, int) and num_turns >= 0):
+        raise ValueError('num_turns must be an integer >= 0')
+    if antithetic and num_turns % 2:
+        raise ValueError('num_turns must be even for antithetic pairs')
+    if not (isinstance(chunk_size, int) and chunk_size >= 1):
+        raise ValueError('chunk_size must be an integer >= 1')
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if not (isinstance(workers, int) and workers >= 1):
+        raise ValueError('workers must be an integer >= 1')
+
+    if strategies is None:
+        strategies = [
+            name for name in available_strategies(bill_filename)
+            # Bill's table is only for the standard rules
+            if name != 'bill' or (num_flaps, num_dice) == (9, 2)]
+    strategies = tuple(strategies)
+    if len(strategies) < 2:
+        raise ValueError('At least two strategies are required')
+    for name in strategies:
+        if name not in STRATEGIES:
+            raise ValueError('There is no strategy called {}'.format(name))
+
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+
+    num_samples = num_turns // 2 if antithetic else num_turns
+    num_chunks = -(-num_samples // chunk_size) # round up
+    chunk_args = [
+        [min(chunk_size, num_samples - index * chunk_size)
+         for index in range(0, num_chunks)],
+        [derive_seed(seed, index) for index in range(0, num_chunks)],
+        [strategies] * num_chunks,
+        [num_flaps] * num_chunks,
+        [num_dice] * num_chunks,
+        [antithetic] * num_chunks,
+        [bill_filename] * num_chunks,
+    ]
+
+    results = TournamentResults(strategies)
+    if workers == 1 or num_chunks <= 1:
+        chunk_results = map(play_chunk, *chunk_args)
+        for chunk_result in chunk_results:
+            results.merge(chunk_result)
+    else:
+        # imported here as it's slow to import and not needed by
+        # single-process runs
+        # pylint: disable=import-outside-toplevel
+        import concurrent.futures
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=min(workers, num_chunks)) as executor:
+            for chunk_result in executor.map(play_chunk, *chunk_args):
+                results.merge(chunk_result)
+
+    return results
@@ -2,18 +2,13 @@
 
 """
 Simulate many turns of Shut the Box using Durango Bill's optimal
-strategy. Output the score for each turn to the command line.
-"""
-
-import shutthebox
+strategy. Output a summary of the scores, or the score for each turn
+with --scores.
 
-# pylint: disable=invalid-name
-
-box = shutthebox.Box()
-dice = shutthebox.Dice()
+Equivalent to `python -m shutthebox simulate --flap-decision bill`.
+"""
 
-turn = shutthebox.ComputerTurn(box, dice)
+import sys
+from shutthebox.cli import main
 
-for n in range(0, 10000):
-    print(turn.perform_turn(
-        flap_decision_method=turn.make_flap_decision_bill))
+sys.exit(main(['simulate', '--flap-decision', 'bill'] + sys.argv[1:]))
@@ -2,17 +2,13 @@
 
 """
 Simulate many turns of Shut the Box using the default decision methods.
-Output the score for each turn to the command line.
-"""
-
-import shutthebox
+Output a summary of the scores, or the score for each turn with
+--scores.
 
-# pylint: disable=invalid-name
-
-box = shutthebox.Box()
-dice = shutthebox.Dice()
+Equivalent to `python -m shutthebox simulate`.
+"""
 
-turn = shutthebox.ComputerTurn(box, dice)
+import sys
+from shutthebox.cli import main
 
-for n in range(0, 10000):
-    print(turn.perform_turn())
+sys.exit(main(['simulate'] + sys.argv[1:]))
@@ -3,20 +3,14 @@
 """
 Simulate many turns of Shut the Box using the flap decision method which
 favours lowering higher-numbered flaps and always using two dice. Output
-the score for each turn to the command line.
-"""
-
-import shutthebox
+a summary of the scores, or the score for each turn with --scores.
 
-# pylint: disable=invalid-name
-
-box = shutthebox.Box()
-dice = shutthebox.Dice()
+Equivalent to `python -m shutthebox simulate --flap-decision highest
+--num-dice-decision always_all`.
+"""
 
-turn = shutthebox.ComputerTurn(box, dice)
+import sys
+from shutthebox.cli import main
 
-for n in range(0, 10000):
-    print(turn.perform_turn(
-        flap_decision_method=turn.make_flap_decision_highest,
-        num_dice_decision_method=turn.make_num_dice_decision_always_all
-    ))
+sys.exit(main(['simulate', '--flap-decision', 'highest',
+              '--num-dice-decision', 'always_all'] + sys.argv[1:]))
@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+
+"""
+Simulate many turns of Shut the Box using the optimal strategy computed
+by shutthebox.solver. Output a summary of the scores, or the score for
+each turn with --scores.
+
+Equivalent to `python -m shutthebox simulate --flap-decision optimal
+--num-dice-decision optimal`.
+"""
+
+import sys
+from shutthebox.cli import main
+
+sys.exit(main(['simulate', '--flap-decision', 'optimal',
+              '--num-dice-decision', 'optimal'] + sys.argv[1:]))
@@ -2,20 +2,15 @@
 
 """
 Simulate many turns of Shut the Box using the default flap decision
-method but always using two dice. Output the score for each turn to the
-command line.
-"""
-
-import shutthebox
+method but always using two dice. Output a summary of the scores, or the
+score for each turn with --scores.
 
-# pylint: disable=invalid-name
-
-box = shutthebox.Box()
-dice = shutthebox.Dice()
+Equivalent to `python -m shutthebox simulate --num-dice-decision
+always_all`.
+"""
 
-turn = shutthebox.ComputerTurn(box, dice)
+import sys
+from shutthebox.cli import main
 
-for n in range(0, 10000):
-    print(turn.perform_turn(
-        num_dice_decision_method=turn.make_num_dice_decision_always_all
-    ))
+sys.exit(main(['simulate', '--num-dice-decision', 'always_all'] +
+              sys.argv[1:]))
@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+
+"""
+Play every strategy (or those named) with the same dice and output the
+mean score of each and the difference between each pair of strategies
+with confidence intervals.
+
+Equivalent to `python -m shutthebox tournament`.
+"""
+
+import sys
+from shutthebox.cli import main
+
+sys.exit(main(['tournament'] + sys.argv[1:]))